@@ -1,41 +1,12 @@
 """Dynamic Momentum Screener — Stock Evaluation & Pre-Breakout Detection."""
+from typing import Final
+
 import streamlit as st
 from config.settings import APP_TITLE, APP_ICON
 
-st.set_page_config(
-    page_title=APP_TITLE,
-    page_icon=APP_ICON,
-    layout="wide",
-    initial_sidebar_state="expanded",
-)
-
-st.title("Dynamic Momentum Screener")
-st.markdown("Pre-breakout detection, institutional flow analysis, and technical scoring")
+_TAGLINE_MD: Final[str] = "Pre-breakout detection, institutional flow analysis, and technical scoring"
 
-# --- Quick Start ---
-st.subheader("Quick Start")
-col1, col2, col3 = st.columns(3)
-with col1:
-    st.page_link("pages/1_🔍_Scanner.py", label="Run Scanner", icon="🔍", use_container_width=True)
-with col2:
-    st.page_link("pages/2_📊_Research.py", label="Research Panel", icon="📊", use_container_width=True)
-with col3:
-    st.page_link("pages/3_📈_Stock_Detail.py", label="Stock Detail", icon="📈", use_container_width=True)
-
-col4, col5, col6 = st.columns(3)
-with col4:
-    st.page_link("pages/5_💼_Portfolio.py", label="Portfolio Hub", icon="💼", use_container_width=True)
-with col5:
-    st.page_link("pages/6_🔬_Backtest.py", label="Backtester", icon="🔬", use_container_width=True)
-with col6:
-    st.page_link("pages/7_🔔_Alerts.py", label="Price Alerts", icon="🔔", use_container_width=True)
-
-st.divider()
-
-# --- How to Use ---
-with st.expander("How to Use This App"):
-    st.markdown(
-        """
+_HOW_TO_USE_MD: Final[str] = """
 ### Getting Started
 1. Go to **Settings** in the sidebar and enter your **Polygon.io** and **Finnhub** API keys
 2. Run the **Scanner** to discover high-scoring momentum stocks with filter presets
@@ -75,33 +46,84 @@ with st.expander("How to Use This App"):
 
 **Options Analysis** — Rating (0-110) with IV estimation and strategy suggestions
 """
-    )
+
+st.set_page_config(
+    page_title=APP_TITLE,
+    page_icon=APP_ICON,
+    layout="wide",
+    initial_sidebar_state="expanded",
+)
+
+st.title("Dynamic Momentum Screener")
+st.markdown(_TAGLINE_MD)
+
+# --- Quick Start ---
+_NAV: Final = (
+    ("pages/1_🔍_Scanner.py", "Run Scanner", "🔍"),
+    ("pages/2_📊_Research.py", "Research Panel", "📊"),
+    ("pages/3_📈_Stock_Detail.py", "Stock Detail", "📈"),
+    ("pages/5_💼_Portfolio.py", "Portfolio Hub", "💼"),
+    ("pages/6_🔬_Backtest.py", "Backtester", "🔬"),
+    ("pages/7_🔔_Alerts.py", "Price Alerts", "🔔"),
+)
+
+
+@st.fragment
+def _render_nav():
+    """Quick-start page links, three per row."""
+    for row in (_NAV[:3], _NAV[3:]):
+        for col, (path, label, icon) in zip(st.columns(len(row)), row):
+            col.page_link(path, label=label, icon=icon, use_container_width=True)
+
+
+st.subheader("Quick Start")
+_render_nav()
+
+st.divider()
+
+
+# --- How to Use ---
+@st.fragment
+def _render_help():
+    """Help section; reruns on its own without re-rendering the rest of the page."""
+    with st.expander("How to Use This App"):
+        st.markdown(_HOW_TO_USE_MD)
+
+
+_render_help()
+
 
 # --- Initialize session state ---
-if "polygon_api_key" not in st.session_state:
-    from config.settings import POLYGON_API_KEY
-    st.session_state["polygon_api_key"] = POLYGON_API_KEY
+def _init_session_state():
+    """Seed session-state defaults once per browser session."""
+    from config.settings import POLYGON_API_KEY, FINNHUB_API_KEY
+
+    for key, default in (
+        ("polygon_api_key", POLYGON_API_KEY),
+        ("finnhub_api_key", FINNHUB_API_KEY),
+        ("scan_results", None),
+        ("research_ticker", ""),
+        # Persistence-related state
+        ("portfolio_data", None),
+        ("backtest_results", None),
+        ("alert_check_results", []),
+    ):
+        if key not in st.session_state:
+            st.session_state[key] = default
+    st.session_state["_initialized"] = True
 
-if "finnhub_api_key" not in st.session_state:
-    from config.settings import FINNHUB_API_KEY
-    st.session_state["finnhub_api_key"] = FINNHUB_API_KEY
 
-if "scan_results" not in st.session_state:
-    st.session_state["scan_results"] = None
+if "_initialized" not in st.session_state:
+    _init_session_state()
 
-if "research_ticker" not in st.session_state:
-    st.session_state["research_ticker"] = ""
 
-# Initialize persistence-related state
-if "portfolio_data" not in st.session_state:
-    st.session_state["portfolio_data"] = None
+@st.cache_resource
+def _warm_kernels():
+    """JIT-compile the scan kernels once per server process, not on the first scan."""
+    from core import recommendation_kernels, scoring_kernels
 
-if "backtest_results" not in st.session_state:
-    st.session_state["backtest_results"] = None
+    recommendation_kernels.warm_up()
+    scoring_kernels.warm_up()
 
-if "alert_check_results" not in st.session_state:
-    st.session_state["alert_check_results"] = []
 
-# Ensure persistence directory exists on startup
-from data.persistence import _ensure_dir
-_ensure_dir()
+_warm_kernels()
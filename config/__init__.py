@@ -0,0 +1,11 @@
+"""Static configuration tables."""
+from __future__ import annotations
+
+from types import MappingProxyType
+
+
+def _freeze(value):
+    """Recursively wrap dicts in read-only MappingProxyType views."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    return value
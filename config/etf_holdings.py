@@ -1,4 +1,5 @@
 """Static ETF holdings data for portfolio breakdown analysis."""
+from __future__ import annotations
 
 ETF_HOLDINGS = {
     "SPY": {
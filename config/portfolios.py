@@ -1,43 +1,77 @@
 """Predefined portfolio definitions — user's actual holdings."""
+from __future__ import annotations
 
-PREDEFINED_PORTFOLIOS = {
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+
+@dataclass(frozen=True, slots=True)
+class Portfolio:
+    """Immutable predefined portfolio definition."""
+    id: str
+    name: str
+    description: str
+    symbols: tuple[str, ...]
+    holdings: Mapping[str, dict] = field(default_factory=lambda: MappingProxyType({}), hash=False)
+
+    def to_dict(self) -> dict:
+        """Editable dict form used by persistence and the Portfolio page."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description,
+            "symbols": list(self.symbols),
+            "holdings": dict(self.holdings),
+        }
+
+
+_RAW_PREDEFINED_PORTFOLIOS = {
     "robinhood": {
         "id": "robinhood",
         "name": "Robinhood Portfolio",
         "description": "Personal Robinhood holdings",
-        "symbols": [
+        "symbols": (
             "GNSS", "SMCI", "HOOD", "NVDA", "RGTI", "AUR", "TSLA", "SMR",
             "OKLO", "HSAI", "CRCL", "INVZ", "GOOGL", "NVTS", "FLNC", "BLSH",
             "RR", "GEMI", "HOWL", "APLD", "CYCU", "ACET",
-        ],
+        ),
         "holdings": {},  # User can add cost basis via UI
     },
     "401k": {
         "id": "401k",
         "name": "401K Portfolio",
         "description": "Retirement account holdings",
-        "symbols": [
+        "symbols": (
             "BE", "RKLB", "ASM", "CIFR", "VRT", "TSM", "SOFI", "NVDA",
             "SIL", "QBTS", "FMC", "IREN", "SKYT", "TLN", "PJP", "ALLT",
             "LPTH", "DAVE", "AUR", "SMCI", "IONQ", "BBAI", "USAS",
-        ],
+        ),
         "holdings": {},
     },
     "current-stocks": {
         "id": "current-stocks",
         "name": "Current Stocks",
         "description": "Current active holdings",
-        "symbols": [
+        "symbols": (
             "ABSI", "CRNC", "NVTS", "PDYN", "BKSY", "SES", "INOD", "RKLB",
             "IONQ", "QBTS", "RGTI", "KALU", "TTMI", "WLDN", "CMCL", "BE",
             "HL", "SA", "TSM", "WCC", "STX", "KGC", "NVDA", "IREN", "MU",
             "DLR", "CIFR", "LRCX", "VRT", "COHR", "SYM", "CRWV", "BWX",
             "OKLO", "CCJ",
-        ],
+        ),
         "holdings": {},
     },
 }
 
+PREDEFINED_PORTFOLIOS = MappingProxyType({
+    pid: Portfolio(**{**p, "holdings": MappingProxyType(p["holdings"])})
+    for pid, p in _RAW_PREDEFINED_PORTFOLIOS.items()
+})
+
 # Default custom portfolios (empty, created for new users)
 DEFAULT_CUSTOM_PORTFOLIOS = {
     "watchlist": {
@@ -1,12 +1,59 @@
 """Application configuration, default weights, and constants."""
+from __future__ import annotations
+
+import datetime as dt
+import functools
 import os
-from dotenv import load_dotenv
+import re
+from pathlib import Path
+
+import numpy as np
+
+from config import _freeze
+
+_ENV_FILE = Path(__file__).resolve().parent.parent / ".env"
+
+
+def _env_value(raw: str) -> str:
+    """A .env value: quotes stripped as a matching pair, else cut at an inline " #" comment."""
+    raw = raw.strip()
+    if raw[:1] in ("'", '"'):
+        end = raw.find(raw[0], 1)
+        if end != -1:
+            return raw[1:end]
+        return raw
+    comment = re.search(r"\s#", raw)
+    if comment:
+        raw = raw[:comment.start()]
+    return raw.strip()
+
+
+def _parse_env_file(path: Path) -> None:
+    """Minimal KEY=VALUE .env reader; existing environment variables win."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#") or "=" not in line:
+                    continue
+                key, value = line.split("=", 1)
+                key = key.strip()
+                if key.startswith("export "):
+                    key = key[len("export "):].strip()
+                os.environ.setdefault(key, _env_value(value))
+    except OSError:
+        pass
+
+
+@functools.lru_cache(maxsize=1)
+def _load_env() -> tuple[str, str]:
+    """Parse .env once per process and return (POLYGON_API_KEY, FINNHUB_API_KEY)."""
+    _parse_env_file(_ENV_FILE)
+    return os.getenv("POLYGON_API_KEY", ""), os.getenv("FINNHUB_API_KEY", "")
 
-load_dotenv()
 
 # --- API Configuration ---
-POLYGON_API_KEY = os.getenv("POLYGON_API_KEY", "")
-FINNHUB_API_KEY = os.getenv("FINNHUB_API_KEY", "")
+POLYGON_API_KEY, FINNHUB_API_KEY = _load_env()
 
 # --- Scanner Defaults ---
 SCANNER_LOOKBACK_DAYS = 200  # Days of price history for technical analysis
@@ -18,7 +65,7 @@ TOP_N_RESULTS = 100
 
 # --- Scoring Weights ---
 # Overall score composition
-SCORE_WEIGHTS = {
+SCORE_WEIGHTS = _freeze({
     "ema_alignment": 0.35,
     "institutional_flow": 0.20,
     "pre_breakout": 0.15,
@@ -26,10 +73,12 @@ SCORE_WEIGHTS = {
     "momentum_20d": 0.10,
     "volume_ratio": 0.10,
     "rsi_quality": 0.05,
-}
+})
+SCORE_WEIGHT_NAMES = tuple(SCORE_WEIGHTS)
+SCORE_WEIGHT_VEC = np.array([SCORE_WEIGHTS[k] for k in SCORE_WEIGHT_NAMES], dtype=np.float64)
 
 # Moat score factor weights (max points per factor, total = 100)
-MOAT_FACTOR_WEIGHTS = {
+MOAT_FACTOR_WEIGHTS = _freeze({
     "grossMargin": 20,
     "roe": 15,
     "revenueGrowth": 12,
@@ -38,10 +87,14 @@ MOAT_FACTOR_WEIGHTS = {
     "fcf": 8,
     "ccr": 10,
     "roic": 10,
-}
+})
+MOAT_FACTOR_NAMES = tuple(MOAT_FACTOR_WEIGHTS)
+MOAT_FACTOR_WEIGHT_VEC = np.array(
+    [MOAT_FACTOR_WEIGHTS[k] for k in MOAT_FACTOR_NAMES], dtype=np.float64
+)
 
 # Fair value sector multiples
-SECTOR_MULTIPLES = {
+SECTOR_MULTIPLES = _freeze({
     "Technology": {"pe": 28, "pb": 7.0, "ps": 6.0, "evEbitda": 18},
     "Healthcare": {"pe": 22, "pb": 4.0, "ps": 4.0, "evEbitda": 14},
     "Financial Services": {"pe": 14, "pb": 1.5, "ps": 3.0, "evEbitda": 10},
@@ -54,7 +107,14 @@ SECTOR_MULTIPLES = {
     "Basic Materials": {"pe": 15, "pb": 2.0, "ps": 1.5, "evEbitda": 8},
     "Communication Services": {"pe": 18, "pb": 3.5, "ps": 3.0, "evEbitda": 10},
     "default": {"pe": 20, "pb": 3.0, "ps": 2.5, "evEbitda": 12},
-}
+})
+# Same table as a (n_sectors, 4) matrix; rows indexed by SECTOR_MULTIPLE_ROW
+SECTOR_MULTIPLE_COLUMNS = ("pe", "pb", "ps", "evEbitda")
+SECTOR_MULTIPLE_ROW = {sector: i for i, sector in enumerate(SECTOR_MULTIPLES)}
+SECTOR_MULTIPLE_MATRIX = np.array(
+    [[m[c] for c in SECTOR_MULTIPLE_COLUMNS] for m in SECTOR_MULTIPLES.values()],
+    dtype=np.float64,
+)
 
 # SIC code to sector mapping
 SIC_SECTOR_MAP = {
@@ -74,6 +134,24 @@ SIC_SECTOR_MAP = {
     (4800, 4899): "Communication Services",
 }
 
+
+def _build_sic_table() -> tuple[np.ndarray, np.ndarray]:
+    """Flatten SIC_SECTOR_MAP into sorted breakpoints for np.searchsorted.
+
+    Ranges overlap (e.g. Real Estate sits inside Financial Services), so each
+    segment between consecutive range edges takes the sector of the first
+    matching entry in SIC_SECTOR_MAP — the same precedence as a linear scan.
+    """
+    bounds = sorted({lo for lo, _ in SIC_SECTOR_MAP} | {hi + 1 for _, hi in SIC_SECTOR_MAP})
+    sectors = [
+        next((s for (lo, hi), s in SIC_SECTOR_MAP.items() if lo <= start <= hi), "default")
+        for start in bounds
+    ]
+    return np.array(bounds, dtype=np.int32), np.array(sectors, dtype=object)
+
+
+_SIC_BOUNDS, _SIC_SECTORS = _build_sic_table()
+
 # --- Cache TTL (seconds) ---
 CACHE_TTL_TICKERS = 86400      # 24 hours
 CACHE_TTL_PRICES = 3600        # 1 hour
@@ -82,6 +160,8 @@ CACHE_TTL_NEWS = 3600          # 1 hour
 CACHE_TTL_DETAILS = 86400      # 24 hours
 CACHE_TTL_METRICS = 86400      # 24 hours
 CACHE_TTL_SCANNER = 86400      # 24 hours
+CACHE_TTL_OPTIONS = 3600       # 1 hour
+CACHE_TTL_BACKTEST_SERIES = 86400  # 24 hours
 
 # --- Sector ETF Mapping ---
 SECTOR_ETFS = {
@@ -97,6 +177,25 @@ SECTOR_ETFS = {
     "Utilities": "XLU",
     "Communication Services": "XLC",
 }
+# Normalized lookup; aliases bridge SECTOR_MULTIPLES/SIC naming ("Financial Services", "Basic Materials")
+_SECTOR_ETF_LOOKUP = {k.lower().strip(): v for k, v in SECTOR_ETFS.items()}
+_SECTOR_ETF_LOOKUP.update({
+    "financial services": "XLF",
+    "financial": "XLF",
+    "basic materials": "XLB",
+    "health care": "XLV",
+    "consumer discretionary": "XLY",
+    "consumer staples": "XLP",
+    "communications": "XLC",
+})
+
+
+def get_sector_etf(name: str | None) -> str | None:
+    """Return the SPDR sector ETF for a sector name (case-insensitive, alias-aware)."""
+    if not name:
+        return None
+    return _SECTOR_ETF_LOOKUP.get(name.lower().strip())
+
 
 # --- Persistence ---
 PERSISTENCE_DIR = "data/user"
@@ -110,30 +209,27 @@ APP_ICON = "📈"
 
 # --- Scanner Rate Limiting ---
 SCANNER_API_DELAY = 0.15  # seconds between API calls during scan
-SCANNER_BATCH_SIZE = 50   # stocks processed per batch
+SCANNER_BATCH_SIZE = 50   # candidates analyzed per progress update
+SCANNER_MAX_WORKERS = 8   # concurrent ticker fetches during scan
+SCANNER_CACHE_MAX_FAILED = 0.02  # share of failed candidates above which a scan isn't saved
 
 
-def last_market_day() -> str:
-    """Return the most recent completed US market trading day as YYYY-MM-DD.
+# Major US market holidays (month, day) — fixed-date ones
+_FIXED_HOLIDAYS = frozenset({
+    (1, 1),   # New Year's Day
+    (6, 19),  # Juneteenth
+    (7, 4),   # Independence Day
+    (12, 25), # Christmas Day
+})
 
-    Walks back from today, skipping weekends and major US holidays.
-    Always returns at least yesterday to avoid requesting intraday data
-    that the free Polygon tier cannot access.
-    """
-    import datetime as _dt
-
-    today = _dt.date.today()
 
-    # Major US market holidays (month, day) — fixed-date ones
-    _FIXED_HOLIDAYS = {
-        (1, 1),   # New Year's Day
-        (6, 19),  # Juneteenth
-        (7, 4),   # Independence Day
-        (12, 25), # Christmas Day
-    }
+@functools.lru_cache(maxsize=8)
+def _compute_last_market_day(today_ordinal: int) -> str:
+    """Walk back from the given day to the previous trading day."""
+    today = dt.date.fromordinal(today_ordinal)
 
     for days_back in range(1, 10):
-        candidate = today - _dt.timedelta(days=days_back)
+        candidate = today - dt.timedelta(days=days_back)
         # Skip weekends
         if candidate.weekday() >= 5:  # 5=Saturday, 6=Sunday
             continue
@@ -143,9 +239,20 @@ def last_market_day() -> str:
         return candidate.isoformat()
 
     # Fallback: 5 days ago
-    return (today - _dt.timedelta(days=5)).isoformat()
+    return (today - dt.timedelta(days=5)).isoformat()
+
 
+def last_market_day() -> str:
+    """Return the most recent completed US market trading day as YYYY-MM-DD.
 
+    Walks back from today, skipping weekends and major US holidays.
+    Always returns at least yesterday to avoid requesting intraday data
+    that the free Polygon tier cannot access. Memoised per calendar day.
+    """
+    return _compute_last_market_day(dt.date.today().toordinal())
+
+
+@functools.lru_cache(maxsize=4096)
 def get_sector_from_sic(sic_code: str | None) -> str:
     """Map SIC code to sector name for fair value calculations."""
     if not sic_code:
@@ -154,7 +261,16 @@ def get_sector_from_sic(sic_code: str | None) -> str:
         sic = int(sic_code)
     except (ValueError, TypeError):
         return "default"
-    for (lo, hi), sector in SIC_SECTOR_MAP.items():
-        if lo <= sic <= hi:
-            return sector
-    return "default"
+    idx = int(np.searchsorted(_SIC_BOUNDS, sic, side="right")) - 1
+    if idx < 0:
+        return "default"
+    return _SIC_SECTORS[idx]
+
+
+_DEFAULT_MULTIPLES = SECTOR_MULTIPLES["default"]
+
+
+@functools.lru_cache(maxsize=4096)
+def get_multiples_from_sic(sic_code: str | None):
+    """SECTOR_MULTIPLES entry for a SIC code ("default" when unmapped)."""
+    return SECTOR_MULTIPLES.get(get_sector_from_sic(sic_code), _DEFAULT_MULTIPLES)
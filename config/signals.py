@@ -1,7 +1,12 @@
 """Signal win rates, technical adjustments, and backtest configuration."""
+from __future__ import annotations
+
+import numpy as np
+
+from config import _freeze
 
 # Win rates by recommendation action — calibrated from backtest results
-SIGNAL_WIN_RATES = {
+SIGNAL_WIN_RATES = _freeze({
     "STRONG BUY":      {"win_rate": 0.40, "avg_return": 0.20, "hold_period": 45, "confidence": 0.80},
     "ACCUMULATE":      {"win_rate": 0.33, "avg_return": 0.15, "hold_period": 45, "confidence": 0.65},
     "BUY DIP":         {"win_rate": 0.19, "avg_return": 0.12, "hold_period": 45, "confidence": 0.55},
@@ -11,11 +16,11 @@ SIGNAL_WIN_RATES = {
     "REDUCE":          {"win_rate": 0.05, "avg_return": -0.05, "hold_period": 14, "confidence": 0.60},
     "TAKE PROFITS":    {"win_rate": 0.03, "avg_return": -0.10, "hold_period": 14, "confidence": 0.70},
     "SELL":            {"win_rate": 0.02, "avg_return": -0.15, "hold_period": 7,  "confidence": 0.75},
-}
+})
 
 # Technical adjustments applied to base win rate
 # Each key has a description of the condition, the adjustment value, and a display label
-TECHNICAL_ADJUSTMENTS = {
+TECHNICAL_ADJUSTMENTS = _freeze({
     "ema_high": {
         "description": "EMA Score >= 70",
         "adjustment": 0.085,
@@ -56,10 +61,18 @@ TECHNICAL_ADJUSTMENTS = {
         "adjustment": 0.03,
         "label": "Squeeze Setup",
     },
-}
+})
+
+# Rule table view of TECHNICAL_ADJUSTMENTS — column order for vectorized scoring
+TECHNICAL_ADJUSTMENT_KEYS = tuple(TECHNICAL_ADJUSTMENTS)
+TECHNICAL_ADJUSTMENT_LABELS = tuple(TECHNICAL_ADJUSTMENTS[k]["label"] for k in TECHNICAL_ADJUSTMENT_KEYS)
+TECHNICAL_ADJUSTMENT_VEC = np.array(
+    [TECHNICAL_ADJUSTMENTS[k]["adjustment"] for k in TECHNICAL_ADJUSTMENT_KEYS],
+    dtype=np.float64,
+)
 
 # 110-stock universe for backtesting — diverse sectors, sufficient volume
-BACKTEST_UNIVERSE = [
+BACKTEST_UNIVERSE = (
     # Tech (20)
     "AAPL", "MSFT", "GOOGL", "AMZN", "META", "NVDA", "AMD", "INTC", "CRM", "ORCL",
     "ADBE", "NOW", "SNOW", "PLTR", "NET", "DDOG", "ZS", "CRWD", "PANW", "FTNT",
@@ -81,14 +94,17 @@ BACKTEST_UNIVERSE = [
     "FCX", "NEM", "VALE", "RIO", "BHP", "CLF", "X", "NUE", "STLD", "AA",
     # Recent IPOs / High Volatility (10)
     "RIVN", "LCID", "TSLA", "NIO", "XPEV", "LI", "FSR", "ARVL", "GOEV", "WKHS",
-]
+)
+BACKTEST_UNIVERSE_SET = frozenset(BACKTEST_UNIVERSE)
 
 # Backtest configuration defaults
-BACKTEST_CONFIG = {
+BACKTEST_CONFIG = _freeze({
     "holding_period_days": 60,
     "target_percent": 10,     # +10% target
     "stop_percent": 15,       # -15% stop loss
     "min_overall_score": 15,
     "min_pre_breakout_score": 10,
     "min_bars_required": 50,  # Minimum historical bars needed
-}
+    "min_price": 0,           # Last-session close pre-filter (0 = off)
+    "min_volume": 0,          # Last-session volume pre-filter (0 = off)
+})
@@ -1,10 +1,13 @@
 """Sector watchlists and scanner filter presets."""
+from __future__ import annotations
+
+from types import MappingProxyType
 
 SECTOR_WATCHLISTS = {
     "ai-datacenter": {
         "name": "AI & Data Center Power",
         "description": "AI chips, data center infrastructure, and power utilities",
-        "symbols": [
+        "symbols": (
             "NVDA", "AMD", "AVGO", "MRVL", "ARM", "INTC", "QCOM", "MU",
             "SMCI", "DELL", "HPE", "ANET", "CSCO", "JNPR", "NTAP", "PSTG",
             "AMZN", "MSFT", "GOOGL", "META", "ORCL", "CRM", "NOW",
@@ -14,86 +17,102 @@ SECTOR_WATCHLISTS = {
             "TT", "LII", "CARR", "JCI",
             "ROK", "EMR", "AME", "HUBB", "AOS",
             "PLTR", "AI", "PATH", "SNOW", "DDOG", "MDB", "NET",
-        ],
+        ),
     },
     "semiconductors": {
         "name": "Semiconductors",
         "description": "Chip makers and semiconductor equipment",
-        "symbols": [
+        "symbols": (
             "NVDA", "AMD", "AVGO", "QCOM", "TXN", "ADI", "MRVL", "NXPI",
             "ON", "MCHP", "SWKS", "QRVO", "MPWR", "LSCC", "SLAB",
             "ASML", "AMAT", "LRCX", "KLAC", "TER", "ENTG", "MKSI",
-        ],
+        ),
     },
     "mag7": {
         "name": "Magnificent 7",
         "description": "Mega-cap tech leaders",
-        "symbols": ["AAPL", "MSFT", "GOOGL", "AMZN", "NVDA", "META", "TSLA"],
+        "symbols": ("AAPL", "MSFT", "GOOGL", "AMZN", "NVDA", "META", "TSLA"),
     },
     "fintech": {
         "name": "Fintech & Payments",
         "description": "Payment processors and financial technology",
-        "symbols": [
+        "symbols": (
             "V", "MA", "PYPL", "SQ", "COIN", "AFRM", "SOFI", "HOOD",
             "FIS", "FISV", "GPN", "ADP", "INTU", "BILL",
-        ],
+        ),
     },
     "biotech": {
         "name": "Biotech & Pharma",
         "description": "Biotechnology and pharmaceutical companies",
-        "symbols": [
+        "symbols": (
             "LLY", "NVO", "ABBV", "MRK", "PFE", "BMY", "AMGN", "GILD",
             "REGN", "VRTX", "BIIB", "MRNA", "ISRG", "TMO", "DHR",
-        ],
+        ),
     },
     "smallcap-momentum": {
         "name": "Small-Cap Momentum",
         "description": "High-volatility small caps with breakout potential",
-        "symbols": [
+        "symbols": (
             "EKSO", "FONR", "ONTF", "MBOT", "APVO", "CAPR", "MYO",
             "KTOS", "RKLB", "ASTS", "LUNR", "RDW", "SPCE",
             "JOBY", "ACHR", "LILM", "EVTL", "BLDE",
             "IONQ", "RGTI", "QUBT", "QBTS", "ARQQ",
-        ],
+        ),
     },
     "ma-targets": {
         "name": "M&A Target Profile",
         "description": "Small-caps with acquisition target characteristics",
-        "symbols": [
+        "symbols": (
             "EKSO", "FONR", "ONTF", "MBOT", "STXS", "ANGO", "ATRC",
             "PRAX", "RARE", "CORT", "FULC", "ARDX", "RETA",
             "SPNS", "CXM", "PRFT", "FRSH", "BRZE",
-        ],
+        ),
     },
     "healthcare-gov": {
         "name": "Healthcare (Gov Aligned)",
         "description": "Healthcare companies with government contract exposure",
-        "symbols": [
+        "symbols": (
             "LLY", "UNH", "JNJ", "ABBV", "MRK", "PFE", "TMO", "ISRG",
             "MOH", "CNC", "HUM",
-        ],
+        ),
     },
     "infrastructure": {
         "name": "Infrastructure & Construction",
         "description": "Infrastructure, construction, and heavy equipment companies",
-        "symbols": [
+        "symbols": (
             "CAT", "DE", "URI", "VMC", "MLM", "PWR", "EME",
             "STRL", "GVA", "PRIM", "ACM",
-        ],
+        ),
     },
     "reshoring": {
         "name": "Reshoring & Manufacturing",
         "description": "Domestic manufacturing, industrial automation, and reshoring beneficiaries",
-        "symbols": [
+        "symbols": (
             "GE", "HON", "MMM", "EMR", "ROK", "FAST", "SWK",
             "PH", "DOV", "ITW", "CMI",
-        ],
+        ),
     },
 }
 
+for _watchlist in SECTOR_WATCHLISTS.values():
+    _watchlist["symbols_set"] = frozenset(_watchlist["symbols"])
+
+# Watchlist key -> membership set, and the inverse ticker -> watchlist keys
+SECTOR_WATCHLIST_SETS: dict[str, frozenset[str]] = {
+    key: wl["symbols_set"] for key, wl in SECTOR_WATCHLISTS.items()
+}
+_ticker_watchlists: dict[str, set[str]] = {}
+for _key, _watchlist in SECTOR_WATCHLISTS.items():
+    for _sym in _watchlist["symbols"]:
+        _ticker_watchlists.setdefault(_sym, set()).add(_key)
+TICKER_TO_WATCHLISTS: dict[str, frozenset[str]] = {
+    sym: frozenset(keys) for sym, keys in _ticker_watchlists.items()
+}
+del _ticker_watchlists
+
 
 # Sector ETF mapping — maps individual tickers to their sector ETF
-SECTOR_ETF_MAP = {
+SECTOR_ETF_MAP = MappingProxyType({
     # Technology
     "AAPL": "XLK", "MSFT": "XLK", "GOOGL": "XLK", "GOOG": "XLK", "META": "XLK", "NVDA": "XLK",
     "AVGO": "XLK", "ORCL": "XLK", "CRM": "XLK", "ADBE": "XLK", "CSCO": "XLK", "ACN": "XLK",
@@ -149,8 +168,19 @@ SECTOR_ETF_MAP = {
     "CEG": "XLU", "VST": "XLU", "NRG": "XLU", "TLN": "XLU", "ETN": "XLU", "POWL": "XLU",
     "GEV": "XLU", "VRT": "XLU", "OKLO": "XLU", "SMR": "XLU", "NNE": "XLU",
     "BE": "XLU", "FLNC": "XLU",
+})
+
+# Reverse index: sector ETF -> tickers mapped to it
+SECTOR_MEMBERS: dict[str, frozenset[str]] = {
+    etf: frozenset(t for t, e in SECTOR_ETF_MAP.items() if e == etf)
+    for etf in set(SECTOR_ETF_MAP.values())
 }
 
+
+def etf_for(ticker: str, default: str = "SPY") -> str:
+    """Return the sector ETF a ticker is mapped to, or ``default`` if unmapped."""
+    return SECTOR_ETF_MAP.get(ticker.upper(), default)
+
 SECTOR_NAMES = {
     "XLK": "Technology",
     "XLC": "Communication",
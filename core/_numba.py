@@ -0,0 +1,12 @@
+"""Optional numba import shared by the compiled kernel modules.
+
+Without numba, HAVE_NUMBA is False, njit is None and prange is range, so the
+kernels' loop versions still run as plain Python.
+"""
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:  # numba is an optional speed-up
+    njit = None
+    prange = range
+    HAVE_NUMBA = False
@@ -1,19 +1,61 @@
 """Historical backtesting engine — validates scoring strategy on past data."""
 
 import datetime as dt
-import time
+from typing import NamedTuple
 
+import numpy as np
 import pandas as pd
 
-from config.signals import BACKTEST_UNIVERSE, BACKTEST_CONFIG
-from config.settings import last_market_day, SCANNER_API_DELAY
-from core.technicals import calculate_all_technicals
+from config.signals import BACKTEST_UNIVERSE, BACKTEST_CONFIG, BACKTEST_UNIVERSE_SET
+from config.settings import CACHE_TTL_BACKTEST_SERIES, last_market_day
+from core.technicals import ema_score_series, precompute_series_indicators, technicals_at
 from core.scoring import (
+    OVERALL_SCORE_COLUMNS,
     calculate_institutional_flow,
     calculate_breakout_score,
     calculate_overall_score,
+    overall_score_inputs,
+    overall_scores_batch,
 )
-from core.recommendations import generate_recommendation
+from core.backtesting_kernels import (
+    OUTCOME_LOSS, OUTCOME_NAMES, OUTCOME_TIMEOUT, OUTCOME_WIN, forward_scan,
+)
+from core.recommendations import ACTION_CONFIDENCE, classify_action
+from data.cache import get_cached, set_cached
+
+
+class Trade(NamedTuple):
+    """One simulated backtest trade."""
+
+    ticker: str
+    entry_date: str
+    entry_price: float
+    action: str
+    confidence: str
+    overall_score: float
+    ema_score: float
+    rsi: float
+    institutional_score: float
+    breakout_score: float
+    bollinger_squeeze: bool
+    outcome: str
+    exit_price: float
+    return_pct: float
+    days_held: int
+    max_favorable: float
+    max_adverse: float
+
+
+TRADE_COLUMNS = Trade._fields
+
+# Buy-side actions that open a simulated trade
+BUY_ACTIONS = ("STRONG BUY", "ACCUMULATE", "BUY DIP", "SPECULATIVE BUY")
+_BUY_ACTION_SET = frozenset(BUY_ACTIONS)
+
+# Outcome / action columns of the trades frame are categoricals, so
+# comparisons and groupbys run on small integer codes instead of strings
+_OUTCOME_DTYPE = pd.CategoricalDtype(OUTCOME_NAMES)
+_ACTION_DTYPE = pd.CategoricalDtype(BUY_ACTIONS)
 
 
 def run_backtest(
@@ -33,127 +75,227 @@ def run_backtest(
         progress_callback: Callable(current, total, message).
 
     Returns:
-        Dict with 'trades', 'summary', 'factor_analysis', 'action_breakdown'.
+        Dict with 'universe_size', 'trades' (list of Trade), 'trades_df', 'summary',
+        'factor_analysis', 'action_breakdown'.
     """
     cfg = {**BACKTEST_CONFIG, **(config or {})}
-    universe = BACKTEST_UNIVERSE
-    total = len(universe)
-
-    holding_days = cfg["holding_period_days"]
-    target_pct = cfg["target_percent"]
-    stop_pct = cfg["stop_percent"]
-    min_score = cfg["min_overall_score"]
-    min_bars = cfg.get("min_bars_required", 50)
 
     today = dt.date.today()
     market_day = last_market_day()
     from_date = (today - dt.timedelta(days=500)).isoformat()
     to_date = market_day
 
-    trades = []
+    universe = _prefilter_universe(polygon, market_day, cfg)
+    total = len(universe)
+
+    # Prefetch every ticker's history up front, then walk locally
+    if progress_callback:
+        progress_callback(0, total, f"Fetching price history for {total} tickers...")
+    frames = polygon.get_aggregates_many(universe, from_date, to_date)
+
+    min_len = cfg.get("min_bars_required", 50) + cfg["holding_period_days"]
+    records: list[Trade] = []
 
     for idx, ticker in enumerate(universe):
         if progress_callback and idx % 5 == 0:
             progress_callback(
                 idx, total,
-                f"Backtesting {ticker}... ({len(trades)} trades found)"
+                f"Backtesting {ticker}... ({len(records)} trades found)"
             )
 
-        try:
-            df = polygon.get_aggregates(ticker, from_date, to_date)
-            if df.empty or len(df) < min_bars + holding_days:
-                continue
+        df = frames.get(ticker)
+        if df is None or df.empty or len(df) < min_len:
+            continue
+        series_key = f"bt_series_{ticker}_{from_date}_{to_date}_{len(df)}"
+        records.extend(_walk_signals(ticker, df, cfg, series_key))
 
-            # Walk through the data, checking for signals
-            # Use a step of 5 (weekly) to avoid too many correlated signals
-            for i in range(min_bars, len(df) - holding_days, 5):
-                # Calculate technicals up to this point
-                window = df.iloc[:i + 1].copy()
-                if len(window) < 30:
-                    continue
+    if progress_callback:
+        progress_callback(total, total, f"Backtest complete! {len(records)} trades evaluated.")
 
-                technicals = calculate_all_technicals(window)
-                if not technicals:
-                    continue
+    # Analyze results
+    trades_df = _trades_frame(records)
+    summary, factor_analysis, action_breakdown = _aggregate_trades(trades_df)
+
+    return {
+        "universe_size": total,
+        "trades": records,
+        "trades_df": trades_df,
+        "summary": summary,
+        "factor_analysis": factor_analysis,
+        "action_breakdown": action_breakdown,
+    }
+
+
+def _prefilter_universe(polygon, market_day: str, cfg: dict) -> tuple[str, ...]:
+    """Drop universe tickers below the min_price / min_volume config.
+
+    Uses one grouped-daily request for the last market day, so histories are
+    only fetched for tickers that pass. Falls back to the full universe when
+    both filters are off or grouped data is unavailable.
+    """
+    min_price = cfg.get("min_price", 0) or 0
+    min_volume = cfg.get("min_volume", 0) or 0
+    if not (min_price or min_volume):
+        return BACKTEST_UNIVERSE
+
+    try:
+        grouped = polygon.get_grouped_daily(market_day)
+    except Exception:
+        return BACKTEST_UNIVERSE
+    if grouped.empty:
+        return BACKTEST_UNIVERSE
+
+    passing = grouped.loc[
+        (grouped["close"] >= min_price) & (grouped["volume"] >= min_volume),
+        "ticker",
+    ]
+    keep = BACKTEST_UNIVERSE_SET.intersection(passing)
+    return tuple(t for t in BACKTEST_UNIVERSE if t in keep)
+
+
+def _walk_signals(
+    ticker: str,
+    df: pd.DataFrame,
+    cfg: dict,
+    series_key: str | None = None,
+) -> list[Trade]:
+    """Walk a ticker's history for buy signals and simulate each trade.
 
-                score = technicals.get("ema_score", 0)
+    A failure part-way through keeps the trades found up to that point.
+    """
+    holding_days = cfg["holding_period_days"]
+    target_pct = cfg["target_percent"]
+    stop_pct = cfg["stop_percent"]
+    min_score = cfg["min_overall_score"]
+    min_bars = cfg.get("min_bars_required", 50)
+
+    trades: list[Trade] = []
+    try:
+        # Contiguous OHLC arrays, extracted once per ticker
+        arrs = {c: df[c].to_numpy(dtype=np.float64) for c in ("high", "low", "close")}
+        # Indicator series computed once (or loaded from the disk cache);
+        # sampled per signal bar below
+        series, ema_scores = _load_series(df, series_key)
+        # Entry-date strings formatted once per ticker, in str(Timestamp) form
+        dates = df["date"]
+        if dates.dtype.kind == "M":
+            date_strs = dates.dt.strftime("%Y-%m-%d %H:%M:%S").to_numpy()
+        else:
+            date_strs = dates.astype(str).to_numpy()
+
+        # Walk through the data, checking for signals
+        # Use a step of 5 (weekly) to avoid too many correlated signals
+        steps = np.arange(min_bars, len(df) - holding_days, 5)
+        # Quick filter up front: only bars with 30+ bars of history whose EMA
+        # score suggests potential are evaluated
+        steps = steps[(steps + 1 >= 30) & (ema_scores[steps] >= min_score)]
+
+        signals = []
+        for i in steps.tolist():
+            # Technicals as of this bar, sampled from the precomputed series
+            technicals = technicals_at(series, i)
+            if not technicals:
+                continue
 
-                # Quick filter: only evaluate if EMA score suggests potential
-                if score < min_score:
-                    continue
+            # Flow and breakout scoring read at most the last 30 bars and never
+            # mutate their input, so a 30-bar view replaces a full-history copy
+            window = df.iloc[i - 29:i + 1]
 
+            try:
                 inst_flow = calculate_institutional_flow(window)
                 breakout = calculate_breakout_score(window, technicals)
-                overall = calculate_overall_score(technicals, inst_flow, breakout)
-
-                overall_score = overall.get("score", 0)
-                if overall_score < min_score:
-                    continue
-
-                # Generate recommendation for this point
-                stock_data = {
-                    "score": overall_score,
-                    "ema_score": technicals.get("ema_score", 0),
-                    "rsi": technicals.get("rsi", 50),
-                    "institutional_score": inst_flow.get("score", 50),
-                    "breakout_score": breakout.get("score", 0),
-                    "momentum_5d": technicals.get("momentum_5d", 0),
-                    "momentum_20d": technicals.get("momentum_20d", 0),
-                    "bollinger_squeeze": technicals.get("bollinger_squeeze", False),
-                }
-                rec = generate_recommendation(stock_data)
-                action = rec["action"]
-
-                # Only test buy-side signals
-                if action not in ("STRONG BUY", "ACCUMULATE", "BUY DIP", "SPECULATIVE BUY"):
-                    continue
-
-                # Check forward performance
-                entry_price = float(df.iloc[i]["close"])
-                forward = check_forward_performance(
-                    df, i, entry_price, target_pct, stop_pct, holding_days
-                )
-
-                trade = {
-                    "ticker": ticker,
-                    "entry_date": str(df.iloc[i]["date"]),
-                    "entry_price": entry_price,
-                    "action": action,
-                    "confidence": rec["confidence"],
-                    "overall_score": overall_score,
-                    "ema_score": technicals.get("ema_score", 0),
-                    "rsi": technicals.get("rsi", 50),
-                    "institutional_score": inst_flow.get("score", 50),
-                    "breakout_score": breakout.get("score", 0),
-                    "bollinger_squeeze": technicals.get("bollinger_squeeze", False),
-                    **forward,
-                }
-                trades.append(trade)
-
-            # Rate limiting
-            time.sleep(SCANNER_API_DELAY)
+            except Exception:
+                break  # still trade the bars scored before the failure
+            signals.append((i, technicals, inst_flow, breakout))
 
+        # Overall scores for every signal bar in one vectorized pass. If any
+        # bar cannot be scored, score bar by bar instead, so the walk still
+        # stops at the failing bar rather than losing the whole ticker
+        try:
+            overall_scores = overall_scores_batch(pd.DataFrame(
+                [overall_score_inputs(t, f, b) for _, t, f, b in signals],
+                columns=OVERALL_SCORE_COLUMNS,
+            )).tolist()
         except Exception:
-            continue
+            overall_scores = [None] * len(signals)
 
-    if progress_callback:
-        progress_callback(total, total, f"Backtest complete! {len(trades)} trades evaluated.")
+        for (i, technicals, inst_flow, breakout), overall_score in zip(signals, overall_scores):
+            if overall_score is None:
+                overall_score = calculate_overall_score(technicals, inst_flow, breakout).get("score", 0)
+            if overall_score < min_score:
+                continue
 
-    # Analyze results
-    summary = _calculate_summary(trades)
-    factor_analysis = _analyze_factors(trades)
-    action_breakdown = _breakdown_by_action(trades)
+            ema_score = technicals.get("ema_score", 0)
+            rsi = technicals.get("rsi", 50)
+            inst_score = inst_flow.get("score", 50)
+
+            # Recommendation level for this point (memoized on threshold bands)
+            action = classify_action(
+                overall_score or 0,
+                ema_score or 0,
+                inst_score,
+                rsi or 50,
+                technicals.get("momentum_20d", 0) or 0,
+            )
 
-    return {
-        "trades": trades,
-        "summary": summary,
-        "factor_analysis": factor_analysis,
-        "action_breakdown": action_breakdown,
-    }
+            # Only test buy-side signals
+            if action not in _BUY_ACTION_SET:
+                continue
+
+            # Check forward performance
+            entry_price = float(arrs["close"][i])
+            forward = check_forward_performance(
+                arrs, i, entry_price, target_pct, stop_pct, holding_days
+            )
+
+            trades.append(Trade(
+                ticker,
+                date_strs[i],
+                entry_price,
+                action,
+                ACTION_CONFIDENCE[action],
+                overall_score,
+                ema_score,
+                rsi,
+                inst_score,
+                breakout.get("score", 0),
+                technicals.get("bollinger_squeeze", False),
+                forward["outcome"],
+                forward["exit_price"],
+                forward["return_pct"],
+                forward["days_held"],
+                forward["max_favorable"],
+                forward["max_adverse"],
+            ))
+    except Exception:
+        pass
+
+    return trades
+
+
+def _load_series(
+    df: pd.DataFrame,
+    cache_key: str | None,
+) -> tuple[dict[str, np.ndarray], np.ndarray]:
+    """Indicator series and per-bar EMA scores for a ticker's history.
+
+    Results are stored in the pickle disk cache under cache_key, which should
+    identify the exact price history (ticker, date range and bar count).
+    """
+    if cache_key:
+        cached = get_cached(cache_key, ttl=CACHE_TTL_BACKTEST_SERIES, fmt="pickle")
+        if cached is not None:
+            return cached
+
+    series = precompute_series_indicators(df)
+    result = (series, ema_score_series(series))
+    if cache_key:
+        set_cached(cache_key, result, fmt="pickle")
+    return result
 
 
 def check_forward_performance(
-    df: pd.DataFrame,
+    arrs: dict[str, np.ndarray],
     signal_idx: int,
     entry_price: float,
     target_pct: float,
@@ -163,7 +305,7 @@ def check_forward_performance(
     """Simulate forward from a signal point.
 
     Args:
-        df: Full OHLCV DataFrame.
+        arrs: Full-history "high", "low" and "close" float arrays.
         signal_idx: Index of the signal bar.
         entry_price: Entry price.
         target_pct: Target return percentage (e.g., 10 for +10%).
@@ -173,42 +315,12 @@ def check_forward_performance(
     Returns:
         Dict with outcome, exit_price, return_pct, days_held, max_favorable, max_adverse.
     """
-    target_price = entry_price * (1 + target_pct / 100)
-    stop_price = entry_price * (1 - stop_pct / 100)
-
-    max_favorable = 0.0
-    max_adverse = 0.0
-    exit_price = entry_price
-    days_held = 0
-    outcome = "TIMEOUT"
-
-    end_idx = min(signal_idx + max_days + 1, len(df))
-
-    for j in range(signal_idx + 1, end_idx):
-        high = float(df.iloc[j]["high"])
-        low = float(df.iloc[j]["low"])
-        close = float(df.iloc[j]["close"])
-        days_held = j - signal_idx
-
-        # Track max favorable / adverse excursion
-        favorable = ((high - entry_price) / entry_price) * 100
-        adverse = ((entry_price - low) / entry_price) * 100
-        max_favorable = max(max_favorable, favorable)
-        max_adverse = max(max_adverse, adverse)
-
-        # Check stop hit first (worst case)
-        if low <= stop_price:
-            outcome = "LOSS"
-            exit_price = stop_price
-            break
-
-        # Check target hit
-        if high >= target_price:
-            outcome = "WIN"
-            exit_price = target_price
-            break
-
-        exit_price = close
+    code, exit_price, days_held, max_favorable, max_adverse = forward_scan(
+        arrs["high"], arrs["low"], arrs["close"],
+        signal_idx, entry_price, target_pct, stop_pct, max_days,
+    )
+    outcome = OUTCOME_NAMES[code]
+    exit_price = float(exit_price)
 
     return_pct = ((exit_price - entry_price) / entry_price) * 100
 
@@ -222,88 +334,82 @@ def check_forward_performance(
     }
 
 
-def _calculate_summary(trades: list) -> dict:
-    """Calculate aggregate statistics from trades."""
-    if not trades:
-        return {
-            "total_trades": 0, "wins": 0, "losses": 0, "timeouts": 0,
-            "win_rate": 0, "avg_return": 0, "profit_factor": 0,
-            "avg_days_held": 0, "best_trade": 0, "worst_trade": 0,
-        }
-
-    wins = [t for t in trades if t["outcome"] == "WIN"]
-    losses = [t for t in trades if t["outcome"] == "LOSS"]
-    timeouts = [t for t in trades if t["outcome"] == "TIMEOUT"]
-
-    returns = [t["return_pct"] for t in trades]
-    win_returns = [t["return_pct"] for t in wins]
-    loss_returns = [abs(t["return_pct"]) for t in losses]
-
-    profit_factor = (
-        sum(win_returns) / sum(loss_returns) if loss_returns else float("inf")
+def _trades_frame(records: list[Trade]) -> pd.DataFrame:
+    """Trades as a DataFrame with categorical outcome and action columns."""
+    return pd.DataFrame(records, columns=TRADE_COLUMNS).astype(
+        {"outcome": _OUTCOME_DTYPE, "action": _ACTION_DTYPE}
     )
 
-    return {
-        "total_trades": len(trades),
-        "wins": len(wins),
-        "losses": len(losses),
-        "timeouts": len(timeouts),
-        "win_rate": len(wins) / len(trades) * 100 if trades else 0,
-        "avg_return": sum(returns) / len(returns) if returns else 0,
-        "profit_factor": round(profit_factor, 2),
-        "avg_days_held": sum(t["days_held"] for t in trades) / len(trades),
-        "best_trade": max(returns) if returns else 0,
-        "worst_trade": min(returns) if returns else 0,
-    }
-
 
-def _analyze_factors(trades: list) -> dict:
-    """Analyze which factors correlate with wins vs losses."""
-    if not trades:
-        return {}
+_FACTORS = ["overall_score", "ema_score", "rsi", "institutional_score", "breakout_score"]
 
-    factors = ["overall_score", "ema_score", "rsi", "institutional_score", "breakout_score"]
-    result = {}
 
-    for factor in factors:
-        wins = [t[factor] for t in trades if t["outcome"] == "WIN" and factor in t]
-        losses = [t[factor] for t in trades if t["outcome"] == "LOSS" and factor in t]
+def _aggregate_trades(trades_df: pd.DataFrame) -> tuple[dict, dict, dict]:
+    """Summary stats, factor analysis and per-action breakdown via groupby.
 
-        avg_win = sum(wins) / len(wins) if wins else 0
-        avg_loss = sum(losses) / len(losses) if losses else 0
+    Returns:
+        (summary, factor_analysis, action_breakdown)
+    """
+    if trades_df.empty:
+        summary = {
+            "total_trades": 0, "wins": 0, "losses": 0, "timeouts": 0,
+            "win_rate": 0, "avg_return": 0, "profit_factor": 0,
+            "avg_days_held": 0, "best_trade": 0, "worst_trade": 0,
+        }
+        return summary, {}, {}
+
+    # Masked reductions over the column arrays; no filtered copies are built
+    n = len(trades_df)
+    returns = trades_df["return_pct"].to_numpy(dtype=np.float64)
+    outcomes = trades_df["outcome"].cat.codes.to_numpy()
+    is_win = outcomes == OUTCOME_WIN
+    is_loss = outcomes == OUTCOME_LOSS
+    wins = int(is_win.sum())
+    losses = int(is_loss.sum())
+
+    win_sum = float(np.sum(returns, where=is_win))
+    loss_sum = float(np.sum(np.abs(returns), where=is_loss))
+    profit_factor = win_sum / loss_sum if losses else float("inf")
+
+    summary = {
+        "total_trades": n,
+        "wins": wins,
+        "losses": losses,
+        "timeouts": int((outcomes == OUTCOME_TIMEOUT).sum()),
+        "win_rate": wins / n * 100,
+        "avg_return": float(returns.mean()),
+        "profit_factor": round(profit_factor, 2),
+        "avg_days_held": float(trades_df["days_held"].mean()),
+        "best_trade": float(returns.max()),
+        "worst_trade": float(returns.min()),
+    }
 
-        result[factor] = {
+    means = trades_df.groupby("outcome", observed=True)[_FACTORS].mean()
+    factor_analysis = {}
+    for f in _FACTORS:
+        avg_win = float(means.at["WIN", f]) if "WIN" in means.index else 0
+        avg_loss = float(means.at["LOSS", f]) if "LOSS" in means.index else 0
+        factor_analysis[f] = {
             "avg_in_wins": round(avg_win, 1),
             "avg_in_losses": round(avg_loss, 1),
             "differential": round(avg_win - avg_loss, 1),
         }
 
-    return result
-
-
-def _breakdown_by_action(trades: list) -> dict:
-    """Breakdown win rates by action level."""
-    if not trades:
-        return {}
-
-    actions = {}
-    for trade in trades:
-        action = trade.get("action", "UNKNOWN")
-        if action not in actions:
-            actions[action] = {"trades": [], "wins": 0, "total": 0}
-        actions[action]["trades"].append(trade)
-        actions[action]["total"] += 1
-        if trade["outcome"] == "WIN":
-            actions[action]["wins"] += 1
-
-    result = {}
-    for action, data in actions.items():
-        returns = [t["return_pct"] for t in data["trades"]]
-        result[action] = {
-            "total": data["total"],
-            "wins": data["wins"],
-            "win_rate": data["wins"] / data["total"] * 100 if data["total"] else 0,
-            "avg_return": sum(returns) / len(returns) if returns else 0,
+    by_action = trades_df.assign(is_win=is_win).groupby(
+        "action", observed=True, sort=False
+    ).agg(
+        total=("ticker", "size"),
+        wins=("is_win", "sum"),
+        avg_return=("return_pct", "mean"),
+    )
+    action_breakdown = {
+        action: {
+            "total": int(row.total),
+            "wins": int(row.wins),
+            "win_rate": row.wins / row.total * 100,
+            "avg_return": float(row.avg_return),
         }
+        for action, row in by_action.iterrows()
+    }
 
-    return result
+    return summary, factor_analysis, action_breakdown
@@ -0,0 +1,100 @@
+"""Compiled inner loops for the backtester (numba optional).
+
+With numba installed, forward_scan() is an @njit scalar loop; without it the
+vectorized NumPy version below is used. Both return identical results.
+"""
+import numpy as np
+
+from core._numba import HAVE_NUMBA, njit
+
+OUTCOME_TIMEOUT = 0
+OUTCOME_WIN = 1
+OUTCOME_LOSS = 2
+OUTCOME_NAMES = ("TIMEOUT", "WIN", "LOSS")
+
+
+def _forward_scan_loop(highs, lows, closes, signal_idx, entry_price,
+                       target_pct, stop_pct, max_days):
+    """Bar-by-bar forward simulation; compiled with numba when available.
+
+    Returns:
+        (outcome_code, exit_price, days_held, max_favorable, max_adverse)
+    """
+    target_price = entry_price * (1 + target_pct / 100)
+    stop_price = entry_price * (1 - stop_pct / 100)
+
+    max_favorable = 0.0
+    max_adverse = 0.0
+    exit_price = entry_price
+    days_held = 0
+    outcome = OUTCOME_TIMEOUT
+
+    end_idx = min(signal_idx + max_days + 1, len(closes))
+    for j in range(signal_idx + 1, end_idx):
+        high = highs[j]
+        low = lows[j]
+        days_held = j - signal_idx
+
+        favorable = ((high - entry_price) / entry_price) * 100
+        adverse = ((entry_price - low) / entry_price) * 100
+        if favorable > max_favorable:
+            max_favorable = favorable
+        if adverse > max_adverse:
+            max_adverse = adverse
+
+        # Check stop hit first (worst case)
+        if low <= stop_price:
+            outcome = OUTCOME_LOSS
+            exit_price = stop_price
+            break
+
+        if high >= target_price:
+            outcome = OUTCOME_WIN
+            exit_price = target_price
+            break
+
+        exit_price = closes[j]
+
+    return outcome, exit_price, days_held, max_favorable, max_adverse
+
+
+def _forward_scan_numpy(highs, lows, closes, signal_idx, entry_price,
+                        target_pct, stop_pct, max_days):
+    """Vectorized forward simulation; same contract as _forward_scan_loop."""
+    target_price = entry_price * (1 + target_pct / 100)
+    stop_price = entry_price * (1 - stop_pct / 100)
+
+    end_idx = min(signal_idx + max_days + 1, len(closes))
+    highs = highs[signal_idx + 1:end_idx]
+    lows = lows[signal_idx + 1:end_idx]
+    if len(highs) == 0:
+        return OUTCOME_TIMEOUT, entry_price, 0, 0.0, 0.0
+
+    # First bar touching the stop or the target; stop wins ties (worst case)
+    hits = np.flatnonzero((lows <= stop_price) | (highs >= target_price))
+    if len(hits):
+        last = int(hits[0])
+        if lows[last] <= stop_price:
+            outcome, exit_price = OUTCOME_LOSS, stop_price
+        else:
+            outcome, exit_price = OUTCOME_WIN, target_price
+    else:
+        last = len(highs) - 1
+        outcome, exit_price = OUTCOME_TIMEOUT, float(closes[signal_idx + 1 + last])
+
+    # Max favorable / adverse excursion up to and including the exit bar;
+    # NaN bars are skipped, as the loop's comparisons skip them
+    held_highs = highs[:last + 1]
+    held_lows = lows[:last + 1]
+    max_favorable = max_adverse = 0.0
+    if not np.isnan(held_highs).all():
+        max_favorable = max(0.0, ((float(np.nanmax(held_highs)) - entry_price) / entry_price) * 100)
+    if not np.isnan(held_lows).all():
+        max_adverse = max(0.0, ((entry_price - float(np.nanmin(held_lows))) / entry_price) * 100)
+    return outcome, exit_price, last + 1, max_favorable, max_adverse
+
+
+if HAVE_NUMBA:
+    forward_scan = njit(cache=True)(_forward_scan_loop)
+else:
+    forward_scan = _forward_scan_numpy
@@ -1,12 +1,27 @@
 """Fundamental analysis — Moat score, Fair value, Growth score, Derived metrics."""
+import bisect
 import math
-from config.settings import MOAT_FACTOR_WEIGHTS, SECTOR_MULTIPLES, get_sector_from_sic
+
+import numpy as np
+
+from config.settings import (
+    MOAT_FACTOR_NAMES,
+    MOAT_FACTOR_WEIGHT_VEC,
+    MOAT_FACTOR_WEIGHTS,
+    get_multiples_from_sic,
+)
 
 
 # ------------------------------------------------------------------
 # Process raw financial statements into computed metrics
 # ------------------------------------------------------------------
 
+def _num(record: dict, key: str) -> float:
+    """Numeric field as a float, 0.0 when missing, None or zero."""
+    value = record.get(key)
+    return float(value) if value else 0.0
+
+
 def process_financials(raw_financials: list[dict], finnhub_metrics: dict) -> dict:
     """Convert raw Polygon financial statements into computed ratios.
 
@@ -49,9 +64,10 @@ def process_financials(raw_financials: list[dict], finnhub_metrics: dict) -> dic
     }
 
     # --- Total Debt ---
-    long_term = latest.get("long_term_debt") or 0
-    short_term = latest.get("debt_current") or 0
-    result["total_debt"] = (long_term + short_term) or None
+    long_term = _num(latest, "long_term_debt")
+    short_term = _num(latest, "debt_current")
+    total_debt = long_term + short_term
+    result["total_debt"] = total_debt or None
 
     # --- Margins ---
     revenue = latest.get("revenues")
@@ -82,8 +98,8 @@ def process_financials(raw_financials: list[dict], finnhub_metrics: dict) -> dic
     if net_income and total_assets and total_assets != 0:
         result["roa"] = (net_income / total_assets) * 100
 
-    current_assets = latest.get("current_assets") or 0
-    current_liabilities = latest.get("current_liabilities") or 0
+    current_assets = _num(latest, "current_assets")
+    current_liabilities = _num(latest, "current_liabilities")
     if current_liabilities > 0:
         result["current_ratio"] = current_assets / current_liabilities
 
@@ -91,9 +107,8 @@ def process_financials(raw_financials: list[dict], finnhub_metrics: dict) -> dic
         result["debt_to_equity"] = result["total_debt"] / equity
 
     # --- Free Cash Flow ---
-    op_cf = latest.get("operating_cash_flow") or 0
-    inv_cf = latest.get("investing_cash_flow") or 0
-    capex = abs(inv_cf)
+    op_cf = _num(latest, "operating_cash_flow")
+    capex = _num(latest, "capex")
     result["free_cash_flow"] = op_cf - capex
 
     # --- Cash Conversion Ratio ---
@@ -106,23 +121,28 @@ def process_financials(raw_financials: list[dict], finnhub_metrics: dict) -> dic
 
     # --- ROIC ---
     if op_income and equity:
+        # Effective tax rate from the income statement, clamped to [0, 0.5]
         tax_rate = 0.21
-        if net_income and op_income:
-            tax_rate = max(0, min(0.5, 1 - (net_income / op_income)))
+        if net_income:
+            tax_rate = 1 - (net_income / op_income)
+            if tax_rate < 0:
+                tax_rate = 0.0
+            elif tax_rate > 0.5:
+                tax_rate = 0.5
         nopat = op_income * (1 - tax_rate)
-        invested_capital = (equity or 0) + (result["total_debt"] or 0)
+        invested_capital = equity + total_debt
         if invested_capital > 0:
             result["roic"] = (nopat / invested_capital) * 100
 
     # --- Interest Coverage ---
     interest_exp = latest.get("interest_expense")
     if op_income and interest_exp and interest_exp != 0:
-        result["interest_coverage"] = op_income / abs(interest_exp)
+        result["interest_coverage"] = op_income / interest_exp
 
     # --- EBITDA ---
-    depreciation = latest.get("depreciation") or 0
+    depreciation = _num(latest, "depreciation")
     if op_income:
-        result["ebitda"] = op_income + abs(depreciation)
+        result["ebitda"] = op_income + depreciation
 
     # --- Fill from Finnhub if missing ---
     if finnhub_metrics:
@@ -146,6 +166,28 @@ def process_financials(raw_financials: list[dict], finnhub_metrics: dict) -> dic
 # Economic Moat Score (0-100)
 # ------------------------------------------------------------------
 
+# Moat factor bucket tables. For "above" factors a value strictly greater than
+# thresholds[k] (and not the next one) earns points[k + 1]; for low debt a
+# debt/equity strictly below thresholds[k] earns points[k].
+_GROSS_MARGIN_BUCKETS = ((15, 25, 40, 60), (0, 4, 8, 15, 20))
+_ROE_BUCKETS = ((5, 10, 15, 20), (0, 3, 7, 12, 15))
+_REVENUE_GROWTH_BUCKETS = ((0, 8, 15), (0, 4, 8, 12))
+_CCR_BUCKETS = ((0.5, 0.8, 1.0, 1.2), (0, 2, 5, 8, 10))
+_ROIC_BUCKETS = ((5, 10, 15, 20), (0, 2, 5, 8, 10))
+_MARKET_CAP_BUCKETS = ((2e9, 10e9, 50e9), (2, 4, 8, 12))
+_LOW_DEBT_BUCKETS = ((0.3, 0.5, 1.0, 2.0), (13, 10, 7, 3, 0))
+
+
+def _points_above(value, buckets: tuple) -> int | None:
+    thresholds, points = buckets
+    return None if value is None else points[bisect.bisect_left(thresholds, value)]
+
+
+def _points_below(value, buckets: tuple) -> int | None:
+    thresholds, points = buckets
+    return None if value is None else points[bisect.bisect_right(thresholds, value)]
+
+
 def calculate_moat_score(financials: dict, company_details: dict) -> dict:
     """Calculate 8-factor economic moat score.
 
@@ -155,139 +197,36 @@ def calculate_moat_score(financials: dict, company_details: dict) -> dict:
     Returns:
         Dict with moat_score (0-100), moat_rating, factors, max_scores.
     """
-    factors = {}
-
-    # 1. Gross Margin (0-20 pts)
-    gm = financials.get("gross_margin")
-    if gm is not None:
-        if gm > 60:
-            factors["grossMargin"] = 20
-        elif gm > 40:
-            factors["grossMargin"] = 15
-        elif gm > 25:
-            factors["grossMargin"] = 8
-        elif gm > 15:
-            factors["grossMargin"] = 4
-        else:
-            factors["grossMargin"] = 0
-    else:
-        factors["grossMargin"] = None
-
-    # 2. ROE (0-15 pts)
-    roe = financials.get("roe")
-    if roe is not None:
-        if roe > 20:
-            factors["roe"] = 15
-        elif roe > 15:
-            factors["roe"] = 12
-        elif roe > 10:
-            factors["roe"] = 7
-        elif roe > 5:
-            factors["roe"] = 3
-        else:
-            factors["roe"] = 0
-    else:
-        factors["roe"] = None
-
-    # 3. Revenue Growth (0-12 pts)
-    rev_growth = financials.get("revenue_growth")
-    if rev_growth is not None:
-        if rev_growth > 15:
-            factors["revenueGrowth"] = 12
-        elif rev_growth > 8:
-            factors["revenueGrowth"] = 8
-        elif rev_growth > 0:
-            factors["revenueGrowth"] = 4
-        else:
-            factors["revenueGrowth"] = 0
-    else:
-        factors["revenueGrowth"] = None
-
-    # 4. Low Debt (0-13 pts)
-    de = financials.get("debt_to_equity")
-    if de is not None:
-        if de < 0.3:
-            factors["lowDebt"] = 13
-        elif de < 0.5:
-            factors["lowDebt"] = 10
-        elif de < 1.0:
-            factors["lowDebt"] = 7
-        elif de < 2.0:
-            factors["lowDebt"] = 3
-        else:
-            factors["lowDebt"] = 0
-    else:
-        factors["lowDebt"] = None
-
-    # 5. Market Position (0-12 pts) — based on market cap
+    # Market Position (0-12 pts) — based on market cap
     market_cap = company_details.get("market_cap")
-    if market_cap:
-        if market_cap > 50e9:
-            factors["marketPosition"] = 12
-        elif market_cap > 10e9:
-            factors["marketPosition"] = 8
-        elif market_cap > 2e9:
-            factors["marketPosition"] = 4
-        else:
-            factors["marketPosition"] = 2
-    else:
-        factors["marketPosition"] = None
 
-    # 6. Free Cash Flow (0-8 pts)
+    # Free Cash Flow (0-8 pts)
     fcf = financials.get("free_cash_flow")
+    fcf_points = None
     if fcf is not None:
         if fcf > 0:
-            revenue = financials.get("revenue") or 0
-            if revenue > 0 and (fcf / revenue) > 0.15:
-                factors["fcf"] = 8
-            else:
-                factors["fcf"] = 5
-        else:
-            factors["fcf"] = 0
-    else:
-        factors["fcf"] = None
-
-    # 7. Cash Conversion Ratio (0-10 pts)
-    ccr = financials.get("cash_conversion_ratio")
-    if ccr is not None:
-        if ccr > 1.2:
-            factors["ccr"] = 10
-        elif ccr > 1.0:
-            factors["ccr"] = 8
-        elif ccr > 0.8:
-            factors["ccr"] = 5
-        elif ccr > 0.5:
-            factors["ccr"] = 2
-        else:
-            factors["ccr"] = 0
-    else:
-        factors["ccr"] = None
-
-    # 8. ROIC (0-10 pts)
-    roic = financials.get("roic")
-    if roic is not None:
-        if roic > 20:
-            factors["roic"] = 10
-        elif roic > 15:
-            factors["roic"] = 8
-        elif roic > 10:
-            factors["roic"] = 5
-        elif roic > 5:
-            factors["roic"] = 2
+            revenue = _num(financials, "revenue")
+            fcf_points = 8 if revenue > 0 and (fcf / revenue) > 0.15 else 5
         else:
-            factors["roic"] = 0
-    else:
-        factors["roic"] = None
+            fcf_points = 0
+
+    factors = {
+        "grossMargin": _points_above(financials.get("gross_margin"), _GROSS_MARGIN_BUCKETS),
+        "roe": _points_above(financials.get("roe"), _ROE_BUCKETS),
+        "revenueGrowth": _points_above(financials.get("revenue_growth"), _REVENUE_GROWTH_BUCKETS),
+        "lowDebt": _points_below(financials.get("debt_to_equity"), _LOW_DEBT_BUCKETS),
+        "marketPosition": _points_above(market_cap or None, _MARKET_CAP_BUCKETS),
+        "fcf": fcf_points,
+        "ccr": _points_above(financials.get("cash_conversion_ratio"), _CCR_BUCKETS),
+        "roic": _points_above(financials.get("roic"), _ROIC_BUCKETS),
+    }
 
     # Calculate total from available factors
-    total_score = 0
-    max_possible = 0
     max_scores = MOAT_FACTOR_WEIGHTS
-
-    for key in max_scores:
-        if factors.get(key) is not None:
-            total_score += factors[key]
-            max_possible += max_scores[key]
+    available = np.array([factors.get(k) is not None for k in MOAT_FACTOR_NAMES])
+    points = np.array([factors.get(k) or 0 for k in MOAT_FACTOR_NAMES], dtype=np.float64)
+    total_score = float(points @ available)
+    max_possible = float(MOAT_FACTOR_WEIGHT_VEC @ available)
 
     normalized = round((total_score / max_possible) * 100) if max_possible > 0 else None
 
@@ -310,6 +249,29 @@ def calculate_moat_score(financials: dict, company_details: dict) -> dict:
 # Fair Value (5-model weighted)
 # ------------------------------------------------------------------
 
+# Simple DCF: 5-year projection at a 10% discount rate, 15x terminal multiple.
+# Discount factors are fixed, so (1 + r) ** year is computed once at import.
+_DCF_TERMINAL_MULTIPLE = 15
+_DCF_DISCOUNT_FACTORS = tuple((1 + 0.10) ** year for year in range(1, 6))
+
+
+def _dcf_pv(fcf: float, growth_rate: float) -> tuple[float, float]:
+    """Present value of 5 projected years of FCF and of the terminal value.
+
+    Returns:
+        (total_pv, pv_terminal)
+    """
+    total_pv = 0
+    projected_fcf = fcf
+    growth = 1 + growth_rate
+    for factor in _DCF_DISCOUNT_FACTORS:
+        projected_fcf *= growth
+        total_pv += projected_fcf / factor
+
+    pv_terminal = projected_fcf * _DCF_TERMINAL_MULTIPLE / _DCF_DISCOUNT_FACTORS[-1]
+    return total_pv, pv_terminal
+
+
 def calculate_fair_value(financials: dict, price: float,
                          company_info: dict) -> dict | None:
     """Calculate fair value using up to 5 valuation models.
@@ -322,11 +284,10 @@ def calculate_fair_value(financials: dict, price: float,
     if not price or price <= 0:
         return None
 
-    sic_code = company_info.get("sic_code")
-    sector = get_sector_from_sic(sic_code)
-    multiples = SECTOR_MULTIPLES.get(sector, SECTOR_MULTIPLES["default"])
+    multiples = get_multiples_from_sic(company_info.get("sic_code"))
 
     valuations = []
+    weighted_sum = 0
     total_weight = 0
 
     # 1. P/E Multiple (weight 25%)
@@ -339,6 +300,7 @@ def calculate_fair_value(financials: dict, price: float,
             "weight": 25,
             "details": f"EPS ${eps:.2f} x {multiples['pe']} P/E",
         })
+        weighted_sum += pe_value * 25
         total_weight += 25
 
     # 2. P/B Multiple (weight 20%)
@@ -354,6 +316,7 @@ def calculate_fair_value(financials: dict, price: float,
                 "weight": 20,
                 "details": f"BVPS ${bvps:.2f} x {multiples['pb']} P/B",
             })
+            weighted_sum += pb_value * 20
             total_weight += 20
 
     # 3. P/S Multiple (weight 20%)
@@ -368,6 +331,7 @@ def calculate_fair_value(financials: dict, price: float,
                 "weight": 20,
                 "details": f"RPS ${rps:.2f} x {multiples['ps']} P/S",
             })
+            weighted_sum += ps_value * 20
             total_weight += 20
 
     # 4. Simple DCF (weight 20%)
@@ -375,19 +339,7 @@ def calculate_fair_value(financials: dict, price: float,
     growth = financials.get("revenue_growth")
     if fcf and fcf > 0 and shares and shares > 0:
         growth_rate = min((growth or 5) / 100, 0.25)
-        discount_rate = 0.10
-        terminal_multiple = 15
-
-        # 5-year DCF
-        total_pv = 0
-        projected_fcf = fcf
-        for year in range(1, 6):
-            projected_fcf *= (1 + growth_rate)
-            pv = projected_fcf / ((1 + discount_rate) ** year)
-            total_pv += pv
-
-        terminal_value = projected_fcf * terminal_multiple
-        pv_terminal = terminal_value / ((1 + discount_rate) ** 5)
+        total_pv, pv_terminal = _dcf_pv(fcf, growth_rate)
         intrinsic = (total_pv + pv_terminal) / (shares * 1_000_000)
 
         if intrinsic > 0:
@@ -397,13 +349,14 @@ def calculate_fair_value(financials: dict, price: float,
                 "weight": 20,
                 "details": f"FCF ${fcf / 1e6:.0f}M, {growth_rate * 100:.0f}% growth",
             })
+            weighted_sum += intrinsic * 20
             total_weight += 20
 
     # 5. EV/EBITDA (weight 15%)
     ebitda = financials.get("ebitda")
     market_cap = company_info.get("market_cap")
-    total_debt = financials.get("total_debt") or 0
-    cash = financials.get("cash_and_equivalents") or 0
+    total_debt = _num(financials, "total_debt")
+    cash = _num(financials, "cash_and_equivalents")
     if ebitda and ebitda > 0 and market_cap and shares and shares > 0:
         ev = market_cap + total_debt - cash
         fair_ev = ebitda * multiples["evEbitda"]
@@ -416,13 +369,13 @@ def calculate_fair_value(financials: dict, price: float,
                 "weight": 15,
                 "details": f"EBITDA ${ebitda / 1e6:.0f}M x {multiples['evEbitda']}",
             })
+            weighted_sum += ev_ebitda_value * 15
             total_weight += 15
 
     if not valuations:
         return None
 
-    # Calculate weighted average
-    weighted_sum = sum(v["value"] * v["weight"] for v in valuations)
+    # Weighted average, accumulated alongside each model above
     weighted_fv = weighted_sum / total_weight
     premium_discount = ((price - weighted_fv) / weighted_fv) * 100
 
@@ -479,42 +432,43 @@ def calculate_derived_metrics(financials: dict, price: float,
 
     These are the metrics added to the HTML app's research panel.
     """
-    result = {
-        "fcf_yield": None,
-        "peg_ratio": None,
-        "price_to_fcf": None,
-        "ev_ebitda": None,
-    }
-
     fcf = financials.get("free_cash_flow")
     shares = financials.get("shares_outstanding")
+    eps = financials.get("eps")
+    eps_growth = financials.get("eps_growth")
+    ebitda = financials.get("ebitda")
 
-    # FCF Yield = FCF per share / Price
-    if fcf and shares and shares > 0 and price and price > 0:
+    fcf_yield = peg_ratio = price_to_fcf = ev_ebitda = None
+
+    # Per-share FCF, shared by FCF Yield and Price-to-FCF
+    fcf_per_share = None
+    if fcf and shares and shares > 0:
         fcf_per_share = fcf / (shares * 1_000_000)
-        result["fcf_yield"] = (fcf_per_share / price) * 100
+
+    if fcf_per_share is not None and price:
+        # FCF Yield = FCF per share / Price
+        if price > 0:
+            fcf_yield = (fcf_per_share / price) * 100
+        # Price-to-FCF
+        if fcf > 0:
+            price_to_fcf = price / fcf_per_share
 
     # PEG Ratio = (P/E) / EPS Growth Rate
-    eps = financials.get("eps")
-    eps_growth = financials.get("eps_growth")
     if eps and eps > 0 and eps_growth and eps_growth > 0 and price:
-        pe = price / eps
-        result["peg_ratio"] = pe / eps_growth
-
-    # Price-to-FCF
-    if fcf and fcf > 0 and shares and shares > 0 and price:
-        fcf_per_share = fcf / (shares * 1_000_000)
-        result["price_to_fcf"] = price / fcf_per_share
+        peg_ratio = (price / eps) / eps_growth
 
     # EV/EBITDA
-    ebitda = financials.get("ebitda")
-    total_debt = financials.get("total_debt") or 0
-    cash = financials.get("cash_and_equivalents") or 0
     if market_cap and ebitda and ebitda > 0:
-        ev = market_cap + total_debt - cash
-        result["ev_ebitda"] = ev / ebitda
+        total_debt = _num(financials, "total_debt")
+        cash = _num(financials, "cash_and_equivalents")
+        ev_ebitda = (market_cap + total_debt - cash) / ebitda
 
-    return result
+    return {
+        "fcf_yield": fcf_yield,
+        "peg_ratio": peg_ratio,
+        "price_to_fcf": price_to_fcf,
+        "ev_ebitda": ev_ebitda,
+    }
 
 
 # ------------------------------------------------------------------
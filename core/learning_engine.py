@@ -1,10 +1,19 @@
 """Adaptive learning engine — tracks trade outcomes and suggests parameter adjustments."""
 
 import datetime as dt
+from collections import Counter
 
 from data.persistence import load_trade_history, save_trade_history
 from config.signals import SIGNAL_WIN_RATES
 
+# Entry-time factors compared between winning and losing trades
+_INSIGHT_FACTORS = ("score_at_entry", "ema_score_at_entry", "rsi_at_entry", "inst_score_at_entry")
+
+# Expected win rate (%) per action, from the signal table
+_EXPECTED_WIN_RATE = {
+    action: info.get("win_rate", 0) * 100 for action, info in SIGNAL_WIN_RATES.items()
+}
+
 
 def record_trade_entry(
     ticker: str,
@@ -24,12 +33,13 @@ def record_trade_entry(
         The created trade record.
     """
     trades = load_trade_history()
+    now = dt.datetime.now()
     trade = {
-        "id": f"{ticker}-{dt.datetime.now().strftime('%Y%m%d%H%M%S')}",
+        "id": f"{ticker}-{now:%Y%m%d%H%M%S}",
         "ticker": ticker,
         "action": action,
         "entry_price": entry_price,
-        "entry_date": dt.date.today().isoformat(),
+        "entry_date": now.date().isoformat(),
         "score_at_entry": scores.get("score", 0),
         "ema_score_at_entry": scores.get("ema_score", 0),
         "rsi_at_entry": scores.get("rsi", 50),
@@ -56,33 +66,59 @@ def record_trade_exit(trade_id: str, exit_price: float) -> dict | None:
     Returns:
         The updated trade record, or None if not found.
     """
+    updated = record_trade_exits({trade_id: exit_price})
+    return updated[0] if updated else None
+
+
+def record_trade_exits(exits: dict[str, float]) -> list[dict]:
+    """Record several trade exits with a single history load and save.
+
+    Args:
+        exits: Trade ID -> exit price.
+
+    Returns:
+        The updated trade records; IDs without an open trade are skipped.
+    """
     trades = load_trade_history()
-    for trade in trades:
-        if trade.get("id") == trade_id and trade.get("status") == "OPEN":
-            trade["exit_price"] = exit_price
-            trade["exit_date"] = dt.date.today().isoformat()
-
-            entry = trade.get("entry_price", 0)
-            if entry > 0:
-                ret = ((exit_price - entry) / entry) * 100
-                trade["return_pct"] = round(ret, 2)
-
-                # Determine outcome
-                if ret >= 10:
-                    trade["outcome"] = "WIN"
-                elif ret <= -15:
-                    trade["outcome"] = "LOSS"
-                else:
-                    trade["outcome"] = "TIMEOUT"
+
+    # First open trade per ID, so each exit is a dict lookup, not a list scan
+    open_index = {}
+    for i, trade in enumerate(trades):
+        if trade.get("status") == "OPEN":
+            open_index.setdefault(trade.get("id"), i)
+
+    exit_date = dt.date.today().isoformat()
+    updated = []
+    for trade_id, exit_price in exits.items():
+        i = open_index.pop(trade_id, None)
+        if i is None:
+            continue
+        trade = trades[i]
+        trade["exit_price"] = exit_price
+        trade["exit_date"] = exit_date
+
+        entry = trade.get("entry_price", 0)
+        if entry > 0:
+            ret = ((exit_price - entry) / entry) * 100
+            trade["return_pct"] = round(ret, 2)
+
+            # Determine outcome
+            if ret >= 10:
+                trade["outcome"] = "WIN"
+            elif ret <= -15:
+                trade["outcome"] = "LOSS"
             else:
-                trade["return_pct"] = 0
                 trade["outcome"] = "TIMEOUT"
+        else:
+            trade["return_pct"] = 0
+            trade["outcome"] = "TIMEOUT"
 
-            trade["status"] = "CLOSED"
-            save_trade_history(trades)
-            return trade
+        trade["status"] = "CLOSED"
+        updated.append(trade)
 
-    return None
+    if updated:
+        save_trade_history(trades)
+    return updated
 
 
 def check_pending_trades(polygon) -> list:
@@ -94,22 +130,33 @@ def check_pending_trades(polygon) -> list:
     Returns:
         List of open trades with current price and unrealized P&L.
     """
-    from config.settings import last_market_day
+    from concurrent.futures import ThreadPoolExecutor
+
+    from config.settings import SCANNER_API_DELAY, SCANNER_MAX_WORKERS, last_market_day
+    from data.rate_limit import RateLimiter
 
     trades = load_trade_history()
     open_trades = [t for t in trades if t.get("status") == "OPEN"]
 
     results = []
     market_day = last_market_day()
+    today = dt.date.today()
+    from_date = (today - dt.timedelta(days=10)).isoformat()
+
+    # Fetch each distinct ticker once, overlapping the network round-trips
+    limiter = RateLimiter(SCANNER_API_DELAY)
+
+    def fetch(ticker):
+        return polygon.get_aggregates(ticker, from_date, market_day, limiter=limiter)
+
+    tickers = list(dict.fromkeys(t.get("ticker") for t in open_trades))
+    with ThreadPoolExecutor(max_workers=SCANNER_MAX_WORKERS) as executor:
+        futures = {ticker: executor.submit(fetch, ticker) for ticker in tickers}
 
     for trade in open_trades:
         ticker = trade.get("ticker")
         try:
-            df = polygon.get_aggregates(
-                ticker,
-                (dt.date.today() - dt.timedelta(days=10)).isoformat(),
-                market_day,
-            )
+            df = futures[ticker].result()
             if not df.empty:
                 current_price = float(df.iloc[-1]["close"])
                 entry = trade.get("entry_price", 0)
@@ -119,7 +166,7 @@ def check_pending_trades(polygon) -> list:
                     **trade,
                     "current_price": current_price,
                     "unrealized_pnl_pct": round(pnl_pct, 2),
-                    "days_held": (dt.date.today() - dt.date.fromisoformat(trade["entry_date"])).days
+                    "days_held": (today - dt.date.fromisoformat(trade["entry_date"])).days
                     if trade.get("entry_date")
                     else 0,
                 })
@@ -129,19 +176,64 @@ def check_pending_trades(polygon) -> list:
     return results
 
 
-def analyze_outcomes() -> dict:
+def analyze_outcomes(trades: list | None = None) -> dict:
     """Analyze all closed trades to calculate performance metrics.
 
+    Args:
+        trades: Trade history already loaded by the caller (optional).
+
     Returns:
         Dict with win rates by action, factor correlations, and overall stats.
     """
-    trades = load_trade_history()
-    closed = [t for t in trades if t.get("status") == "CLOSED"]
+    if trades is None:
+        trades = load_trade_history()
+
+    # Single pass: per-action counters plus per-factor win/loss sums and counts
+    total_open = 0
+    total_closed = 0
+    total_wins = 0
+    return_sum = 0
+    action_stats = {}
+    factor_sums = {f: {"WIN": [0, 0], "LOSS": [0, 0]} for f in _INSIGHT_FACTORS}
+
+    for trade in trades:
+        status = trade.get("status")
+        if status == "OPEN":
+            total_open += 1
+            continue
+        if status != "CLOSED":
+            continue
+
+        total_closed += 1
+        outcome = trade.get("outcome")
+        ret = trade.get("return_pct", 0)
+        return_sum += ret
 
-    if not closed:
+        action = trade.get("action", "UNKNOWN")
+        stats = action_stats.get(action)
+        if stats is None:
+            # [wins, losses, total, return sum]
+            stats = action_stats[action] = [0, 0, 0, 0]
+        stats[2] += 1
+        stats[3] += ret
+        if outcome == "WIN":
+            stats[0] += 1
+            total_wins += 1
+        elif outcome == "LOSS":
+            stats[1] += 1
+
+        if outcome == "WIN" or outcome == "LOSS":
+            for factor, sums in factor_sums.items():
+                value = trade.get(factor)
+                if value is not None:
+                    acc = sums[outcome]
+                    acc[0] += value
+                    acc[1] += 1
+
+    if not total_closed:
         return {
             "total_closed": 0,
-            "total_open": len([t for t in trades if t.get("status") == "OPEN"]),
+            "total_open": total_open,
             "by_action": {},
             "overall_win_rate": 0,
             "overall_avg_return": 0,
@@ -150,61 +242,55 @@ def analyze_outcomes() -> dict:
 
     # By action
     by_action = {}
-    for trade in closed:
-        action = trade.get("action", "UNKNOWN")
-        if action not in by_action:
-            by_action[action] = {"wins": 0, "losses": 0, "total": 0, "returns": []}
-        by_action[action]["total"] += 1
-        if trade.get("outcome") == "WIN":
-            by_action[action]["wins"] += 1
-        elif trade.get("outcome") == "LOSS":
-            by_action[action]["losses"] += 1
-        by_action[action]["returns"].append(trade.get("return_pct", 0))
-
-    for action, data in by_action.items():
-        data["win_rate"] = data["wins"] / data["total"] * 100 if data["total"] else 0
-        data["avg_return"] = sum(data["returns"]) / len(data["returns"]) if data["returns"] else 0
+    for action, (wins, losses, total, action_return_sum) in action_stats.items():
+        win_rate = wins / total * 100 if total else 0
         # Compare to expected
-        expected = SIGNAL_WIN_RATES.get(action, {})
-        data["expected_win_rate"] = expected.get("win_rate", 0) * 100
-        data["outperforming"] = data["win_rate"] > data["expected_win_rate"]
-        del data["returns"]  # Don't need the raw list in output
+        expected_win_rate = _EXPECTED_WIN_RATE.get(action, 0)
+        by_action[action] = {
+            "wins": wins,
+            "losses": losses,
+            "total": total,
+            "win_rate": win_rate,
+            "avg_return": action_return_sum / total,
+            "expected_win_rate": expected_win_rate,
+            "outperforming": win_rate > expected_win_rate,
+        }
 
     # Factor insights
-    wins = [t for t in closed if t.get("outcome") == "WIN"]
-    losses = [t for t in closed if t.get("outcome") == "LOSS"]
-
     factor_insights = {}
-    for factor in ["score_at_entry", "ema_score_at_entry", "rsi_at_entry", "inst_score_at_entry"]:
-        win_vals = [t.get(factor, 0) for t in wins if t.get(factor) is not None]
-        loss_vals = [t.get(factor, 0) for t in losses if t.get(factor) is not None]
-        avg_win = sum(win_vals) / len(win_vals) if win_vals else 0
-        avg_loss = sum(loss_vals) / len(loss_vals) if loss_vals else 0
+    for factor, sums in factor_sums.items():
+        win_sum, win_count = sums["WIN"]
+        loss_sum, loss_count = sums["LOSS"]
+        avg_win = win_sum / win_count if win_count else 0
+        avg_loss = loss_sum / loss_count if loss_count else 0
         factor_insights[factor] = {
             "avg_in_wins": round(avg_win, 1),
             "avg_in_losses": round(avg_loss, 1),
             "differential": round(avg_win - avg_loss, 1),
         }
 
-    all_returns = [t.get("return_pct", 0) for t in closed]
-
     return {
-        "total_closed": len(closed),
-        "total_open": len([t for t in trades if t.get("status") == "OPEN"]),
+        "total_closed": total_closed,
+        "total_open": total_open,
         "by_action": by_action,
-        "overall_win_rate": len(wins) / len(closed) * 100 if closed else 0,
-        "overall_avg_return": sum(all_returns) / len(all_returns) if all_returns else 0,
+        "overall_win_rate": total_wins / total_closed * 100,
+        "overall_avg_return": return_sum / total_closed,
         "factor_insights": factor_insights,
     }
 
 
-def suggest_adjustments() -> dict:
+def suggest_adjustments(trades: list | None = None, outcomes: dict | None = None) -> dict:
     """Suggest threshold adjustments based on trade outcomes.
 
+    Args:
+        trades: Trade history already loaded by the caller (optional).
+        outcomes: analyze_outcomes() result to reuse (optional).
+
     Returns:
         Dict with suggested changes to scoring thresholds.
     """
-    outcomes = analyze_outcomes()
+    if outcomes is None:
+        outcomes = analyze_outcomes(trades)
     if outcomes["total_closed"] < 10:
         return {
             "sufficient_data": False,
@@ -215,28 +301,32 @@ def suggest_adjustments() -> dict:
     suggestions = []
     insights = outcomes.get("factor_insights", {})
 
+    score_insight = insights.get("score_at_entry", {})
+    ema_insight = insights.get("ema_score_at_entry", {})
+    rsi_insight = insights.get("rsi_at_entry", {})
+
     # Score threshold suggestion
-    score_diff = insights.get("score_at_entry", {}).get("differential", 0)
+    score_diff = score_insight.get("differential", 0)
     if score_diff > 10:
         suggestions.append({
             "parameter": "min_score",
             "current": 55,
-            "suggested": int(insights["score_at_entry"]["avg_in_wins"]) - 5,
+            "suggested": int(score_insight["avg_in_wins"]) - 5,
             "reason": f"Winning trades have {score_diff:.0f}pt higher scores on average",
         })
 
     # EMA score suggestion
-    ema_diff = insights.get("ema_score_at_entry", {}).get("differential", 0)
+    ema_diff = ema_insight.get("differential", 0)
     if ema_diff > 10:
         suggestions.append({
             "parameter": "min_ema_score",
             "current": 70,
-            "suggested": int(insights["ema_score_at_entry"]["avg_in_wins"]) - 5,
+            "suggested": int(ema_insight["avg_in_wins"]) - 5,
             "reason": f"Winning trades have {ema_diff:.0f}pt higher EMA scores",
         })
 
     # RSI suggestion
-    rsi_win = insights.get("rsi_at_entry", {}).get("avg_in_wins", 50)
+    rsi_win = rsi_insight.get("avg_in_wins", 50)
     if 40 <= rsi_win <= 65:
         suggestions.append({
             "parameter": "rsi_range",
@@ -253,17 +343,30 @@ def suggest_adjustments() -> dict:
     }
 
 
-def get_stats() -> dict:
-    """Get a quick summary of the learning engine state."""
-    trades = load_trade_history()
-    open_trades = [t for t in trades if t.get("status") == "OPEN"]
-    closed_trades = [t for t in trades if t.get("status") == "CLOSED"]
+def get_stats(trades: list | None = None) -> dict:
+    """Get a quick summary of the learning engine state.
 
+    Args:
+        trades: Trade history already loaded by the caller (optional).
+    """
+    if trades is None:
+        trades = load_trade_history()
+
+    # One pass: tally statuses, and outcomes of closed trades
+    status_counts = Counter()
+    outcome_counts = Counter()
+    for t in trades:
+        status = t.get("status")
+        status_counts[status] += 1
+        if status == "CLOSED":
+            outcome_counts[t.get("outcome")] += 1
+
+    closed = status_counts["CLOSED"]
     return {
         "total_trades": len(trades),
-        "open_trades": len(open_trades),
-        "closed_trades": len(closed_trades),
-        "wins": len([t for t in closed_trades if t.get("outcome") == "WIN"]),
-        "losses": len([t for t in closed_trades if t.get("outcome") == "LOSS"]),
-        "has_enough_data": len(closed_trades) >= 10,
+        "open_trades": status_counts["OPEN"],
+        "closed_trades": closed,
+        "wins": outcome_counts["WIN"],
+        "losses": outcome_counts["LOSS"],
+        "has_enough_data": closed >= 10,
     }
@@ -1,6 +1,23 @@
 """Options analysis — rating, IV estimation, and strategy suggestions."""
 
+import bisect
 import math
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from core.recommendations import get_breakout_score, get_institutional_score
+
+# Annualization factor for daily moves (252 trading days)
+_SQRT_252 = math.sqrt(252)
+
+# IV bands: estimated IV below _IV_BOUNDS[i] falls in band i; the last entry
+# is used when there is no estimate
+_IV_BOUNDS = (20, 35, 50)
+_IV_PERCENTILES = ("low", "moderate", "high", "extreme", "unknown")
+_IV_LABELS = ("Low IV", "Moderate IV", "High IV", "Extreme IV", "N/A")
+_IV_UNKNOWN = len(_IV_BOUNDS) + 1
 
 
 def calculate_options_rating(stock_data: dict) -> dict:
@@ -26,14 +43,8 @@ def calculate_options_rating(stock_data: dict) -> dict:
     avg_daily_move = stock_data.get("avg_daily_move", 0) or stock_data.get("atr", 0) or 0
     momentum_5d = stock_data.get("momentum_5d", 0) or 0
     momentum_20d = stock_data.get("momentum_20d", 0) or 0
-    inst_score = stock_data.get("institutional_score", 50)
-    if inst_score is None:
-        inst_flow = stock_data.get("institutional_flow", {})
-        inst_score = inst_flow.get("score", 50) if isinstance(inst_flow, dict) else 50
-    breakout_score = stock_data.get("breakout_score", 0)
-    if breakout_score is None:
-        breakout = stock_data.get("breakout", {})
-        breakout_score = breakout.get("score", 0) if isinstance(breakout, dict) else 0
+    inst_score = get_institutional_score(stock_data)
+    breakout_score = get_breakout_score(stock_data)
 
     total = 0
     factors = []
@@ -109,6 +120,125 @@ def calculate_options_rating(stock_data: dict) -> dict:
     }
 
 
+def calculate_options_rating_batch(stocks: pd.DataFrame) -> pd.DataFrame:
+    """Vectorized calculate_options_rating() over many stocks at once.
+
+    Inputs are read the way the scalar function reads a dict: a missing
+    column or None takes its default, while NaN is kept and scores as the
+    scalar comparisons score it. Nested 'institutional_flow'/'breakout'
+    results are not consulted.
+
+    Args:
+        stocks: One row per stock with the scalar function's fields as
+                columns ('price', 'volume', 'avg_daily_move' or 'atr',
+                'momentum_5d', 'momentum_20d', 'institutional_score',
+                'breakout_score').
+
+    Returns:
+        DataFrame on the same index with 'options_score' and 'options_rating'.
+        Per-factor breakdowns are left to calculate_options_rating().
+    """
+    def column(name: str, default: float = 0) -> np.ndarray:
+        if name not in stocks:
+            return np.full(len(stocks), float(default))
+        raw = stocks[name]
+        values = pd.to_numeric(raw, errors="coerce").to_numpy(dtype=np.float64)
+        if raw.dtype == object:
+            is_none = np.array([v is None for v in raw.to_numpy()], dtype=bool)
+            values = np.where(is_none, default, values)
+        return values
+
+    # Python's min()/max() keep their first argument unless the second
+    # compares strictly past it, so a NaN second argument is ignored
+    def py_min(a, b):
+        return np.where(b < a, b, a)
+
+    def py_max(a, b):
+        return np.where(b > a, b, a)
+
+    price = column("price")
+    volume = column("volume")
+    avg_daily_move = column("avg_daily_move")
+    avg_daily_move = np.where(avg_daily_move != 0, avg_daily_move, column("atr"))
+    momentum_5d = column("momentum_5d")
+    momentum_20d = column("momentum_20d")
+    inst_score = column("institutional_score", 50)
+    breakout_score = column("breakout_score")
+
+    # 1. Average daily move range (0-25 points)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        move_pct = np.where((price > 0) & (avg_daily_move != 0), (avg_daily_move / price) * 100, 0)
+    move_pts = py_min(25, move_pct * 10)
+
+    # 2. Volume (0-20 points)
+    vol_pts = np.select(
+        [volume >= 5_000_000, volume >= 2_000_000, volume >= 1_000_000, volume >= 500_000],
+        [20, 16, 12, 8],
+        py_max(0, (volume / 500_000) * 8),
+    )
+
+    # 3. Price range (0-15 points) — optimal between $20-$200
+    price_pts = np.select(
+        [
+            (price >= 20) & (price <= 200),
+            ((price >= 10) & (price < 20)) | ((price > 200) & (price <= 500)),
+            ((price >= 5) & (price < 10)) | ((price > 500) & (price <= 1000)),
+        ],
+        [15, 10, 5],
+        0,
+    )
+
+    # 4. Momentum alignment (0-20 points)
+    up_5d = momentum_5d > 0
+    up_20d = momentum_20d > 0
+    momentum = np.abs(momentum_5d) + np.abs(momentum_20d)
+    mom_pts = np.where(
+        up_5d & up_20d, py_min(20, momentum),
+        np.where(up_5d | up_20d, py_min(10, momentum) * 0.5, 0),
+    )
+
+    # 5. Institutional flow (0-15 points)
+    inst_pts = py_min(15, py_max(0, (inst_score - 40) * 0.6))
+
+    # 6. Breakout score (0-15 points)
+    break_pts = py_min(15, breakout_score * 0.3)
+
+    total = move_pts + vol_pts + price_pts + mom_pts + inst_pts + break_pts
+    rating = np.select(
+        [total >= 80, total >= 60, total >= 40], ["Excellent", "Good", "Fair"], "Poor",
+    )
+
+    return pd.DataFrame(
+        {"options_score": [round(t, 1) for t in total.tolist()], "options_rating": rating},
+        index=stocks.index,
+    )
+
+
+class IVEstimate(NamedTuple):
+    """Estimated IV and its band index into _IV_PERCENTILES / _IV_LABELS."""
+
+    iv: float
+    band: int
+
+    def to_dict(self) -> dict:
+        """The estimate_iv() dict for this estimate."""
+        return {
+            "estimated_iv": round(self.iv, 1),
+            "iv_percentile": _IV_PERCENTILES[self.band],
+            "iv_label": _IV_LABELS[self.band],
+        }
+
+
+def _estimate_iv(avg_daily_move: float, price: float) -> IVEstimate:
+    """estimate_iv() without building the result dict."""
+    if price <= 0 or avg_daily_move <= 0:
+        return IVEstimate(0, _IV_UNKNOWN)
+
+    daily_pct = (avg_daily_move / price) * 100
+    estimated_iv = daily_pct * _SQRT_252
+    return IVEstimate(estimated_iv, bisect.bisect_right(_IV_BOUNDS, estimated_iv))
+
+
 def estimate_iv(avg_daily_move: float, price: float = 0) -> dict:
     """Estimate implied volatility from average daily move.
 
@@ -121,30 +251,12 @@ def estimate_iv(avg_daily_move: float, price: float = 0) -> dict:
     Returns:
         Dict with 'estimated_iv', 'iv_percentile', 'iv_label'.
     """
-    if price <= 0 or avg_daily_move <= 0:
-        return {"estimated_iv": 0, "iv_percentile": "unknown", "iv_label": "N/A"}
+    return _estimate_iv(avg_daily_move, price).to_dict()
 
-    daily_pct = (avg_daily_move / price) * 100
-    estimated_iv = daily_pct * math.sqrt(252)
-
-    if estimated_iv < 20:
-        percentile = "low"
-        label = "Low IV"
-    elif estimated_iv < 35:
-        percentile = "moderate"
-        label = "Moderate IV"
-    elif estimated_iv < 50:
-        percentile = "high"
-        label = "High IV"
-    else:
-        percentile = "extreme"
-        label = "Extreme IV"
 
-    return {
-        "estimated_iv": round(estimated_iv, 1),
-        "iv_percentile": percentile,
-        "iv_label": label,
-    }
+def _strike(price: float, mult: float, label: str) -> str:
+    """Strike hint at price * mult, e.g. "$105.00 (5% OTM)"; label alone without a price."""
+    return f"${price * mult:,.2f} ({label})" if price else label
 
 
 def suggest_options_strategy(stock_data: dict) -> dict:
@@ -162,22 +274,14 @@ def suggest_options_strategy(stock_data: dict) -> dict:
     rsi = stock_data.get("rsi", 50) or 50
     price = stock_data.get("price", 0) or 0
 
-    inst_score = stock_data.get("institutional_score", 50)
-    if inst_score is None:
-        inst_flow = stock_data.get("institutional_flow", {})
-        inst_score = inst_flow.get("score", 50) if isinstance(inst_flow, dict) else 50
-
-    breakout_score = stock_data.get("breakout_score", 0)
-    if breakout_score is None:
-        breakout = stock_data.get("breakout", {})
-        breakout_score = breakout.get("score", 0) if isinstance(breakout, dict) else 0
+    inst_score = get_institutional_score(stock_data)
+    breakout_score = get_breakout_score(stock_data)
 
     squeeze = stock_data.get("bollinger_squeeze", False)
     avg_daily_move = stock_data.get("avg_daily_move", 0) or stock_data.get("atr", 0) or 0
 
     # Estimate IV
-    iv_data = estimate_iv(avg_daily_move, price)
-    iv_level = iv_data["iv_percentile"]
+    iv_level = _IV_PERCENTILES[_estimate_iv(avg_daily_move, price).band]
 
     # Strategy selection logic (ported from HTML lines 5985-6084)
     if breakout_score >= 50 and iv_level in ("low", "moderate"):
@@ -191,7 +295,7 @@ def suggest_options_strategy(stock_data: dict) -> dict:
             "target_return": "50-100%",
             "rationale": f"Pre-breakout setup (score {breakout_score}) with {iv_level} IV — favorable for buying options",
             "strikes": {
-                "entry": f"${price * 1.05:,.2f} (5% OTM)" if price else "5% OTM",
+                "entry": _strike(price, 1.05, "5% OTM"),
             },
         }
 
@@ -206,8 +310,8 @@ def suggest_options_strategy(stock_data: dict) -> dict:
             "target_return": "50-150%",
             "rationale": f"Breakout potential but high IV — spread reduces cost basis",
             "strikes": {
-                "long": f"${price * 1.02:,.2f} (2% OTM)" if price else "2% OTM",
-                "short": f"${price * 1.10:,.2f} (10% OTM)" if price else "10% OTM",
+                "long": _strike(price, 1.02, "2% OTM"),
+                "short": _strike(price, 1.10, "10% OTM"),
             },
         }
 
@@ -222,7 +326,7 @@ def suggest_options_strategy(stock_data: dict) -> dict:
             "target_return": "Premium collected (2-4%)",
             "rationale": f"Strong institutional flow (score {inst_score}) provides support — sell puts to collect premium or buy at discount",
             "strikes": {
-                "put_strike": f"${price * 0.95:,.2f} (5% OTM)" if price else "5% OTM",
+                "put_strike": _strike(price, 0.95, "5% OTM"),
             },
         }
 
@@ -237,7 +341,7 @@ def suggest_options_strategy(stock_data: dict) -> dict:
             "target_return": "100-200%",
             "rationale": f"Strong score ({score}) and trend (EMA {ema_score}) support longer hold",
             "strikes": {
-                "entry": f"${price * 1.05:,.2f} (5% OTM)" if price else "5% OTM",
+                "entry": _strike(price, 1.05, "5% OTM"),
             },
         }
 
@@ -252,8 +356,8 @@ def suggest_options_strategy(stock_data: dict) -> dict:
             "target_return": "50-100%",
             "rationale": f"Moderate setup (score {score}) — spread limits risk while capturing upside",
             "strikes": {
-                "long": f"${price * 1.02:,.2f} (2% OTM)" if price else "2% OTM",
-                "short": f"${price * 1.10:,.2f} (10% OTM)" if price else "10% OTM",
+                "long": _strike(price, 1.02, "2% OTM"),
+                "short": _strike(price, 1.10, "10% OTM"),
             },
         }
 
@@ -268,8 +372,8 @@ def suggest_options_strategy(stock_data: dict) -> dict:
             "target_return": "Credit collected (30-50% of width)",
             "rationale": "Bollinger squeeze with oversold RSI — premium selling opportunity at support",
             "strikes": {
-                "short_put": f"${price * 0.95:,.2f} (5% OTM)" if price else "5% OTM",
-                "long_put": f"${price * 0.90:,.2f} (10% OTM)" if price else "10% OTM",
+                "short_put": _strike(price, 0.95, "5% OTM"),
+                "long_put": _strike(price, 0.90, "10% OTM"),
             },
         }
 
@@ -0,0 +1,110 @@
+"""Compiled action classifier for scoring many stocks at once (numba optional).
+
+classify_codes() maps equal-length score arrays to action codes, indices into
+ACTION_LEVELS. With numba installed it is a parallel @njit loop (prange over
+stocks) calling _classify_code(); without it the ACTION_RULES table is
+evaluated over whole arrays. Both agree with recommendations._classify(),
+which walks the same table for a single stock.
+"""
+import numpy as np
+
+from core._numba import HAVE_NUMBA, njit, prange
+
+# Action codes, in priority order (most bullish first)
+STRONG_BUY = 0
+ACCUMULATE = 1
+BUY_DIP = 2
+SPECULATIVE_BUY = 3
+WATCH = 4
+HOLD = 5
+REDUCE = 6
+TAKE_PROFITS = 7
+SELL = 8
+ACTION_LEVELS = (
+    "STRONG BUY", "ACCUMULATE", "BUY DIP", "SPECULATIVE BUY", "WATCH",
+    "HOLD", "REDUCE", "TAKE PROFITS", "SELL",
+)
+
+
+# Ordered decision rules: the first predicate that holds picks the action,
+# HOLD otherwise. Predicates combine with & so the same rule evaluates a
+# single stock (scalars) or a whole universe (arrays).
+ACTION_RULES = (
+    (TAKE_PROFITS, lambda score, ema, inst, rsi, month: rsi > 70),
+    (STRONG_BUY, lambda score, ema, inst, rsi, month:
+        (score >= 75) & (ema >= 70) & (inst >= 65) & (rsi >= 40) & (rsi <= 70)),
+    (BUY_DIP, lambda score, ema, inst, rsi, month: (rsi < 30) & (inst >= 60) & (ema >= 40)),
+    (ACCUMULATE, lambda score, ema, inst, rsi, month:
+        (score >= 70) & (ema >= 60) & (rsi >= 35) & (rsi <= 65)),
+    (SPECULATIVE_BUY, lambda score, ema, inst, rsi, month: (rsi < 25) & (month < -30)),
+    (SELL, lambda score, ema, inst, rsi, month: (score < 25) & (ema < 30) & (inst < 40)),
+    (REDUCE, lambda score, ema, inst, rsi, month: (score < 40) & (month < -15) & (inst < 45)),
+    (WATCH, lambda score, ema, inst, rsi, month:
+        (score >= 55) & (score < 70) & (rsi >= 35) & (rsi <= 55)),
+)
+_RULE_CODES = np.array([code for code, _ in ACTION_RULES], dtype=np.int8)
+
+
+def _classify_code(score, ema_score, inst_score, rsi, month_change):
+    """ACTION_RULES as an explicit ladder, so numba can compile it."""
+    if rsi > 70:
+        return TAKE_PROFITS
+    if score >= 75 and ema_score >= 70 and inst_score >= 65 and 40 <= rsi <= 70:
+        return STRONG_BUY
+    if rsi < 30 and inst_score >= 60 and ema_score >= 40:
+        return BUY_DIP
+    if score >= 70 and ema_score >= 60 and 35 <= rsi <= 65:
+        return ACCUMULATE
+    if rsi < 25 and month_change < -30:
+        return SPECULATIVE_BUY
+    if score < 25 and ema_score < 30 and inst_score < 40:
+        return SELL
+    if score < 40 and month_change < -15 and inst_score < 45:
+        return REDUCE
+    if 55 <= score < 70 and 35 <= rsi <= 55:
+        return WATCH
+    return HOLD
+
+
+def _classify_loop(score, ema_score, inst_score, rsi, month_change):
+    """Per-stock loop over _classify_code(); compiled with numba when available.
+
+    Iterations are independent and only write codes[i], so numba can split
+    them across cores.
+    """
+    codes = np.empty(len(score), dtype=np.int8)
+    for i in prange(len(score)):
+        codes[i] = _classify_code(score[i], ema_score[i], inst_score[i], rsi[i], month_change[i])
+    return codes
+
+
+def _classify_numpy(score, ema_score, inst_score, rsi, month_change):
+    """Vectorized classifier; same contract as _classify_loop.
+
+    Evaluates every rule over all stocks, then takes the first rule that
+    holds per stock (argmax over the stacked masks), HOLD where none does.
+    """
+    matches = np.array([
+        rule(score, ema_score, inst_score, rsi, month_change) for _, rule in ACTION_RULES
+    ], dtype=bool).reshape(len(ACTION_RULES), -1)
+    first = matches.argmax(axis=0)
+    return np.where(matches.any(axis=0), _RULE_CODES[first], HOLD).astype(np.int8)
+
+
+if HAVE_NUMBA:
+    _classify_code = njit(cache=True)(_classify_code)
+    classify_codes = njit(parallel=True, cache=True)(_classify_loop)
+else:
+    classify_codes = _classify_numpy
+
+
+def warm_up() -> None:
+    """Compile classify_codes() for float64 inputs ahead of the first scan.
+
+    No-op without numba. With cache=True the machine code is stored next to
+    this module, so only the very first process pays the compile; later
+    sessions load it from disk.
+    """
+    if HAVE_NUMBA:
+        one = np.zeros(1)
+        classify_codes(one, one, one, one, one)
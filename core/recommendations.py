@@ -1,6 +1,12 @@
 """9-level recommendation engine with win probability and expected return."""
 
-from config.signals import SIGNAL_WIN_RATES, TECHNICAL_ADJUSTMENTS
+import functools
+
+import numpy as np
+import pandas as pd
+
+from config.signals import SIGNAL_WIN_RATES, TECHNICAL_ADJUSTMENT_LABELS, TECHNICAL_ADJUSTMENT_VEC
+from core.recommendation_kernels import ACTION_LEVELS, ACTION_RULES, classify_codes
 
 
 # ─── Action Colors ────────────────────────────────────────────────────────────
@@ -17,17 +23,12 @@ ACTION_COLORS = {
     "SELL":            "#d50000",
 }
 
-ACTION_PRIORITY = {
-    "STRONG BUY": 1,
-    "ACCUMULATE": 2,
-    "BUY DIP": 3,
-    "SPECULATIVE BUY": 4,
-    "WATCH": 5,
-    "HOLD": 6,
-    "REDUCE": 7,
-    "TAKE PROFITS": 8,
-    "SELL": 9,
-}
+# Sort priority (1 = most bullish) follows the action-code order
+ACTION_PRIORITY = {action: code + 1 for code, action in enumerate(ACTION_LEVELS)}
+
+# Ordered categorical of action names; codes are the action codes, so
+# sorting or comparing a column of actions runs on small ints
+ACTION_DTYPE = pd.CategoricalDtype(ACTION_LEVELS, ordered=True)
 
 
 def get_action_color(action: str) -> str:
@@ -40,6 +41,30 @@ def get_action_priority(action: str) -> int:
     return ACTION_PRIORITY.get(action, 6)
 
 
+def _nested_score(stock_data: dict, key: str, default: float) -> float:
+    """'score' from a nested result dict such as 'institutional_flow'."""
+    nested = stock_data.get(key)
+    return nested.get("score", default) if isinstance(nested, dict) else default
+
+
+def get_institutional_score(stock_data: dict) -> float:
+    """Institutional score from a flat 'institutional_score' or a nested
+    'institutional_flow' result (default 50)."""
+    inst_score = stock_data.get("institutional_score", 50)
+    if inst_score is None:
+        inst_score = _nested_score(stock_data, "institutional_flow", 50)
+    return inst_score
+
+
+def get_breakout_score(stock_data: dict) -> float:
+    """Breakout score from a flat 'breakout_score' or a nested 'breakout'
+    result (default 0)."""
+    breakout_score = stock_data.get("breakout_score", 0)
+    if breakout_score is None:
+        breakout_score = _nested_score(stock_data, "breakout", 0)
+    return breakout_score
+
+
 # ─── Recommendation Generator ────────────────────────────────────────────────
 
 def generate_recommendation(stock_data: dict) -> dict:
@@ -53,121 +78,223 @@ def generate_recommendation(stock_data: dict) -> dict:
                     'bollinger_squeeze'.
 
     Returns:
-        Dict with 'action', 'confidence', 'reasoning', 'option_strategy', 'metrics'.
+        Dict with 'action', 'confidence', 'reasoning' (and its 'reason_mask'),
+        'option_strategy', 'metrics'.
     """
     # Extract values with fallbacks
     score = stock_data.get("score", 0) or 0
     rsi = stock_data.get("rsi", 50) or 50
     ema_score = stock_data.get("ema_score", 0) or 0
 
-    # Handle institutional score from different data shapes
-    inst_score = stock_data.get("institutional_score", 50)
-    if inst_score is None:
-        inst_flow = stock_data.get("institutional_flow", {})
-        inst_score = inst_flow.get("score", 50) if isinstance(inst_flow, dict) else 50
+    inst_score = get_institutional_score(stock_data)
 
     squeeze = stock_data.get("bollinger_squeeze", False)
     week_change = stock_data.get("momentum_5d", 0) or 0
     month_change = stock_data.get("momentum_20d", 0) or 0
 
-    action = "HOLD"
-    confidence = "MEDIUM"
-    reasoning = []
-    option_strategy = None
+    action = classify_action(score, ema_score, inst_score, rsi, month_change)
+    confidence = ACTION_CONFIDENCE[action]
+    reason_mask = recommendation_reason_mask(action, score, squeeze, month_change)
+    reasoning = expand_reasons(reason_mask, rsi)
+
+    option_strategy = _OPTION_STRATEGIES.get(action)
+    if option_strategy is not None:
+        option_strategy = dict(option_strategy)
+    if action == "SELL" and not reason_mask & _SELL_DOWNTREND:
+        option_strategy = None
+
+    return _build_result(action, confidence, reasoning, option_strategy, stock_data, reason_mask)
+
+
+# Reasoning lines by bit position; a recommendation's reasons are a bitmask
+# over this table and only become strings when rendered (expand_reasons)
+_REASONS = (
+    "RSI overbought (>70) — backtest shows 0% win rate for buys",          # 0
+    "Score 75+ with strong institutional flow (40% backtest win rate)",     # 1
+    "RSI {rsi:.0f} in optimal 40-70 range",                                 # 2
+    "Oversold RSI <30 with institutional support (19% backtest win rate)",  # 3
+    "Best as 45-day hold for mean reversion",                               # 4
+    "Score 70+ in RSI sweet spot (33% backtest win rate)",                   # 5
+    "Bollinger squeeze adds breakout potential",                            # 6
+    "Capitulation level — deeply oversold",                                 # 7
+    "High risk/reward mean reversion play",                                 # 8
+    "Weak technicals with distribution",                                    # 9
+    "Significant downtrend accelerating",                                   # 10
+    "Deteriorating momentum with weak institutional flow",                  # 11
+    "Neutral setup — wait for score 70+ or RSI dip for entry",              # 12
+    "Squeeze forming — watch for breakout trigger",                         # 13
+    "Decent score but missing confirmation signals",                        # 14
+    "Insufficient momentum for new positions",                              # 15
+)
+_RSI_TEMPLATE = 1 << 2
+_SELL_DOWNTREND = 1 << 10
+
+# Reasons every recommendation of an action level carries
+_ACTION_REASONS = {
+    # CRITICAL: Never buy overbought — 0% win rate in backtest
+    "TAKE PROFITS": 1 << 0,
+    # STRONG BUY — 40% win rate at 45 days (best performer)
+    "STRONG BUY": 1 << 1 | 1 << 2,
+    # BUY DIP — 19% win rate at 45 days (second best)
+    "BUY DIP": 1 << 3 | 1 << 4,
+    # ACCUMULATE — 33% win rate with healthy RSI
+    "ACCUMULATE": 1 << 5,
+    # SPECULATIVE BUY — 12% win rate (consistent across timeframes)
+    "SPECULATIVE BUY": 1 << 7 | 1 << 8,
+    # SELL — Strong sell signals
+    "SELL": 1 << 9,
+    # REDUCE — Deteriorating but not critical
+    "REDUCE": 1 << 11,
+    # WATCH — Potential setup forming
+    "WATCH": 1 << 12,
+}
 
-    # ─── BACKTEST-OPTIMIZED THRESHOLDS ────────────────────────────────────
-    # Based on 71-stock backtest with +20% target, -15% stop, 14/45 day holds
+# Option strategy per action level (SELL only in an accelerating downtrend)
+_OPTION_STRATEGIES = {
+    "TAKE PROFITS": {"type": "SELL CALLS", "strike": "ATM covered call", "expiry": "30 DTE"},
+    "STRONG BUY": {"type": "BUY CALLS", "strike": "ATM or 5% OTM", "expiry": "45-60 DTE"},
+    "BUY DIP": {"type": "SELL PUTS", "strike": "10-15% OTM", "expiry": "45-60 DTE"},
+    "ACCUMULATE": {"type": "BUY CALLS", "strike": "5-10% OTM", "expiry": "45-60 DTE"},
+    "SPECULATIVE BUY": {"type": "BUY CALLS", "strike": "15-20% OTM", "expiry": "60-90 DTE"},
+    "SELL": {"type": "BUY PUTS", "strike": "ATM", "expiry": "45-60 DTE"},
+}
 
-    # CRITICAL: Never buy overbought — 0% win rate in backtest
-    if rsi > 70:
-        action = "TAKE PROFITS"
-        confidence = "HIGH"
-        reasoning.append("RSI overbought (>70) — backtest shows 0% win rate for buys")
-        option_strategy = {"type": "SELL CALLS", "strike": "ATM covered call", "expiry": "30 DTE"}
-        return _build_result(action, confidence, reasoning, option_strategy, stock_data)
 
-    # STRONG BUY — 40% win rate at 45 days (best performer)
-    if score >= 75 and ema_score >= 70 and inst_score >= 65 and 40 <= rsi <= 70:
-        action = "STRONG BUY"
-        confidence = "HIGH"
-        reasoning.append("Score 75+ with strong institutional flow (40% backtest win rate)")
-        reasoning.append(f"RSI {rsi:.0f} in optimal 40-70 range")
-        option_strategy = {"type": "BUY CALLS", "strike": "ATM or 5% OTM", "expiry": "45-60 DTE"}
+def recommendation_reason_mask(action: str, score, squeeze, month_change) -> int:
+    """Bitmask over _REASONS explaining an action level."""
+    mask = _ACTION_REASONS.get(action, 0)
+    if action == "ACCUMULATE" and squeeze:
+        mask |= 1 << 6
+    elif action == "WATCH" and squeeze:
+        mask |= 1 << 13
+    elif action == "SELL" and month_change < -20:
+        mask |= _SELL_DOWNTREND
+    elif action == "HOLD":
+        # HOLD — Default
+        mask = 1 << 14 if score >= 50 else 1 << 15
+    return mask
+
+
+def expand_reasons(mask: int, rsi: float = 50) -> list[str]:
+    """Reasoning lines for a recommendation_reason_mask() value."""
+    reasons = []
+    for bit, reason in enumerate(_REASONS):
+        if mask >> bit & 1:
+            reasons.append(reason.format(rsi=rsi) if 1 << bit == _RSI_TEMPLATE else reason)
+    return reasons
+
+
+# Confidence is fixed per action level
+ACTION_CONFIDENCE = {
+    "TAKE PROFITS": "HIGH",
+    "STRONG BUY": "HIGH",
+    "BUY DIP": "MEDIUM",
+    "ACCUMULATE": "MEDIUM",
+    "SPECULATIVE BUY": "LOW",
+    "SELL": "HIGH",
+    "REDUCE": "MEDIUM",
+    "WATCH": "LOW",
+    "HOLD": "MEDIUM",
+}
 
-    # BUY DIP — 19% win rate at 45 days (second best)
-    elif rsi < 30 and inst_score >= 60 and ema_score >= 40:
-        action = "BUY DIP"
-        confidence = "MEDIUM"
-        reasoning.append("Oversold RSI <30 with institutional support (19% backtest win rate)")
-        reasoning.append("Best as 45-day hold for mean reversion")
-        option_strategy = {"type": "SELL PUTS", "strike": "10-15% OTM", "expiry": "45-60 DTE"}
 
-    # ACCUMULATE — 33% win rate with healthy RSI
-    elif score >= 70 and ema_score >= 60 and 35 <= rsi <= 65:
-        action = "ACCUMULATE"
-        confidence = "MEDIUM"
-        reasoning.append("Score 70+ in RSI sweet spot (33% backtest win rate)")
-        if squeeze:
-            reasoning.append("Bollinger squeeze adds breakout potential")
-        option_strategy = {"type": "BUY CALLS", "strike": "5-10% OTM", "expiry": "45-60 DTE"}
+def _classify(score, ema_score, inst_score, rsi, month_change) -> str:
+    """Pick the action level from the backtest-optimized thresholds.
 
-    # SPECULATIVE BUY — 12% win rate (consistent across timeframes)
-    elif rsi < 25 and month_change < -30:
-        action = "SPECULATIVE BUY"
-        confidence = "LOW"
-        reasoning.append("Capitulation level — deeply oversold")
-        reasoning.append("High risk/reward mean reversion play")
-        option_strategy = {"type": "BUY CALLS", "strike": "15-20% OTM", "expiry": "60-90 DTE"}
+    Based on 71-stock backtest with +20% target, -15% stop, 14/45 day holds.
+    """
+    for code, rule in ACTION_RULES:
+        if rule(score, ema_score, inst_score, rsi, month_change):
+            return ACTION_LEVELS[code]
+    return "HOLD"
 
-    # SELL — Strong sell signals
-    elif score < 25 and ema_score < 30 and inst_score < 40:
-        action = "SELL"
-        confidence = "HIGH"
-        reasoning.append("Weak technicals with distribution")
-        if month_change < -20:
-            reasoning.append("Significant downtrend accelerating")
-            option_strategy = {"type": "BUY PUTS", "strike": "ATM", "expiry": "45-60 DTE"}
 
-    # REDUCE — Deteriorating but not critical
-    elif score < 40 and month_change < -15 and inst_score < 45:
-        action = "REDUCE"
-        confidence = "MEDIUM"
-        reasoning.append("Deteriorating momentum with weak institutional flow")
+_classify_cached = functools.lru_cache(maxsize=65536)(_classify)
 
-    # WATCH — Potential setup forming
-    elif 55 <= score < 70 and 35 <= rsi <= 55:
-        action = "WATCH"
-        confidence = "LOW"
-        reasoning.append("Neutral setup — wait for score 70+ or RSI dip for entry")
-        if squeeze:
-            reasoning.append("Squeeze forming — watch for breakout trigger")
-
-    # HOLD — Default
-    else:
-        action = "HOLD"
-        confidence = "MEDIUM"
-        if score >= 50:
-            reasoning.append("Decent score but missing confirmation signals")
-        else:
-            reasoning.append("Insufficient momentum for new positions")
-
-    return _build_result(action, confidence, reasoning, option_strategy, stock_data)
-
-
-def _build_result(action, confidence, reasoning, option_strategy, stock_data):
+
+def _rsi_band(rsi: float) -> float:
+    """Representative RSI for the band between _classify's RSI thresholds."""
+    if rsi > 70:
+        return 100.0
+    if rsi > 65:
+        return 67.0
+    if rsi > 55:
+        return 60.0
+    if rsi >= 40:
+        return 40.0
+    if rsi >= 35:
+        return 35.0
+    if rsi >= 30:
+        return 30.0
+    if rsi >= 25:
+        return 25.0
+    return 0.0
+
+
+def _month_band(month_change: float) -> float:
+    """Representative 20-day change for the band between _classify's thresholds."""
+    if month_change < -30:
+        return -100.0
+    if month_change < -20:
+        return -30.0
+    if month_change < -15:
+        return -20.0
+    return 0.0
+
+
+def classify_action(score, ema_score, inst_score, rsi, month_change) -> str:
+    """Action level only, memoized on the threshold bands of RSI and 20d change.
+
+    RSI and momentum only matter relative to fixed thresholds, so snapping them
+    to a representative value per band gives the same answer as _classify()
+    while letting repeated scoring tuples hit the cache (e.g. in backtests).
+    """
+    if rsi != rsi:  # NaN compares False everywhere; no band represents that
+        return _classify(score, ema_score, inst_score, rsi, month_change)
+    return _classify_cached(score, ema_score, inst_score, _rsi_band(rsi), _month_band(month_change))
+
+
+def classify_actions_batch(stocks: pd.DataFrame) -> pd.Series:
+    """Action level for every row of a scan-results frame in one pass.
+
+    Columns are filled the way generate_recommendation() fills its dict
+    (missing score/EMA/momentum 0, RSI 50 when missing or 0, institutional
+    score 50); NaN is passed through, as the scalar path does.
+
+    Returns:
+        Series of action names (ACTION_DTYPE categorical) on the frame's index.
+    """
+    def column(name: str, default: float) -> np.ndarray:
+        if name not in stocks:
+            return np.full(len(stocks), float(default))
+        return pd.to_numeric(stocks[name], errors="coerce").to_numpy(dtype=np.float64)
+
+    rsi = column("rsi", 50)
+    codes = classify_codes(
+        column("score", 0),
+        column("ema_score", 0),
+        column("institutional_score", 50),
+        np.where(rsi == 0, 50.0, rsi),
+        column("momentum_20d", 0),
+    )
+    return pd.Series(pd.Categorical.from_codes(codes, dtype=ACTION_DTYPE), index=stocks.index)
+
+
+def _build_result(action, confidence, reasoning, option_strategy, stock_data, reason_mask=0):
     """Build the standard result dict."""
     return {
         "action": action,
         "confidence": confidence,
         "reasoning": reasoning,
+        "reason_mask": reason_mask,
         "option_strategy": option_strategy,
         "metrics": {
             "score": stock_data.get("score", 0),
             "rsi": stock_data.get("rsi", 50),
             "ema_score": stock_data.get("ema_score", 0),
-            "institutional_score": stock_data.get("institutional_score",
-                                                   stock_data.get("institutional_flow", {}).get("score", 50)
-                                                   if isinstance(stock_data.get("institutional_flow"), dict) else 50),
+            "institutional_score": stock_data["institutional_score"]
+            if "institutional_score" in stock_data
+            else _nested_score(stock_data, "institutional_flow", 50),
             "momentum_5d": stock_data.get("momentum_5d", 0),
             "momentum_20d": stock_data.get("momentum_20d", 0),
         },
@@ -176,6 +303,10 @@ def _build_result(action, confidence, reasoning, option_strategy, stock_data):
 
 # ─── Win Probability ──────────────────────────────────────────────────────────
 
+# (label, adjustment) per technical rule, in TECHNICAL_ADJUSTMENT_KEYS order
+_ADJUSTMENT_RULES = tuple(zip(TECHNICAL_ADJUSTMENT_LABELS, TECHNICAL_ADJUSTMENT_VEC.tolist()))
+
+
 def calculate_win_probability(action: str, stock_data: dict) -> dict:
     """Calculate win probability using base signal rates + technical adjustments.
 
@@ -197,62 +328,24 @@ def calculate_win_probability(action: str, stock_data: dict) -> dict:
     score = stock_data.get("score", 0) or 0
     squeeze = stock_data.get("bollinger_squeeze", False)
 
-    inst_score = stock_data.get("institutional_score", 50)
-    if inst_score is None:
-        inst_flow = stock_data.get("institutional_flow", {})
-        inst_score = inst_flow.get("score", 50) if isinstance(inst_flow, dict) else 50
-
-    # Apply technical adjustments
-    total_adjustment = 0.0
-    adjustments = []
-
-    # EMA high
-    if ema_score >= 70:
-        adj = TECHNICAL_ADJUSTMENTS["ema_high"]["adjustment"]
-        total_adjustment += adj
-        adjustments.append({"label": "EMA Score 70+", "value": adj})
-
-    # RSI overbought
-    if rsi > 70:
-        adj = TECHNICAL_ADJUSTMENTS["rsi_overbought"]["adjustment"]
-        total_adjustment += adj
-        adjustments.append({"label": "RSI Overbought", "value": adj})
-
-    # RSI optimal
-    if 40 <= rsi <= 65:
-        adj = TECHNICAL_ADJUSTMENTS["rsi_optimal"]["adjustment"]
-        total_adjustment += adj
-        adjustments.append({"label": "RSI Optimal Zone", "value": adj})
-
-    # Institutional strong
-    if inst_score >= 65:
-        adj = TECHNICAL_ADJUSTMENTS["inst_strong"]["adjustment"]
-        total_adjustment += adj
-        adjustments.append({"label": "Strong Inst. Flow", "value": adj})
-
-    # Score high
-    if score >= 55:
-        adj = TECHNICAL_ADJUSTMENTS["score_high"]["adjustment"]
-        total_adjustment += adj
-        adjustments.append({"label": "Overall Score 55+", "value": adj})
-
-    # Trend bullish
-    if ema_score >= 60:
-        adj = TECHNICAL_ADJUSTMENTS["trend_bullish"]["adjustment"]
-        total_adjustment += adj
-        adjustments.append({"label": "Bullish Trend", "value": adj})
-
-    # Trend bearish
-    if ema_score < 30:
-        adj = TECHNICAL_ADJUSTMENTS["trend_bearish"]["adjustment"]
-        total_adjustment += adj
-        adjustments.append({"label": "Bearish Trend", "value": adj})
-
-    # Squeeze potential
-    if squeeze:
-        adj = TECHNICAL_ADJUSTMENTS["squeeze_potential"]["adjustment"]
-        total_adjustment += adj
-        adjustments.append({"label": "Squeeze Setup", "value": adj})
+    inst_score = get_institutional_score(stock_data)
+
+    # Apply technical adjustments: one flag per rule, in TECHNICAL_ADJUSTMENT_KEYS order
+    hits = (
+        ema_score >= 70,        # ema_high
+        rsi > 70,               # rsi_overbought
+        40 <= rsi <= 65,        # rsi_optimal
+        inst_score >= 65,       # inst_strong
+        score >= 55,            # score_high
+        ema_score >= 60,        # trend_bullish
+        ema_score < 30,         # trend_bearish
+        squeeze,                # squeeze_potential
+    )
+    adjustments = [
+        {"label": label, "value": adj}
+        for (label, adj), hit in zip(_ADJUSTMENT_RULES, hits) if hit
+    ]
+    total_adjustment = sum((adj["value"] for adj in adjustments), 0.0)
 
     # Calculate final probability (clamped 0-1)
     win_probability = max(0.0, min(1.0, base_win_rate + total_adjustment))
@@ -1,7 +1,25 @@
 """Relative Strength vs SPY — computes RS Rank at multiple timeframes."""
 
+import numpy as np
 import pandas as pd
 
+# RS lookback periods in trading days: 1w, 1m, 3m, 6m
+RS_PERIODS = (5, 21, 63, 126)
+_PERIODS = np.array(RS_PERIODS)
+
+# Letter rating and badge color per decile of RS Rank (index = rank // 10)
+_RATING_LUT = ("F", "F", "D", "D+", "C", "C+", "B", "B+", "A", "A+")
+_COLOR_LUT = (
+    "#f44336", "#f44336",  # Red
+    "#ff5722", "#ff5722",  # Red-orange
+    "#ff9800", "#ff9800",  # Orange
+    "#4caf50", "#4caf50",  # Light green
+    "#00c853", "#00c853",  # Green
+)
+# Expanded to one entry per rank 0-99 so lookups index directly by rank
+_RATING_BY_RANK = tuple(_RATING_LUT[r // 10] for r in range(100))
+_COLOR_BY_RANK = tuple(_COLOR_LUT[r // 10] for r in range(100))
+
 
 def calculate_rs_vs_spy(stock_df: pd.DataFrame, spy_df: pd.DataFrame) -> dict:
     """Calculate relative strength of a stock vs SPY.
@@ -15,73 +33,72 @@ def calculate_rs_vs_spy(stock_df: pd.DataFrame, spy_df: pd.DataFrame) -> dict:
     """
     if stock_df.empty or spy_df.empty:
         return _default_rs()
+    if "close" not in stock_df.columns or "close" not in spy_df.columns:
+        return _default_rs()
 
-    try:
-        stock_close = stock_df["close"].values
-        spy_close = spy_df["close"].values
-
-        if len(stock_close) < 5 or len(spy_close) < 5:
-            return _default_rs()
-
-        current_stock = stock_close[-1]
-        current_spy = spy_close[-1]
-
-        # Calculate returns at different timeframes
-        def _pct_return(arr, periods):
-            if len(arr) > periods:
-                return (arr[-1] / arr[-periods - 1] - 1) * 100
-            return 0.0
-
-        rs_1w = _pct_return(stock_close, 5) - _pct_return(spy_close, 5)
-        rs_1m = _pct_return(stock_close, 21) - _pct_return(spy_close, 21)
-        rs_3m = _pct_return(stock_close, 63) - _pct_return(spy_close, 63)
-        rs_6m = _pct_return(stock_close, 126) - _pct_return(spy_close, 126)
-
-        # Weighted composite: 1m=50%, 3m=35%, 6m=15%
-        composite = rs_1m * 0.50 + rs_3m * 0.35 + rs_6m * 0.15
-
-        # Map to 0-99 RS Rank scale
-        # Composite range is roughly -50 to +50 for most stocks
-        # 50 = market-matching
-        rs_rank = int(max(0, min(99, 50 + composite * 1.0)))
-
-        # Letter rating
-        rs_rating = _rank_to_rating(rs_rank)
-
-        return {
-            "rs_rank": rs_rank,
-            "rs_1w": round(rs_1w, 2),
-            "rs_1m": round(rs_1m, 2),
-            "rs_3m": round(rs_3m, 2),
-            "rs_6m": round(rs_6m, 2),
-            "rs_composite": round(composite, 2),
-            "rs_rating": rs_rating,
-        }
-
-    except Exception:
+    stock_close = _close_array(stock_df["close"])
+    spy_close = _close_array(spy_df["close"])
+    if stock_close is None or spy_close is None:
         return _default_rs()
 
+    if len(stock_close) < 5 or len(spy_close) < 5:
+        return _default_rs()
+
+    rs_1w, rs_1m, rs_3m, rs_6m = (_period_returns(stock_close) - _period_returns(spy_close)).tolist()
+
+    # Weighted composite: 1m=50%, 3m=35%, 6m=15%
+    composite = rs_1m * 0.50 + rs_3m * 0.35 + rs_6m * 0.15
+
+    # Map to 0-99 RS Rank scale
+    # Composite range is roughly -50 to +50 for most stocks
+    # 50 = market-matching
+    rs_rank = int(max(0, min(99, 50 + composite * 1.0)))
+
+    # Letter rating
+    rs_rating = _rank_to_rating(rs_rank)
+
+    return {
+        "rs_rank": rs_rank,
+        "rs_1w": round(rs_1w, 2),
+        "rs_1m": round(rs_1m, 2),
+        "rs_3m": round(rs_3m, 2),
+        "rs_6m": round(rs_6m, 2),
+        "rs_composite": round(composite, 2),
+        "rs_rating": rs_rating,
+    }
+
+
+def _close_array(close: pd.Series) -> np.ndarray | None:
+    """Closes as float64, or None if any present value is not a number.
+
+    Object columns holding numbers are converted rather than rejected.
+    """
+    values = pd.to_numeric(close, errors="coerce")
+    if (values.isna() & close.notna()).any():
+        return None
+    return values.to_numpy(dtype=np.float64, copy=False)
+
+
+def _period_returns(close: np.ndarray) -> np.ndarray:
+    """% return over each RS period in one gather.
+
+    0 where history is too short or the base close is zero.
+    """
+    usable = len(close) > _PERIODS
+    base = close[np.where(usable, -_PERIODS - 1, -1)]
+    usable &= base != 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(usable, (close[-1] / base - 1) * 100, 0.0)
+
+
+def _rank_index(rank: int) -> int:
+    """Index into the per-rank tables: int(rank) clamped to 0-99."""
+    return min(int(rank), 99) if rank >= 0 else 0
+
 
 def _rank_to_rating(rank: int) -> str:
     """Convert RS Rank (0-99) to letter rating."""
-    if rank >= 90:
-        return "A+"
-    elif rank >= 80:
-        return "A"
-    elif rank >= 70:
-        return "B+"
-    elif rank >= 60:
-        return "B"
-    elif rank >= 50:
-        return "C+"
-    elif rank >= 40:
-        return "C"
-    elif rank >= 30:
-        return "D+"
-    elif rank >= 20:
-        return "D"
-    else:
-        return "F"
+    return _RATING_BY_RANK[_rank_index(rank)]
 
 
 def _default_rs() -> dict:
@@ -105,13 +122,4 @@ def format_rs_rank(rank: int) -> str:
 
 def rs_rank_color(rank: int) -> str:
     """Return color based on RS Rank."""
-    if rank >= 80:
-        return "#00c853"  # Green
-    elif rank >= 60:
-        return "#4caf50"  # Light green
-    elif rank >= 40:
-        return "#ff9800"  # Orange
-    elif rank >= 20:
-        return "#ff5722"  # Red-orange
-    else:
-        return "#f44336"  # Red
+    return _COLOR_BY_RANK[_rank_index(rank)]
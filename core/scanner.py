@@ -1,7 +1,10 @@
 """Full market scan orchestration — fetches data, scores, and filters stocks."""
 import datetime as dt
-import time
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 
@@ -9,18 +12,26 @@ from config import settings
 from config.settings import last_market_day
 from core.technicals import calculate_all_technicals
 from core.scoring import (
+    bar_arrays,
+    breakout_score_from_bars,
     calculate_institutional_flow,
     calculate_breakout_score,
     calculate_overall_score,
+    institutional_flow_from_bars,
     passes_scan_filters,
 )
+from core.scoring_kernels import nanmean
 from core.fundamentals import calculate_lightweight_moat
+from data.cache import get_cached, set_cached
+from data.rate_limit import RateLimiter
 
 
 def run_full_scan(
     polygon,
     filters: dict,
     progress_callback=None,
+    top_k: int | None = settings.TOP_N_RESULTS,
+    refresh: bool = False,
 ) -> pd.DataFrame:
     """Run a full market scan: fetch tickers, compute technicals, score, filter.
 
@@ -29,10 +40,26 @@ def run_full_scan(
         filters: Dict with min_price, min_volume, min_score, min_ema_score,
                  lookback_days, theme_symbols (optional list).
         progress_callback: Callable(current, total, message) for UI updates.
+        top_k: Keep only the top_k highest-scoring stocks (default
+               TOP_N_RESULTS); None keeps all.
+        refresh: Ignore a saved scan for these filters and scan again.
 
     Returns:
         DataFrame of passing stocks sorted by score descending.
     """
+    # The same filters on the same market day give the same result, so a
+    # finished scan is reused across reruns and sessions
+    market_day = last_market_day()
+    cache_key = _scan_cache_key(market_day, filters)
+    cached = None if refresh else get_cached(cache_key, ttl=settings.CACHE_TTL_SCANNER, fmt="parquet")
+    if cached is not None:
+        result_df = cached.copy()
+        result_df["reasons"] = result_df["reasons"].map(list)
+        if progress_callback:
+            progress_callback(len(result_df), len(result_df),
+                              f"Loaded saved scan: {len(result_df)} stocks found.")
+        return _rank_by_score(result_df, top_k)
+
     lookback = filters.get("lookback_days", settings.SCANNER_LOOKBACK_DAYS)
     theme_symbols = filters.get("theme_symbols")
 
@@ -47,7 +74,7 @@ def run_full_scan(
             return pd.DataFrame()
         # Filter to CS (common stock) type and exclude OTC-like tickers
         mask = ticker_df["type"].isin(["CS", ""])
-        mask &= ~ticker_df["ticker"].str.contains(r"\.", na=False)  # Exclude warrants etc
+        mask &= ~ticker_df["ticker"].str.contains(".", regex=False, na=False)  # Exclude warrants etc
         mask &= ticker_df["ticker"].str.len() <= 5
         all_tickers = ticker_df.loc[mask, "ticker"].tolist()
 
@@ -58,7 +85,6 @@ def run_full_scan(
     # 2. Get recent grouped daily for quick volume/price filter
     #    Use last completed market day (skips weekends/holidays)
     today = dt.date.today()
-    market_day = last_market_day()
     grouped = pd.DataFrame()
     try:
         grouped = polygon.get_grouped_daily(market_day)
@@ -77,12 +103,12 @@ def run_full_scan(
     if not grouped.empty:
         min_price = filters.get("min_price", settings.MIN_PRICE)
         min_volume = filters.get("min_volume", settings.MIN_VOLUME)
-        grouped_filtered = grouped[
+        mask = (
             (grouped["close"] >= min_price) &
             (grouped["volume"] >= min_volume) &
-            (grouped["ticker"].isin(all_tickers))
-        ]
-        candidate_tickers = grouped_filtered["ticker"].tolist()
+            grouped["ticker"].isin(all_tickers)
+        )
+        candidate_tickers = grouped.loc[mask, "ticker"].tolist()
     else:
         candidate_tickers = all_tickers[:500]  # Fallback limit
 
@@ -90,95 +116,173 @@ def run_full_scan(
     if progress_callback:
         progress_callback(0, total_candidates, f"Analyzing {total_candidates} candidates...")
 
-    # 3. Analyze each candidate
-    results = []
+    # 3. Analyze candidates concurrently — the work is dominated by HTTP waits
     to_date = market_day
     from_date = (today - dt.timedelta(days=lookback + 50)).isoformat()
+    limiter = RateLimiter(settings.SCANNER_API_DELAY)
+    batch_size = settings.SCANNER_BATCH_SIZE
+
+    # With more candidates than days in the window, one grouped-daily call
+    # per day is fewer requests than one aggregates call per ticker
+    history = {}
+    if total_candidates > np.busday_count(from_date, to_date) + 1:
+        if progress_callback:
+            progress_callback(0, total_candidates, "Loading daily bars for all candidates...")
+        history = polygon.get_grouped_history(candidate_tickers, from_date, to_date)
+
+    # Everything is queued up front so a slow ticker never holds back the
+    # next batch; the limiter alone paces requests. Cancel what is still
+    # queued if the scan is interrupted (e.g. a Streamlit rerun).
+    executor = ThreadPoolExecutor(max_workers=settings.SCANNER_MAX_WORKERS)
+    try:
+        futures = [
+            executor.submit(
+                _analyze_candidate, polygon, ticker, from_date, to_date, filters, limiter,
+                history.get(ticker),
+            )
+            for ticker in candidate_tickers
+        ]
+        found = failed = 0
+        for done, future in enumerate(as_completed(futures), 1):
+            if future.exception() is not None:
+                failed += 1
+            elif future.result() is not None:
+                found += 1
+            if progress_callback and done % batch_size == 0:
+                progress_callback(done, total_candidates, f"Analyzed {done} candidates ({found} found)")
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+    # Collect in submission order so tie-breaks match a serial scan
+    results = [
+        stock_data for future in futures
+        if future.exception() is None and (stock_data := future.result()) is not None
+    ]
 
-    for idx, ticker in enumerate(candidate_tickers):
-        if progress_callback and idx % 10 == 0:
-            progress_callback(idx, total_candidates, f"Analyzing {ticker}... ({len(results)} found)")
+    if progress_callback:
+        progress_callback(total_candidates, total_candidates, f"Scan complete! {len(results)} stocks found.")
 
-        try:
-            # Fetch price data
-            df = polygon.get_aggregates(ticker, from_date, to_date)
-            if df.empty or len(df) < 30:
-                continue
+    if not results:
+        return pd.DataFrame()
 
-            # Calculate technicals
-            technicals = calculate_all_technicals(df)
-            if not technicals:
-                continue
+    # Saved in submission order; ranking happens per call so any top_k
+    # can be served from the same file. A scan that fell back to a capped
+    # universe or lost candidates to fetch errors is not saved, so the next
+    # run tries again instead of serving it all day.
+    result_df = pd.DataFrame(results)
+    if not grouped.empty and failed <= total_candidates * settings.SCANNER_CACHE_MAX_FAILED:
+        set_cached(cache_key, result_df.copy(), fmt="parquet")
+    return _rank_by_score(result_df, top_k)
 
-            price = technicals["price"]
-            avg_volume = float(df["volume"].tail(20).mean())
 
-            # Quick filter check
-            if price < filters.get("min_price", settings.MIN_PRICE):
-                continue
-            if avg_volume < filters.get("min_volume", settings.MIN_VOLUME):
-                continue
+def _rank_by_score(result_df: pd.DataFrame, top_k: int | None) -> pd.DataFrame:
+    """Sort results by score descending, keeping only the top_k rows if given.
 
-            # Calculate scores
-            inst_flow = calculate_institutional_flow(df)
-            breakout = calculate_breakout_score(df, technicals)
-            overall = calculate_overall_score(technicals, inst_flow, breakout)
+    The sort is stable, so equal scores keep submission order. With a top_k
+    below the row count, np.partition finds the k-th best score in linear
+    time and only the rows at or above it are sorted; the result is the
+    first top_k rows of the full sort.
+    """
+    if top_k is None or top_k >= len(result_df):
+        return result_df.sort_values("score", ascending=False, kind="stable").reset_index(drop=True)
+    if top_k <= 0:
+        return result_df.iloc[:0].reset_index(drop=True)
+    scores = result_df["score"].to_numpy(dtype=np.float64)
+    cutoff = np.partition(scores, len(scores) - top_k)[len(scores) - top_k]
+    candidates = np.flatnonzero(scores >= cutoff)  # every row tied at the cutoff
+    top = candidates[np.argsort(-scores[candidates], kind="stable")][:top_k]
+    return result_df.iloc[top].reset_index(drop=True)
+
+
+def _scan_cache_key(market_day: str, filters: dict) -> str:
+    """Cache key for a scan: the market day plus a stable digest of the filters.
+
+    hash() is salted per process, so the digest is taken over the
+    canonical JSON form instead; that also covers list-valued filters.
+    """
+    canonical = json.dumps(filters, sort_keys=True, default=str)
+    digest = hashlib.sha1(canonical.encode()).hexdigest()[:16]
+    return f"scan_{market_day}_{digest}"
 
-            stock_data = {
-                "ticker": ticker,
-                "price": price,
-                "volume": avg_volume,
-                "score": overall["score"],
-                "ema_score": technicals["ema_score"],
-                "breakout_score": breakout["score"],
-                "institutional_score": inst_flow["score"],
-                "rsi": technicals.get("rsi"),
-                "adx": technicals.get("adx"),
-                "momentum_5d": technicals.get("momentum_5d", 0),
-                "momentum_20d": technicals.get("momentum_20d", 0),
-                "volume_ratio": technicals.get("volume_ratio", 1.0),
-                "bollinger_squeeze": technicals.get("bollinger_squeeze", False),
-                "breakout_pattern": breakout.get("pattern", ""),
-                "flow_signal": inst_flow.get("signal", "Neutral"),
-                "reasons": overall.get("reasons", []),
-            }
-
-            # Apply filter
-            if passes_scan_filters(stock_data, filters):
-                # Try to get company details for name/market cap
-                try:
-                    details = polygon.get_ticker_details(ticker)
-                    stock_data["name"] = details.get("name", ticker)
-                    stock_data["market_cap"] = details.get("market_cap")
-                    stock_data["sector"] = details.get("sic_description", "")
-
-                    moat = calculate_lightweight_moat(details)
-                    stock_data["moat_score"] = moat.get("moat_score")
-                    stock_data["moat_rating"] = moat.get("moat_rating")
-                except Exception:
-                    stock_data["name"] = ticker
-                    stock_data["market_cap"] = None
-                    stock_data["sector"] = ""
-                    stock_data["moat_score"] = None
-                    stock_data["moat_rating"] = None
-
-                results.append(stock_data)
-
-            # Rate limiting
-            time.sleep(settings.SCANNER_API_DELAY)
-
-        except Exception:
-            continue
 
-    if progress_callback:
-        progress_callback(total_candidates, total_candidates, f"Scan complete! {len(results)} stocks found.")
+def _analyze_candidate(polygon, ticker: str, from_date: str, to_date: str,
+                       filters: dict, limiter: RateLimiter,
+                       bars: pd.DataFrame | None = None) -> dict | None:
+    """Fetch, score and filter one scan candidate; None if it doesn't qualify.
 
-    if not results:
-        return pd.DataFrame()
+    Uses the preloaded bars when given, otherwise fetches them. Fetch and
+    scoring errors propagate so the scan can count them.
+    """
+    # Fetch price data
+    df = bars if bars is not None else polygon.get_aggregates(ticker, from_date, to_date, limiter=limiter)
+    if df.empty or len(df) < 30:
+        return None
+
+    # Calculate technicals
+    technicals = calculate_all_technicals(df)
+    if not technicals:
+        return None
+
+    price = technicals["price"]
+    arrays = bar_arrays(df)
+    avg_volume = float(nanmean(arrays["volume"][-20:]))
+
+    # Quick filter check
+    if price < filters.get("min_price", settings.MIN_PRICE):
+        return None
+    if avg_volume < filters.get("min_volume", settings.MIN_VOLUME):
+        return None
+    # EMA score comes with the technicals; reject on it before the other scores
+    if technicals["ema_score"] < filters.get("min_ema_score", 0):
+        return None
+
+    # Calculate scores
+    inst_flow = institutional_flow_from_bars(arrays)
+    breakout = breakout_score_from_bars(arrays, technicals)
+    overall = calculate_overall_score(technicals, inst_flow, breakout)
+
+    stock_data = {
+        "ticker": ticker,
+        "price": price,
+        "volume": avg_volume,
+        "score": overall["score"],
+        "ema_score": technicals["ema_score"],
+        "breakout_score": breakout["score"],
+        "institutional_score": inst_flow["score"],
+        "rsi": technicals.get("rsi"),
+        "adx": technicals.get("adx"),
+        "momentum_5d": technicals.get("momentum_5d", 0),
+        "momentum_20d": technicals.get("momentum_20d", 0),
+        "volume_ratio": technicals.get("volume_ratio", 1.0),
+        "avg_daily_move": technicals.get("avg_daily_move", 0),
+        "bollinger_squeeze": technicals.get("bollinger_squeeze", False),
+        "breakout_pattern": breakout.get("pattern", ""),
+        "flow_signal": inst_flow.get("signal", "Neutral"),
+        "reasons": overall.get("reasons", []),
+    }
 
-    result_df = pd.DataFrame(results)
-    result_df = result_df.sort_values("score", ascending=False).reset_index(drop=True)
-    return result_df
+    # Apply filter
+    if not passes_scan_filters(stock_data, filters):
+        return None
+
+    # Try to get company details for name/market cap
+    try:
+        details = polygon.get_ticker_details(ticker, limiter=limiter)
+        stock_data["name"] = details.get("name", ticker)
+        stock_data["market_cap"] = details.get("market_cap")
+        stock_data["sector"] = details.get("sic_description", "")
+
+        moat = calculate_lightweight_moat(details)
+        stock_data["moat_score"] = moat.get("moat_score")
+        stock_data["moat_rating"] = moat.get("moat_rating")
+    except Exception:
+        stock_data["name"] = ticker
+        stock_data["market_cap"] = None
+        stock_data["sector"] = ""
+        stock_data["moat_score"] = None
+        stock_data["moat_rating"] = None
+
+    return stock_data
 
 
 def analyze_single_stock(ticker: str, polygon, finnhub=None) -> dict:
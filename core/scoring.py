@@ -2,6 +2,8 @@
 import numpy as np
 import pandas as pd
 
+from core.scoring_kernels import breakout_stats, flow_stats, nanmean
+
 
 # ------------------------------------------------------------------
 # EMA Score (0-100) — delegates to technicals
@@ -17,31 +19,42 @@ def calculate_ema_score(emas: dict, current_price: float) -> int:
 # Institutional Flow Score (0-100)
 # ------------------------------------------------------------------
 
+def bar_arrays(df: pd.DataFrame) -> dict[str, np.ndarray]:
+    """The high/low/close/volume columns of a bars frame as float64 arrays.
+
+    Extract once per ticker and pass to the *_from_bars scorers; slices of
+    these arrays are views, so no per-window frames are built.
+    """
+    return {col: df[col].to_numpy(dtype=np.float64) for col in ("high", "low", "close", "volume")}
+
+
 def calculate_institutional_flow(df: pd.DataFrame) -> dict:
     """Analyze institutional accumulation/distribution patterns.
 
     Returns:
         Dict with score (0-100), signal label, signals list, and confidence.
     """
-    if df.empty or len(df) < 20:
+    if df.empty:
+        return {"score": 50, "signal": "Neutral", "signals": [], "confidence": "Low"}
+    return institutional_flow_from_bars(bar_arrays(df))
+
+
+def institutional_flow_from_bars(bars: dict[str, np.ndarray]) -> dict:
+    """calculate_institutional_flow() on arrays from bar_arrays()."""
+    closes = bars["close"]
+    volumes = bars["volume"]
+    if len(closes) < 20:
         return {"score": 50, "signal": "Neutral", "signals": [], "confidence": "Low"}
 
     score = 50
     signals = []
 
-    close = df["close"]
-    volume = df["volume"]
-    recent = df.tail(20)
+    avg_vol_20 = float(nanmean(volumes[-20:]))
+    up_vol, down_vol, obv_recent, obv_prior, ad_last, ad_prior, consecutive_up = flow_stats(
+        closes, volumes, bars["high"], bars["low"], avg_vol_20,
+    )
 
     # 1. Volume-Price Trend (up-day vs down-day volume)
-    up_vol = 0.0
-    down_vol = 0.0
-    for i in range(1, len(recent)):
-        if recent["close"].iloc[i] > recent["close"].iloc[i - 1]:
-            up_vol += recent["volume"].iloc[i]
-        else:
-            down_vol += recent["volume"].iloc[i]
-
     vol_ratio = up_vol / max(down_vol, 1)
     if vol_ratio > 1.5:
         score += 15
@@ -50,57 +63,30 @@ def calculate_institutional_flow(df: pd.DataFrame) -> dict:
         score -= 15
         signals.append(f"Distribution detected ({vol_ratio:.1f}x vol ratio)")
 
-    # 2. OBV Trend
-    obv = [0.0]
-    for i in range(1, min(30, len(df))):
-        idx = len(df) - 30 + i if len(df) >= 30 else i
-        if idx < len(df) and idx > 0:
-            if close.iloc[idx] > close.iloc[idx - 1]:
-                obv.append(obv[-1] + float(volume.iloc[idx]))
-            elif close.iloc[idx] < close.iloc[idx - 1]:
-                obv.append(obv[-1] - float(volume.iloc[idx]))
-            else:
-                obv.append(obv[-1])
-
-    if len(obv) >= 15:
-        obv_recent = np.mean(obv[-5:])
-        obv_prior = np.mean(obv[10:15]) if len(obv) >= 15 else np.mean(obv[:5])
-        if obv_recent > obv_prior * 1.1:
-            score += 10
-            signals.append("OBV trending up (accumulation)")
-        elif obv_recent < obv_prior * 0.9:
-            score -= 10
-            signals.append("OBV trending down (distribution)")
-
-    # 3. A/D Line
-    ad_values = []
-    ad = 0.0
-    tail = df.tail(30)
-    for i in range(len(tail)):
-        h = float(tail["high"].iloc[i])
-        l = float(tail["low"].iloc[i])
-        c = float(tail["close"].iloc[i])
-        v = float(tail["volume"].iloc[i])
-        mfm = ((c - l) - (h - c)) / max(h - l, 1e-10)
-        ad += mfm * v
-        ad_values.append(ad)
-
-    if len(ad_values) >= 15:
-        if ad_values[-1] > ad_values[-11]:
-            score += 10
-            signals.append("A/D Line rising (smart money buying)")
-        elif ad_values[-1] < ad_values[-11]:
-            score -= 10
-            signals.append("A/D Line falling (smart money selling)")
+    # 2. OBV Trend (last 5 bars vs the 5 bars 15-19 bars back)
+    if obv_recent > obv_prior * 1.1:
+        score += 10
+        signals.append("OBV trending up (accumulation)")
+    elif obv_recent < obv_prior * 0.9:
+        score -= 10
+        signals.append("OBV trending down (distribution)")
+
+    # 3. A/D Line (now vs 10 bars ago)
+    if ad_last > ad_prior:
+        score += 10
+        signals.append("A/D Line rising (smart money buying)")
+    elif ad_last < ad_prior:
+        score -= 10
+        signals.append("A/D Line falling (smart money selling)")
 
     # 4. Unusual Volume
-    if len(df) >= 25:
-        avg_vol = float(volume.iloc[-21:-1].mean())
-        recent_avg = float(volume.iloc[-5:].mean())
+    if len(closes) >= 25:
+        avg_vol = float(nanmean(volumes[-21:-1]))
+        recent_avg = float(nanmean(volumes[-5:]))
         if avg_vol > 0:
             vol_spike = recent_avg / avg_vol
             if vol_spike > 2:
-                price_change = (float(close.iloc[-1]) - float(close.iloc[-5])) / float(close.iloc[-5])
+                price_change = (float(closes[-1]) - float(closes[-5])) / float(closes[-5])
                 if price_change > 0:
                     score += 15
                     signals.append(f"Institutional accumulation ({vol_spike:.1f}x volume + price up)")
@@ -109,14 +95,6 @@ def calculate_institutional_flow(df: pd.DataFrame) -> dict:
                     signals.append(f"High volume selling ({vol_spike:.1f}x volume)")
 
     # 5. Consecutive up days on volume
-    consecutive_up = 0
-    avg_vol_20 = float(volume.iloc[-20:].mean()) if len(df) >= 20 else float(volume.mean())
-    for i in range(len(df) - 1, max(len(df) - 11, 0), -1):
-        if i > 0 and close.iloc[i] > close.iloc[i - 1] and volume.iloc[i] > avg_vol_20:
-            consecutive_up += 1
-        else:
-            break
-
     if consecutive_up >= 4:
         score += 10
         signals.append(f"{consecutive_up} consecutive up days on volume")
@@ -157,67 +135,57 @@ def calculate_breakout_score(df: pd.DataFrame, technicals: dict) -> dict:
     Returns:
         Dict with score (0-100), signals list, confidence, and pattern label.
     """
-    if df.empty or len(df) < 30:
+    if df.empty:
+        return {"score": 0, "signals": [], "confidence": "Low", "pattern": "Insufficient Data"}
+    return breakout_score_from_bars(bar_arrays(df), technicals)
+
+
+def breakout_score_from_bars(bars: dict[str, np.ndarray], technicals: dict) -> dict:
+    """calculate_breakout_score() on arrays from bar_arrays()."""
+    closes = bars["close"]
+    volumes = bars["volume"]
+    if len(closes) < 30:
         return {"score": 0, "signals": [], "confidence": "Low", "pattern": "Insufficient Data"}
 
     score = 0
     signals = []
 
-    close = df["close"]
-    volume = df["volume"]
-    high = df["high"]
-    low = df["low"]
-
-    # 1. Volume accumulation without price move
-    if len(df) >= 30:
-        recent_vol = float(volume.iloc[-10:].mean())
-        prior_vol = float(volume.iloc[-30:-10].mean())
-        recent_price_change = (float(close.iloc[-1]) - float(close.iloc[-10])) / float(close.iloc[-10]) * 100
-
-        if prior_vol > 0:
-            vol_increase = recent_vol / prior_vol
-            if vol_increase > 1.5 and abs(recent_price_change) < 5:
-                score += 20
-                signals.append(f"Stealth accumulation: {vol_increase:.1f}x volume, flat price")
-            elif vol_increase > 1.3 and abs(recent_price_change) < 8:
-                score += 12
-                signals.append("Quiet accumulation detected")
-
-    # 2. Tight trading range
-    if len(df) >= 15:
-        range_high = float(high.iloc[-15:].max())
-        range_low = float(low.iloc[-15:].min())
-        range_pct = (range_high - range_low) / range_low * 100
-
-        if range_pct < 10:
-            score += 15
-            signals.append(f"Tight consolidation: {range_pct:.1f}% range")
-        elif range_pct < 15:
-            score += 8
-            signals.append("Narrow trading range")
-
-    # 3. Higher lows pattern
-    if len(df) >= 15:
-        higher_lows = 0
-        for i in range(0, min(10, len(df) - 5), 5):
-            period_low1 = float(low.iloc[-(i + 5):-(i + 0) if i > 0 else len(df)].min())
-            period_low2 = float(low.iloc[-(i + 10):-(i + 5)].min()) if len(df) >= i + 10 else period_low1
-            if period_low1 > period_low2:
-                higher_lows += 1
+    recent_vol, prior_vol, range_high, range_low, higher_lows, avg_vol, quiet_vol = breakout_stats(
+        volumes, bars["high"], bars["low"],
+    )
+
+    # 1. Volume accumulation without price move (last 10 bars vs the 20 before)
+    recent_price_change = (float(closes[-1]) - float(closes[-10])) / float(closes[-10]) * 100
+    if prior_vol > 0:
+        vol_increase = recent_vol / prior_vol
+        if vol_increase > 1.5 and abs(recent_price_change) < 5:
+            score += 20
+            signals.append(f"Stealth accumulation: {vol_increase:.1f}x volume, flat price")
+        elif vol_increase > 1.3 and abs(recent_price_change) < 8:
+            score += 12
+            signals.append("Quiet accumulation detected")
+
+    # 2. Tight trading range (15 bars)
+    range_pct = (float(range_high) - float(range_low)) / float(range_low) * 100
+    if range_pct < 10:
+        score += 15
+        signals.append(f"Tight consolidation: {range_pct:.1f}% range")
+    elif range_pct < 15:
+        score += 8
+        signals.append("Narrow trading range")
 
-        if higher_lows >= 2:
-            score += 10
-            signals.append("Higher lows pattern forming")
+    # 3. Higher lows pattern (last three 5-bar lows)
+    if higher_lows >= 2:
+        score += 10
+        signals.append("Higher lows pattern forming")
 
     # 4. Volume dry-up then spike
-    if len(df) >= 20:
-        avg_vol = float(volume.iloc[-20:].mean())
-        if avg_vol > 0:
-            recent_spike = float(volume.iloc[-1]) > avg_vol * 1.5
-            prior_quiet = float(volume.iloc[-6:-1].mean()) < avg_vol * 0.8
-            if recent_spike and prior_quiet:
-                score += 15
-                signals.append("Volume spike after quiet period")
+    if avg_vol > 0:
+        recent_spike = volumes[-1] > avg_vol * 1.5
+        prior_quiet = quiet_vol < avg_vol * 0.8
+        if recent_spike and prior_quiet:
+            score += 15
+            signals.append("Volume spike after quiet period")
 
     # 5. Decreasing volatility
     atr = technicals.get("atr")
@@ -294,10 +262,7 @@ def calculate_overall_score(technicals: dict, institutional_flow: dict,
         reasons.append(f"Moderate EMA alignment ({ema_score})")
 
     # EMA signal bonus
-    ema_values = technicals.get("emas", {})
-    price = technicals.get("price", 0)
-    bullish_emas = sum(1 for v in ema_values.values() if price > v)
-    if bullish_emas >= 3:
+    if _bullish_ema_count(technicals) >= 3:
         score += 8
         reasons.append("Price above multiple EMAs")
 
@@ -369,6 +334,72 @@ def calculate_overall_score(technicals: dict, institutional_flow: dict,
     }
 
 
+def _bullish_ema_count(technicals: dict) -> int:
+    """Number of EMAs the price is trading above."""
+    price = technicals.get("price", 0)
+    return sum(1 for v in technicals.get("emas", {}).values() if price > v)
+
+
+OVERALL_SCORE_COLUMNS = [
+    "ema_score", "bullish_emas", "institutional_score", "breakout_score",
+    "momentum_5d", "momentum_20d", "volume_ratio", "rsi",
+]
+
+
+def overall_score_inputs(technicals: dict, institutional_flow: dict,
+                         breakout: dict) -> dict:
+    """The values calculate_overall_score() reads, as one row for overall_scores_batch().
+
+    Missing values get the scalar path's defaults; a missing RSI becomes NaN.
+    """
+    rsi = technicals.get("rsi")
+    return {
+        "ema_score": technicals.get("ema_score", 0),
+        "bullish_emas": _bullish_ema_count(technicals),
+        "institutional_score": institutional_flow.get("score", 50),
+        "breakout_score": breakout.get("score", 0),
+        "momentum_5d": technicals.get("momentum_5d", 0),
+        "momentum_20d": technicals.get("momentum_20d", 0),
+        "volume_ratio": technicals.get("volume_ratio", 1.0),
+        "rsi": np.nan if rsi is None else rsi,
+    }
+
+
+def overall_scores_batch(inputs: pd.DataFrame) -> np.ndarray:
+    """calculate_overall_score()'s score for many stocks at once.
+
+    Each threshold ladder becomes one np.select over whole columns. Points
+    are added in the scalar order, so the float sums, and hence the
+    rounding, match it exactly.
+
+    Args:
+        inputs: One row per stock, columns as built by overall_score_inputs().
+
+    Returns:
+        Array of int scores (0-100), aligned with the rows of inputs.
+    """
+    def column(name: str) -> np.ndarray:
+        return inputs[name].to_numpy(dtype=np.float64)
+
+    inst = column("institutional_score")
+    brk = column("breakout_score")
+    mom_5d = column("momentum_5d")
+    mom_20d = column("momentum_20d")
+    vol_ratio = column("volume_ratio")
+    rsi = column("rsi")
+
+    score = column("ema_score") * 0.35
+    score += np.where(column("bullish_emas") >= 3, 8, 0)
+    score += np.select([inst >= 70, inst >= 55, inst <= 30], [18, 10, -10], 0)
+    score += np.select([brk >= 50, brk >= 35, brk >= 20], [8, 5, 3], 0)
+    score += np.select([mom_5d > 10, mom_5d > 5, mom_5d > 0], [4, 2, 1], 0)
+    score += np.select([mom_20d > 15, mom_20d > 10], [8, 5], 0)
+    score += np.select([vol_ratio > 2, vol_ratio > 1.5], [12, 8], 0)
+    score += np.select([(rsi >= 50) & (rsi <= 70), (rsi > 70) & (rsi < 80)], [8, 4], 0)
+    # np.round rounds half to even, as round() does
+    return np.clip(np.round(score), 0, 100).astype(int)
+
+
 # ------------------------------------------------------------------
 # Filter check for scanner
 # ------------------------------------------------------------------
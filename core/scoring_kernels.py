@@ -0,0 +1,215 @@
+"""Compiled window statistics for the flow and breakout scores (numba optional).
+
+flow_stats() and breakout_stats() reduce the trailing bars of one ticker to
+the handful of numbers scoring.py thresholds on. With numba installed they
+are @njit single-pass loops; without it the vectorized NumPy versions are
+used. The two agree up to floating-point summation order (exactly, for
+whole-share volumes). NaNs are skipped in means/min/max, as pandas does.
+"""
+import numpy as np
+
+from core._numba import HAVE_NUMBA, njit
+
+
+def _nanmean_loop(values):
+    """Mean of the non-NaN values; NaN if there are none."""
+    total = 0.0
+    count = 0
+    for v in values:
+        if not np.isnan(v):
+            total += v
+            count += 1
+    return total / count if count else np.nan
+
+
+def _nanmin_loop(values):
+    """Minimum of the non-NaN values; NaN if there are none."""
+    result = np.nan
+    for v in values:
+        if not np.isnan(v) and (np.isnan(result) or v < result):
+            result = v
+    return result
+
+
+def _nanmax_loop(values):
+    """Maximum of the non-NaN values; NaN if there are none."""
+    result = np.nan
+    for v in values:
+        if not np.isnan(v) and (np.isnan(result) or v > result):
+            result = v
+    return result
+
+
+def nanmean(values):
+    """Mean of the non-NaN values, NaN if none; matches pandas' skipna mean."""
+    valid = ~np.isnan(values)
+    count = valid.sum()
+    return np.where(valid, values, 0.0).sum() / count if count else np.nan
+
+
+# ------------------------------------------------------------------
+# Institutional flow
+# ------------------------------------------------------------------
+
+def _flow_stats_loop(closes, volumes, highs, lows, avg_vol_20):
+    """One pass over the last 30 bars; compiled with numba when available.
+
+    Expects at least 20 bars.
+
+    Returns:
+        (up_vol, down_vol, obv_recent, obv_prior, ad_last, ad_prior,
+        consecutive_up): up/down-day volume over the last 20 bars, OBV means
+        over the last 5 bars and the 5 bars 15-19 bars back, the A/D line now and 10
+        bars ago, and the run of up days on above-average volume ending today.
+    """
+    n = len(closes)
+    start = n - min(30, n)
+
+    up_vol = 0.0
+    down_vol = 0.0
+    obv = 0.0
+    obv_recent = 0.0
+    obv_prior = 0.0
+    ad = 0.0
+    ad_prior = 0.0
+    for i in range(start, n):
+        k = i - start
+        if k > 0:
+            if closes[i] > closes[i - 1]:
+                obv += volumes[i]
+            elif closes[i] < closes[i - 1]:
+                obv -= volumes[i]
+            # Flat days count as down days for the volume-price trend
+            if i >= n - 19:
+                if closes[i] > closes[i - 1]:
+                    up_vol += volumes[i]
+                else:
+                    down_vol += volumes[i]
+        if n - 20 <= i < n - 15:
+            obv_prior += obv
+        if i >= n - 5:
+            obv_recent += obv
+
+        bar_range = highs[i] - lows[i]
+        if bar_range < 1e-10:
+            bar_range = 1e-10
+        ad += ((closes[i] - lows[i]) - (highs[i] - closes[i])) / bar_range * volumes[i]
+        if i == n - 11:
+            ad_prior = ad
+
+    consecutive_up = 0
+    for i in range(n - 1, n - 11, -1):
+        if closes[i] > closes[i - 1] and volumes[i] > avg_vol_20:
+            consecutive_up += 1
+        else:
+            break
+
+    return up_vol, down_vol, obv_recent / 5, obv_prior / 5, ad, ad_prior, consecutive_up
+
+
+def _flow_stats_numpy(closes, volumes, highs, lows, avg_vol_20):
+    """Vectorized flow statistics; same contract as _flow_stats_loop."""
+    # cumsum keeps the bar-by-bar summation order
+    recent_close = closes[-20:]
+    recent_volume = volumes[-20:][1:]
+    up_day = recent_close[1:] > recent_close[:-1]
+    up_vol = float(np.where(up_day, recent_volume, 0.0).cumsum()[-1])
+    down_vol = float(np.where(up_day, 0.0, recent_volume).cumsum()[-1])
+
+    window_close = closes[-30:]
+    window_volume = volumes[-30:][1:]
+    obv_step = np.where(
+        window_close[1:] > window_close[:-1], window_volume,
+        np.where(window_close[1:] < window_close[:-1], -window_volume, 0.0),
+    )
+    obv = np.concatenate(([0.0], obv_step.cumsum()))
+
+    h = highs[-30:]
+    l = lows[-30:]
+    mfm = ((window_close - l) - (h - window_close)) / np.maximum(h - l, 1e-10)
+    ad_values = (mfm * volumes[-30:]).cumsum()
+
+    up_on_volume = (closes[-10:] > closes[-11:-1]) & (volumes[-10:] > avg_vol_20)
+    # Length of the run of qualifying days ending at the latest bar
+    consecutive_up = int(np.argmin(np.append(up_on_volume[::-1], False)))
+
+    return (
+        up_vol, down_vol, np.mean(obv[-5:]), np.mean(obv[-20:-15]),
+        ad_values[-1], ad_values[-11], consecutive_up,
+    )
+
+
+# ------------------------------------------------------------------
+# Pre-breakout
+# ------------------------------------------------------------------
+
+def _breakout_stats_loop(volumes, highs, lows):
+    """Window reductions for the breakout score; compiled with numba when available.
+
+    Expects at least 30 bars.
+
+    Returns:
+        (recent_vol, prior_vol, range_high, range_low, higher_lows,
+        avg_vol_20, quiet_vol): mean volume of the last 10 and the 20 bars
+        before, the 15-bar high/low range, how many of the last three 5-bar
+        lows rose, the 20-bar mean volume and the mean of the 5 bars before today.
+    """
+    low_0 = _nanmin_loop(lows[-5:])
+    low_5 = _nanmin_loop(lows[-10:-5])
+    low_10 = _nanmin_loop(lows[-15:-10])
+    higher_lows = int(low_0 > low_5) + int(low_5 > low_10)
+    return (
+        _nanmean_loop(volumes[-10:]),
+        _nanmean_loop(volumes[-30:-10]),
+        _nanmax_loop(highs[-15:]),
+        _nanmin_loop(lows[-15:]),
+        higher_lows,
+        _nanmean_loop(volumes[-20:]),
+        _nanmean_loop(volumes[-6:-1]),
+    )
+
+
+def _breakout_stats_numpy(volumes, highs, lows):
+    """Vectorized breakout statistics; same contract as _breakout_stats_loop."""
+    period_lows = np.fmin.reduce(lows[-15:].reshape(3, 5), axis=1)  # oldest first
+    higher_lows = int((period_lows[1:] > period_lows[:-1]).sum())
+
+    # One prefix sum over the last 30 bars serves every volume window
+    tail = volumes[-30:]
+    valid = ~np.isnan(tail)
+    sums = np.concatenate(([0.0], np.where(valid, tail, 0.0).cumsum()))
+    counts = np.concatenate(([0], valid.cumsum()))
+
+    def window_mean(start, stop):
+        """NaN-skipping mean of tail[start:stop]."""
+        count = counts[stop] - counts[start]
+        return (sums[stop] - sums[start]) / count if count else np.nan
+
+    return (
+        window_mean(20, 30),
+        window_mean(0, 20),
+        np.fmax.reduce(highs[-15:]),
+        np.fmin.reduce(lows[-15:]),
+        higher_lows,
+        window_mean(10, 30),
+        window_mean(24, 29),
+    )
+
+
+if HAVE_NUMBA:
+    _nanmean_loop = njit(cache=True)(_nanmean_loop)
+    _nanmin_loop = njit(cache=True)(_nanmin_loop)
+    _nanmax_loop = njit(cache=True)(_nanmax_loop)
+    flow_stats = njit(cache=True)(_flow_stats_loop)
+    breakout_stats = njit(cache=True)(_breakout_stats_loop)
+else:
+    flow_stats = _flow_stats_numpy
+    breakout_stats = _breakout_stats_numpy
+
+
+def warm_up() -> None:
+    """Compile flow_stats() and breakout_stats() for float64 inputs (no-op without numba)."""
+    if HAVE_NUMBA:
+        bars = np.ones(30)
+        flow_stats(bars, bars, bars, bars, 1.0)
+        breakout_stats(bars, bars, bars)
@@ -1,6 +1,7 @@
 """Technical analysis calculations — EMA, RSI, MACD, Bollinger, ATR, ADX, volume."""
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 
 
 # ------------------------------------------------------------------
@@ -28,7 +29,6 @@ def calculate_ema_score(emas: dict, current_price: float) -> int:
 
     Higher score = better bullish alignment (price > EMA8 > EMA21 > EMA50 > EMA200).
     """
-    score = 0
     periods = sorted(emas.keys())
 
     # Get the latest EMA values
@@ -38,17 +38,32 @@ def calculate_ema_score(emas: dict, current_price: float) -> int:
         if len(s) > 0 and pd.notna(s.iloc[-1]):
             latest[p] = float(s.iloc[-1])
 
+    # Short EMAs rising over the last 5 bars
+    rising = {}
+    for p in [8, 21]:
+        if p in emas and len(emas[p]) >= 5:
+            recent = float(emas[p].iloc[-1])
+            prior = float(emas[p].iloc[-5])
+            rising[p] = pd.notna(recent) and pd.notna(prior) and recent > prior
+
+    return _score_ema_alignment(latest, rising, current_price)
+
+
+def _score_ema_alignment(latest: dict, rising: dict, current_price: float) -> int:
+    """Shared EMA scoring from latest EMA values and short-EMA trend flags."""
     if not latest:
         return 0
 
+    score = 0
+    sorted_periods = sorted(latest.keys())
+
     # Price above EMAs (up to 40 points)
-    for p in periods:
-        if p in latest and current_price > latest[p]:
+    for p in sorted_periods:
+        if current_price > latest[p]:
             weight = {8: 10, 21: 10, 50: 10, 200: 10}.get(p, 5)
             score += weight
 
     # EMA stacking order (up to 30 points)
-    sorted_periods = sorted(latest.keys())
     for i in range(len(sorted_periods) - 1):
         p_short = sorted_periods[i]
         p_long = sorted_periods[i + 1]
@@ -67,11 +82,8 @@ def calculate_ema_score(emas: dict, current_price: float) -> int:
 
     # Trend direction - short EMAs rising (up to 15 points)
     for p in [8, 21]:
-        if p in emas and len(emas[p]) >= 5:
-            recent = float(emas[p].iloc[-1])
-            prior = float(emas[p].iloc[-5])
-            if pd.notna(recent) and pd.notna(prior) and recent > prior:
-                score += 7 if p == 8 else 8
+        if rising.get(p):
+            score += 7 if p == 8 else 8
 
     return min(score, 100)
 
@@ -256,22 +268,18 @@ def calculate_accumulation_distribution(df: pd.DataFrame) -> pd.Series:
 def calculate_support_resistance(df: pd.DataFrame, window: int = 5,
                                   num_levels: int = 3) -> dict:
     """Calculate support and resistance levels from swing points."""
-    high = df["high"]
-    low = df["low"]
-
-    supports = []
-    resistances = []
-
-    for i in range(window, len(df) - window):
-        # Swing high
-        if all(high.iloc[i] >= high.iloc[i - j] for j in range(1, window + 1)) and \
-           all(high.iloc[i] >= high.iloc[i + j] for j in range(1, window + 1)):
-            resistances.append(float(high.iloc[i]))
-
-        # Swing low
-        if all(low.iloc[i] <= low.iloc[i - j] for j in range(1, window + 1)) and \
-           all(low.iloc[i] <= low.iloc[i + j] for j in range(1, window + 1)):
-            supports.append(float(low.iloc[i]))
+    high = df["high"].to_numpy()
+    low = df["low"].to_numpy()
+
+    # A swing point is the extreme of the centered (2*window + 1)-bar window;
+    # NaN anywhere in the window rules it out, as the comparisons fail
+    span = 2 * window + 1
+    if len(df) >= span:
+        centre = slice(window, len(df) - window)
+        resistances = high[centre][high[centre] >= sliding_window_view(high, span).max(axis=1)].tolist()
+        supports = low[centre][low[centre] <= sliding_window_view(low, span).min(axis=1)].tolist()
+    else:
+        supports, resistances = [], []
 
     # Deduplicate by clustering close levels (within 1%)
     supports = _cluster_levels(supports)[:num_levels]
@@ -380,3 +388,130 @@ def calculate_all_technicals(df: pd.DataFrame) -> dict:
         "_bollinger": bb,
         "_atr_series": atr,
     }
+
+
+# ------------------------------------------------------------------
+# Series indicators (backtesting)
+# ------------------------------------------------------------------
+
+def precompute_series_indicators(df: pd.DataFrame) -> dict[str, np.ndarray]:
+    """Compute the scoring indicators over the full history in one pass.
+
+    Every indicator here is causal (EMA, Wilder RSI, rolling mean/std), so the
+    value at bar i equals what calculate_all_technicals() reports for
+    df.iloc[:i + 1]. Use technicals_at() to sample a bar.
+
+    Returns:
+        Dict of float arrays aligned with df rows.
+    """
+    close = df["close"]
+    series = {
+        "close": close.to_numpy(dtype=np.float64),
+        "volume": df["volume"].to_numpy(dtype=np.float64),
+        "rsi": calculate_rsi(df).to_numpy(dtype=np.float64),
+        "atr": calculate_atr(df).to_numpy(dtype=np.float64),
+        "bandwidth": calculate_bollinger(df)["bandwidth"].to_numpy(dtype=np.float64),
+    }
+    for p, ema in calculate_emas(df).items():
+        series[f"ema{p}"] = ema.to_numpy(dtype=np.float64)
+    return series
+
+
+_SERIES_EMA_PERIODS = (8, 21, 50, 200)
+
+
+def technicals_at(series: dict[str, np.ndarray], i: int) -> dict:
+    """Scoring subset of calculate_all_technicals() at bar i of precomputed series.
+
+    Covers the keys the scoring and recommendation functions read (price, emas,
+    ema_score, rsi, momentum, volume ratio, ATR, Bollinger squeeze); chart
+    series, MACD, ADX and support/resistance are not included.
+    """
+    if i + 1 < 30:
+        return {}
+
+    close = series["close"]
+    current_price = float(close[i])
+
+    emas = {}
+    rising = {}
+    for p in _SERIES_EMA_PERIODS:
+        ema = series[f"ema{p}"]
+        if pd.notna(ema[i]):
+            emas[p] = float(ema[i])
+        if p in (8, 21) and i + 1 >= 5:
+            recent, prior = float(ema[i]), float(ema[i - 4])
+            rising[p] = pd.notna(recent) and pd.notna(prior) and recent > prior
+    ema_score = _score_ema_alignment(emas, rising, current_price)
+
+    rsi_value = float(series["rsi"][i]) if pd.notna(series["rsi"][i]) else None
+    atr_value = float(series["atr"][i]) if pd.notna(series["atr"][i]) else None
+
+    # Bollinger squeeze: bandwidth in lowest 20% of the trailing 120 bars
+    bandwidth = series["bandwidth"]
+    squeeze = False
+    if i + 1 >= 120:
+        recent_bw = pd.Series(bandwidth[i - 119:i + 1])
+        squeeze = bandwidth[i] <= recent_bw.quantile(0.20)
+
+    # Volume ratio vs the prior 20 bars
+    volume = series["volume"]
+    vol_ratio = 1.0
+    if i + 1 >= 21:
+        avg_vol = pd.Series(volume[i - 20:i]).mean()
+        if avg_vol != 0:
+            vol_ratio = float(volume[i] / avg_vol)
+
+    momentum_5d = (current_price - float(close[i - 5])) / float(close[i - 5]) * 100
+    momentum_20d = (current_price - float(close[i - 20])) / float(close[i - 20]) * 100
+
+    return {
+        "price": current_price,
+        "emas": emas,
+        "ema_score": ema_score,
+        "rsi": rsi_value,
+        "bollinger_squeeze": squeeze,
+        "bollinger_bandwidth": float(bandwidth[i]),
+        "atr": atr_value,
+        "atr_pct": (atr_value / current_price * 100) if atr_value else None,
+        "volume_ratio": vol_ratio,
+        "momentum_5d": momentum_5d,
+        "momentum_20d": momentum_20d,
+        "avg_daily_move": atr_value if atr_value else 0,
+    }
+
+
+def ema_score_series(series: dict[str, np.ndarray]) -> np.ndarray:
+    """Vectorized calculate_ema_score() for every bar of precomputed series.
+
+    Bars where any EMA is NaN fall back to the scalar scorer.
+    """
+    close = series["close"]
+    e8, e21, e50, e200 = (series[f"ema{p}"] for p in _SERIES_EMA_PERIODS)
+    n = len(close)
+
+    # Price above EMAs (10 each) + stacking order (10 per ordered pair)
+    score = 10 * ((close > e8).astype(np.int64) + (close > e21) + (close > e50) + (close > e200))
+    score += 10 * ((e8 > e21).astype(np.int64) + (e21 > e50) + (e50 > e200))
+
+    # Proximity to EMA8
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dist_pct = np.abs(close - e8) / e8 * 100
+    score += np.select([dist_pct < 1, dist_pct < 2, dist_pct < 3], [15, 10, 5], 0)
+
+    # Short EMAs rising vs 4 bars earlier
+    if n > 4:
+        score[4:] += 7 * (e8[4:] > e8[:-4]) + 8 * (e21[4:] > e21[:-4])
+
+    score = np.minimum(score, 100)
+
+    nan_rows = np.flatnonzero(np.isnan(e8) | np.isnan(e21) | np.isnan(e50) | np.isnan(e200))
+    for i in nan_rows:
+        emas = {p: float(series[f"ema{p}"][i]) for p in _SERIES_EMA_PERIODS if pd.notna(series[f"ema{p}"][i])}
+        rising = {}
+        for p in (8, 21):
+            if i >= 4:
+                recent, prior = float(series[f"ema{p}"][i]), float(series[f"ema{p}"][i - 4])
+                rising[p] = pd.notna(recent) and pd.notna(prior) and recent > prior
+        score[i] = _score_ema_alignment(emas, rising, float(close[i]))
+    return score
@@ -2,11 +2,41 @@
 import json
 import os
 import pickle
+import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
 
+import pandas as pd
+
 CACHE_DIR = Path(__file__).resolve().parent.parent / "cache"
 CACHE_DIR.mkdir(exist_ok=True)
+_CACHE_SUFFIXES = (".json", ".pickle", ".parquet")
+
+# In-process layer over the disk cache: path -> (written_at, data).
+# Entries are shared between callers, so cached data must be treated as read-only.
+_MEMORY_MAX_ENTRIES = 512
+_memory: OrderedDict[Path, tuple[float, object]] = OrderedDict()
+_memory_lock = threading.Lock()
+
+
+def _memory_get(path: Path, ttl: int):
+    with _memory_lock:
+        hit = _memory.get(path)
+        if hit is None:
+            return None
+        if time.time() - hit[0] > ttl:
+            return None
+        _memory.move_to_end(path)
+        return hit[1]
+
+
+def _memory_put(path: Path, written_at: float, data):
+    with _memory_lock:
+        _memory[path] = (written_at, data)
+        _memory.move_to_end(path)
+        while len(_memory) > _MEMORY_MAX_ENTRIES:
+            _memory.popitem(last=False)
 
 
 def _cache_path(key: str, fmt: str = "json") -> Path:
@@ -20,25 +50,33 @@ def get_cached(key: str, ttl: int = 86400, fmt: str = "json"):
     Args:
         key: Cache key identifier.
         ttl: Time-to-live in seconds.
-        fmt: 'json' or 'pickle'.
+        fmt: 'json', 'pickle' or 'parquet' (DataFrames only).
 
     Returns:
         Cached data or None if expired/missing.
     """
     path = _cache_path(key, fmt)
+    data = _memory_get(path, ttl)
+    if data is not None:
+        return data
     if not path.exists():
         return None
-    if time.time() - path.stat().st_mtime > ttl:
+    mtime = path.stat().st_mtime
+    if time.time() - mtime > ttl:
         return None
     try:
         if fmt == "json":
             with open(path, "r") as f:
-                return json.load(f)
+                data = json.load(f)
+        elif fmt == "parquet":
+            data = pd.read_parquet(path, engine="pyarrow", memory_map=True)
         else:
             with open(path, "rb") as f:
-                return pickle.load(f)
+                data = pickle.load(f)
     except Exception:
         return None
+    _memory_put(path, mtime, data)
+    return data
 
 
 def set_cached(key: str, data, fmt: str = "json"):
@@ -47,13 +85,16 @@ def set_cached(key: str, data, fmt: str = "json"):
     Args:
         key: Cache key identifier.
         data: Data to cache.
-        fmt: 'json' or 'pickle'.
+        fmt: 'json', 'pickle' or 'parquet' (DataFrames only).
     """
     path = _cache_path(key, fmt)
+    _memory_put(path, time.time(), data)
     try:
         if fmt == "json":
             with open(path, "w") as f:
                 json.dump(data, f)
+        elif fmt == "parquet":
+            data.to_parquet(path, engine="pyarrow", compression="zstd", index=False)
         else:
             with open(path, "wb") as f:
                 pickle.dump(data, f)
@@ -63,15 +104,17 @@ def set_cached(key: str, data, fmt: str = "json"):
 
 def clear_cache():
     """Remove all cached files."""
+    with _memory_lock:
+        _memory.clear()
     for f in CACHE_DIR.iterdir():
-        if f.is_file() and f.suffix in (".json", ".pickle"):
+        if f.is_file() and f.suffix in _CACHE_SUFFIXES:
             f.unlink()
 
 
 def cache_stats() -> dict:
     """Return cache statistics."""
     files = list(CACHE_DIR.iterdir())
-    cache_files = [f for f in files if f.is_file() and f.suffix in (".json", ".pickle")]
+    cache_files = [f for f in files if f.is_file() and f.suffix in _CACHE_SUFFIXES]
     total_size = sum(f.stat().st_size for f in cache_files)
     return {
         "file_count": len(cache_files),
@@ -1,12 +1,12 @@
 """Finnhub API wrapper — news sentiment, basic metrics, earnings calendar."""
 import datetime as dt
 
-import requests
 import streamlit as st
 
 from config.settings import FINNHUB_API_KEY
 from config import settings
 from data.cache import get_cached, set_cached
+from data.http_session import get_http_session
 
 FINNHUB_BASE_URL = "https://finnhub.io/api/v1"
 
@@ -26,7 +26,7 @@ class FinnhubData:
         params = params or {}
         params["token"] = self.api_key
         url = f"{FINNHUB_BASE_URL}/{endpoint}"
-        resp = requests.get(url, params=params, timeout=15)
+        resp = get_http_session().get(url, params=params, timeout=15)
         resp.raise_for_status()
         return resp.json()
 
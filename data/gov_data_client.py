@@ -1,10 +1,8 @@
 """Government data clients — USAspending.gov and Federal Register APIs."""
 
-import requests
-
+from config.settings import GOV_API_CACHE_TTL as GOV_CACHE_TTL
 from data.cache import get_cached, set_cached
-
-GOV_CACHE_TTL = 3600  # 1 hour
+from data.http_session import get_http_session
 
 
 def fetch_usaspending_contracts(
@@ -58,7 +56,7 @@ def fetch_usaspending_contracts(
     }
 
     try:
-        resp = requests.post(url, json=payload, timeout=15)
+        resp = get_http_session().post(url, json=payload, timeout=15)
         resp.raise_for_status()
         data = resp.json()
 
@@ -111,7 +109,7 @@ def fetch_federal_register(
     }
 
     try:
-        resp = requests.get(url, params=params, timeout=15)
+        resp = get_http_session().get(url, params=params, timeout=15)
         resp.raise_for_status()
         data = resp.json()
 
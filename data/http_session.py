@@ -0,0 +1,14 @@
+"""Shared HTTP session for the REST clients (Finnhub, government APIs)."""
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+
+
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """Return a process-wide Session so connections are kept alive across calls."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=3)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
@@ -1,10 +1,15 @@
-"""File-based JSON persistence for user data — replaces localStorage from the HTML app."""
+"""File-based persistence for user data — replaces localStorage from the HTML app.
+
+Settings, portfolios and alerts are JSON; trade history is Parquet.
+"""
 import json
 import os
 import datetime as dt
 from pathlib import Path
 from copy import deepcopy
 
+import pandas as pd
+
 from config.portfolios import PREDEFINED_PORTFOLIOS, DEFAULT_CUSTOM_PORTFOLIOS
 
 # Persistence directory — relative to project root
@@ -12,9 +17,15 @@ _PROJECT_ROOT = Path(__file__).resolve().parent.parent
 PERSISTENCE_DIR = _PROJECT_ROOT / "data" / "user"
 
 
+_dir_ready = False
+
+
 def _ensure_dir():
-    """Create persistence directory if it doesn't exist."""
-    PERSISTENCE_DIR.mkdir(parents=True, exist_ok=True)
+    """Create persistence directory on first use (once per process)."""
+    global _dir_ready
+    if not _dir_ready:
+        PERSISTENCE_DIR.mkdir(parents=True, exist_ok=True)
+        _dir_ready = True
 
 
 def _read_json(filename: str) -> dict | list:
@@ -48,8 +59,8 @@ def load_portfolios() -> dict:
     """
     saved = _read_json("portfolios.json")
 
-    # Always include latest predefined portfolios
-    portfolios = deepcopy(PREDEFINED_PORTFOLIOS)
+    # Always include latest predefined portfolios (frozen config -> editable dicts)
+    portfolios = {pid: p.to_dict() for pid, p in PREDEFINED_PORTFOLIOS.items()}
 
     # Merge saved holdings data into predefined portfolios
     for pid, pdata in portfolios.items():
@@ -206,15 +217,49 @@ def trigger_alert(alert_id: str):
 
 # ─── Trade History (for Learning Engine) ──────────────────────────────────────
 
+_TRADE_HISTORY_FILE = "trade_history.parquet"
+_LEGACY_TRADE_HISTORY_FILE = "trade_history.json"
+
+# Last parsed history keyed on the file's (mtime_ns, size); callers get copies
+_trade_history_memo: tuple[tuple[int, int], list[dict]] | None = None
+
+
 def load_trade_history() -> list:
-    """Load trade history for learning engine."""
-    data = _read_json("trade_history.json")
-    return data.get("trades", []) if isinstance(data, dict) else data if isinstance(data, list) else []
+    """Load trade history for learning engine.
+
+    History is stored as Parquet; a legacy trade_history.json is read until
+    the first save writes the Parquet file. The parsed file is memoized until
+    it changes on disk.
+    """
+    global _trade_history_memo
+    filepath = PERSISTENCE_DIR / _TRADE_HISTORY_FILE
+    if not filepath.exists():
+        data = _read_json(_LEGACY_TRADE_HISTORY_FILE)
+        return data.get("trades", []) if isinstance(data, dict) else data if isinstance(data, list) else []
+
+    try:
+        stat = filepath.stat()
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        memo = _trade_history_memo
+        if memo is not None and memo[0] == stamp:
+            records = memo[1]
+        else:
+            df = pd.read_parquet(filepath)
+            # Nulls come back as NaN in numeric columns; restore them to None
+            records = df.astype(object).where(df.notna(), None).to_dict(orient="records")
+            _trade_history_memo = (stamp, records)
+    except Exception:
+        return []
+    # Callers mutate the trades they load, so never hand out the memoized dicts
+    return [dict(t) for t in records]
 
 
 def save_trade_history(trades: list):
     """Save trade history to disk."""
-    _write_json("trade_history.json", {"trades": trades})
+    global _trade_history_memo
+    _ensure_dir()
+    _trade_history_memo = None
+    pd.DataFrame(trades).to_parquet(PERSISTENCE_DIR / _TRADE_HISTORY_FILE, index=False)
 
 
 # ─── User Settings ────────────────────────────────────────────────────────────
@@ -1,7 +1,9 @@
 """Polygon.io API wrapper — all API calls go through this module."""
 import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 from polygon import RESTClient
@@ -9,6 +11,7 @@ from polygon import RESTClient
 from config.settings import POLYGON_API_KEY
 from config import settings
 from data.cache import get_cached, set_cached
+from data.rate_limit import RateLimiter
 
 
 def _client(api_key: str | None = None) -> RESTClient:
@@ -16,7 +19,26 @@ def _client(api_key: str | None = None) -> RESTClient:
     if not key or key == "your_api_key_here":
         st.error("Please set your Polygon API key in the Settings page.")
         st.stop()
-    return RESTClient(key)
+    return _rest_client(key)
+
+
+@st.cache_resource
+def _rest_client(key: str) -> RESTClient:
+    """One RESTClient per API key, shared across reruns so connections stay alive."""
+    client = RESTClient(key)
+    # urllib3 keeps a single idle connection per host by default; let each
+    # concurrent scan worker keep its own instead of reconnecting every call
+    client.client.connection_pool_kw["maxsize"] = settings.SCANNER_MAX_WORKERS
+    return client
+
+
+# Per-ticker columns of get_grouped_history() frames, matching get_aggregates()
+_GROUPED_BAR_COLUMNS = ("date", "open", "high", "low", "close", "volume", "vwap")
+
+
+def _aggs_cache_key(ticker: str, from_date: str, to_date: str,
+                    timespan: str, multiplier: int) -> str:
+    return f"aggs_{ticker}_{from_date}_{to_date}_{timespan}_{multiplier}"
 
 
 class PolygonData:
@@ -54,13 +76,19 @@ class PolygonData:
     # Aggregates (bars)
     # ------------------------------------------------------------------
     def get_aggregates(self, ticker: str, from_date: str, to_date: str,
-                       timespan: str = "day", multiplier: int = 1) -> pd.DataFrame:
-        """Fetch historical OHLCV bars for a single ticker."""
-        cache_key = f"aggs_{ticker}_{from_date}_{to_date}_{timespan}_{multiplier}"
+                       timespan: str = "day", multiplier: int = 1,
+                       limiter: RateLimiter | None = None) -> pd.DataFrame:
+        """Fetch historical OHLCV bars for a single ticker.
+
+        A limiter, if given, only paces the request on a cache miss.
+        """
+        cache_key = _aggs_cache_key(ticker, from_date, to_date, timespan, multiplier)
         cached = get_cached(cache_key, ttl=settings.CACHE_TTL_PRICES)
         if cached is not None:
             return pd.DataFrame(cached)
 
+        if limiter is not None:
+            limiter.wait()
         aggs = []
         for a in self.client.get_aggs(
             ticker=ticker, multiplier=multiplier, timespan=timespan,
@@ -84,16 +112,52 @@ class PolygonData:
             return df
         return pd.DataFrame()
 
+    def get_aggregates_many(self, tickers, from_date: str, to_date: str,
+                            timespan: str = "day", multiplier: int = 1) -> dict[str, pd.DataFrame]:
+        """Fetch bars for many tickers, overlapping the network round-trips.
+
+        Cached tickers are served directly; misses are fetched on a thread pool
+        paced by SCANNER_API_DELAY. Failed fetches map to an empty DataFrame.
+        """
+        frames = {}
+        misses = []
+        for ticker in tickers:
+            cache_key = _aggs_cache_key(ticker, from_date, to_date, timespan, multiplier)
+            cached = get_cached(cache_key, ttl=settings.CACHE_TTL_PRICES)
+            if cached is not None:
+                frames[ticker] = pd.DataFrame(cached)
+            else:
+                misses.append(ticker)
+
+        limiter = RateLimiter(settings.SCANNER_API_DELAY)
+
+        def fetch(ticker):
+            try:
+                return self.get_aggregates(ticker, from_date, to_date, timespan, multiplier, limiter)
+            except Exception:
+                return pd.DataFrame()
+
+        if misses:
+            with ThreadPoolExecutor(max_workers=settings.SCANNER_MAX_WORKERS) as executor:
+                frames.update(zip(misses, executor.map(fetch, misses)))
+        return {ticker: frames[ticker] for ticker in tickers}
+
     # ------------------------------------------------------------------
     # Grouped daily (all tickers, one day)
     # ------------------------------------------------------------------
-    def get_grouped_daily(self, date: str) -> pd.DataFrame:
-        """Fetch all tickers' OHLCV for a single day (efficient bulk fetch)."""
-        cache_key = f"grouped_{date}"
-        cached = get_cached(cache_key, ttl=settings.CACHE_TTL_SCANNER)
+    def get_grouped_daily(self, date: str, limiter: RateLimiter | None = None) -> pd.DataFrame:
+        """Fetch all tickers' OHLCV for a single day (efficient bulk fetch).
+
+        Cached as a pickled DataFrame; a limiter, if given, only paces the
+        request on a cache miss.
+        """
+        cache_key = f"grouped_v2_{date}"
+        cached = get_cached(cache_key, ttl=settings.CACHE_TTL_SCANNER, fmt="pickle")
         if cached is not None:
-            return pd.DataFrame(cached)
+            return cached.copy()
 
+        if limiter is not None:
+            limiter.wait()
         resp = self.client.get_grouped_daily_aggs(date=date)
         rows = []
         for r in resp:
@@ -107,8 +171,52 @@ class PolygonData:
                 "vwap": getattr(r, "vwap", None),
             })
         df = pd.DataFrame(rows)
-        set_cached(cache_key, df.to_dict(orient="records"))
-        return df
+        set_cached(cache_key, df, fmt="pickle")
+        return df.copy()
+
+    def get_grouped_history(self, tickers, from_date: str, to_date: str) -> dict[str, pd.DataFrame]:
+        """Daily bars for many tickers from one grouped-daily call per weekday.
+
+        Cheaper than get_aggregates_many() once there are more tickers than
+        days in the window. Days are fetched on a thread pool paced by
+        SCANNER_API_DELAY; holidays and failed days are skipped. Bars are
+        sorted ticker-major, so each ticker's frame is a contiguous slice of
+        one array per column.
+
+        Returns:
+            {ticker: bars with 'date' and OHLCV columns, oldest first} for the
+            requested tickers that traded in the window.
+        """
+        wanted = list(tickers)
+        limiter = RateLimiter(settings.SCANNER_API_DELAY)
+
+        def fetch(date):
+            try:
+                day = self.get_grouped_daily(date, limiter)
+            except Exception:
+                return None
+            if day.empty:
+                return None
+            return day[day["ticker"].isin(wanted)].assign(date=pd.Timestamp(date))
+
+        dates = [d.date().isoformat() for d in pd.bdate_range(from_date, to_date)]
+        with ThreadPoolExecutor(max_workers=settings.SCANNER_MAX_WORKERS) as executor:
+            days = [day for day in executor.map(fetch, dates) if day is not None]
+        if not days:
+            return {}
+        bars = pd.concat(days, ignore_index=True).sort_values(["ticker", "date"], kind="stable")
+        if bars.empty:
+            return {}
+
+        symbols = bars["ticker"].to_numpy()
+        bounds = np.r_[np.flatnonzero(symbols[1:] != symbols[:-1]) + 1, len(symbols)]
+        columns = {col: bars[col].to_numpy() for col in _GROUPED_BAR_COLUMNS}
+        history = {}
+        start = 0
+        for end in bounds:
+            history[symbols[start]] = pd.DataFrame({col: values[start:end] for col, values in columns.items()})
+            start = end
+        return history
 
     # ------------------------------------------------------------------
     # Snapshot (current quote)
@@ -133,13 +241,18 @@ class PolygonData:
     # ------------------------------------------------------------------
     # Ticker details
     # ------------------------------------------------------------------
-    def get_ticker_details(self, ticker: str) -> dict:
-        """Fetch company info for a ticker."""
+    def get_ticker_details(self, ticker: str, limiter: RateLimiter | None = None) -> dict:
+        """Fetch company info for a ticker.
+
+        A limiter, if given, only paces the request on a cache miss.
+        """
         cache_key = f"details_{ticker}"
         cached = get_cached(cache_key, ttl=settings.CACHE_TTL_DETAILS)
         if cached is not None:
             return cached
 
+        if limiter is not None:
+            limiter.wait()
         try:
             d = self.client.get_ticker_details(ticker)
             details = {
@@ -168,7 +281,8 @@ class PolygonData:
         Extracts income statement, balance sheet, and cash flow data
         including fields needed for CCR, ROIC, Interest Coverage, EBITDA.
         """
-        cache_key = f"financials_{ticker}"
+        # v2: expense-like fields are stored as non-negative magnitudes
+        cache_key = f"financials_v2_{ticker}"
         cached = get_cached(cache_key, ttl=settings.CACHE_TTL_FINANCIALS)
         if cached is not None:
             return cached
@@ -203,6 +317,7 @@ class PolygonData:
                     # Cash flow
                     "operating_cash_flow": None,
                     "investing_cash_flow": None,
+                    "capex": None,
                     "depreciation": None,
                 }
 
@@ -267,6 +382,15 @@ class PolygonData:
                             cfs.depreciation_and_amortization, "value", None
                         )
 
+                # Canonical signs: interest, D&A and capex as magnitudes, so
+                # downstream math needs no abs(). Capex is proxied by the net
+                # investing cash flow.
+                for key in ("interest_expense", "depreciation"):
+                    if fin[key] is not None:
+                        fin[key] = abs(fin[key])
+                if fin["investing_cash_flow"] is not None:
+                    fin["capex"] = abs(fin["investing_cash_flow"])
+
                 results.append(fin)
                 if i >= limit - 1:
                     break
@@ -321,7 +445,7 @@ class PolygonData:
     def get_options_contracts(self, ticker: str) -> dict:
         """Fetch options contracts summary for put/call ratio."""
         cache_key = f"options_contracts_{ticker}"
-        cached = get_cached(cache_key, ttl=3600)
+        cached = get_cached(cache_key, ttl=settings.CACHE_TTL_OPTIONS)
         if cached is not None:
             return cached
 
@@ -0,0 +1,29 @@
+"""Thread-safe request pacing for concurrent API fan-out."""
+import threading
+import time
+
+
+class RateLimiter:
+    """Space out calls so at most one starts every ``interval`` seconds.
+
+    Shared between worker threads; each caller reserves the next free slot
+    under a lock and sleeps outside it, so waiting threads don't serialize
+    on the lock itself.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = max(float(interval), 0.0)
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        """Block until this caller's slot comes up."""
+        if self.interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
@@ -2,11 +2,12 @@
 import streamlit as st
 import pandas as pd
 
-from config.settings import APP_TITLE, MIN_PRICE, MIN_VOLUME, MIN_SCORE, MIN_EMA_SCORE
+from config.settings import APP_TITLE, MIN_PRICE, MIN_VOLUME, MIN_SCORE, MIN_EMA_SCORE, TOP_N_RESULTS
 from config.themes import INVESTMENT_THEMES
 from config.watchlists import SECTOR_WATCHLISTS, FILTER_PRESETS
 from core.scanner import run_full_scan
-from core.recommendations import generate_recommendation, get_action_color
+from core.recommendations import classify_actions_batch, get_action_color
+from core.options_analysis import calculate_options_rating_batch
 from data.polygon_client import PolygonData
 from utils.formatting import format_price, format_pct, format_large_number, format_score, score_color
 
@@ -75,6 +76,11 @@ with st.sidebar:
         value=int(preset_min_ema),
         min_value=0, max_value=100, step=5,
     )
+    show_all = st.checkbox(
+        "Show all results",
+        value=False,
+        help=f"By default only the top {TOP_N_RESULTS} stocks by score are shown.",
+    )
 
     st.divider()
     st.subheader("Theme / Watchlist")
@@ -93,8 +99,12 @@ with st.sidebar:
     )
 
 # --- Run Scanner ---
-if st.button("Run Scanner", type="primary", use_container_width=True):
+run_col, refresh_col = st.columns([3, 1])
+if run_col.button("Run Scanner", type="primary", use_container_width=True):
+    st.session_state["scanner_ran"] = True
+if refresh_col.button("Re-run (ignore saved scan)", use_container_width=True):
     st.session_state["scanner_ran"] = True
+    st.session_state["scanner_refresh"] = True
 
 if st.session_state.get("scanner_ran"):
     # Build filters
@@ -124,27 +134,18 @@ if st.session_state.get("scanner_ran"):
 
     try:
         polygon = PolygonData(api_key)
-        df = run_full_scan(polygon, filters, progress_callback=update_progress)
+        df = run_full_scan(
+            polygon, filters, progress_callback=update_progress,
+            top_k=None if show_all else TOP_N_RESULTS,
+            refresh=st.session_state.pop("scanner_refresh", False),
+        )
         progress_bar.empty()
         status_text.empty()
 
-        # Add recommendation column to scan results
+        # Add recommendation and options rating columns to scan results
         if not df.empty:
-            recs = []
-            for _, row in df.iterrows():
-                stock_data = {
-                    "score": row.get("score", 0),
-                    "ema_score": row.get("ema_score", 0),
-                    "rsi": row.get("rsi", 50),
-                    "institutional_score": row.get("institutional_score", 50),
-                    "breakout_score": row.get("breakout_score", 0),
-                    "momentum_5d": row.get("momentum_5d", 0),
-                    "momentum_20d": row.get("momentum_20d", 0),
-                    "bollinger_squeeze": row.get("bollinger_squeeze", False),
-                }
-                rec = generate_recommendation(stock_data)
-                recs.append(rec["action"])
-            df["recommendation"] = recs
+            df["recommendation"] = classify_actions_batch(df)
+            df[["options_score", "options_rating"]] = calculate_options_rating_batch(df)
 
         st.session_state["scan_results"] = df
     except Exception as e:
@@ -176,7 +177,7 @@ if df is not None and not df.empty:
         sort_by = st.selectbox(
             "Sort by",
             ["score", "ema_score", "breakout_score", "institutional_score",
-             "rsi", "momentum_5d", "momentum_20d", "volume_ratio"],
+             "options_score", "rsi", "momentum_5d", "momentum_20d", "volume_ratio"],
             key="scanner_sort",
         )
     with sort_col2:
@@ -191,7 +192,7 @@ if df is not None and not df.empty:
     display_cols = ["ticker", "name", "price", "score", "ema_score",
                     "breakout_score", "institutional_score", "rsi",
                     "momentum_5d", "momentum_20d", "volume_ratio",
-                    "flow_signal", "breakout_pattern"]
+                    "flow_signal", "breakout_pattern", "options_rating"]
     if "recommendation" in sorted_df.columns:
         display_cols.insert(3, "recommendation")
 
@@ -217,6 +218,7 @@ if df is not None and not df.empty:
         "volume_ratio": st.column_config.TextColumn("Vol Ratio", width="small"),
         "flow_signal": st.column_config.TextColumn("Flow Signal", width="small"),
         "breakout_pattern": st.column_config.TextColumn("Pattern", width="medium"),
+        "options_rating": st.column_config.TextColumn("Options", width="small"),
     }
     if "recommendation" in display_df.columns:
         col_config["recommendation"] = st.column_config.TextColumn("Action", width="small")
@@ -5,7 +5,7 @@ import plotly.graph_objects as go
 import streamlit as st
 
 from config.settings import APP_TITLE
-from config.themes import GOVERNMENT_THEMES, INVESTMENT_THEMES
+from config.themes import GOVERNMENT_THEMES, INVESTMENT_THEMES, themes_for_symbol
 from core.scanner import analyze_single_stock
 from core.recommendations import generate_recommendation, calculate_win_probability, get_action_color
 from core.options_analysis import calculate_options_rating, estimate_iv, suggest_options_strategy, options_rating_color
@@ -397,10 +397,7 @@ with tab_gov:
     st.subheader("Government Theme Matching")
 
     ticker_upper = data["ticker"].upper()
-    matched_themes = []
-    for key, theme in GOVERNMENT_THEMES.items():
-        if ticker_upper in theme["symbols"]:
-            matched_themes.append((key, theme))
+    matched_themes = [(key, GOVERNMENT_THEMES[key]) for key in themes_for_symbol(ticker_upper)]
 
     if matched_themes:
         for key, theme in matched_themes:
@@ -551,9 +548,10 @@ with tab_etf:
             st.write(f"**{exp['etf']}** ({exp['etf_name']}): {exp['weight']:.1f}% weight")
 
     # Sector ETF mapping
-    from config.settings import SECTOR_ETFS
+    from config.settings import SECTOR_ETFS, get_sector_etf, get_sector_from_sic
     company = data.get("company_details", {})
     sic_desc = company.get("sic_description", "")
+    company_etf = get_sector_etf(get_sector_from_sic(company.get("sic_code")))
     st.divider()
     st.markdown("#### Sector ETF Mapping")
 
@@ -561,7 +559,8 @@ with tab_etf:
         st.caption(f"Company sector: {sic_desc}")
 
     for sector, etf in SECTOR_ETFS.items():
-        st.markdown(f"- **{sector}**: {etf}")
+        marker = " ← this stock" if etf == company_etf else ""
+        st.markdown(f"- **{sector}**: {etf}{marker}")
 
     options = data.get("options_summary", {})
     if options and options.get("total", 0) > 0:
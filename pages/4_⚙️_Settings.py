@@ -97,8 +97,11 @@ st.caption("Track trade outcomes and get adaptive threshold suggestions.")
 
 try:
     from core.learning_engine import get_stats, analyze_outcomes, suggest_adjustments
+    from data.persistence import load_trade_history
 
-    stats = get_stats()
+    # Load the history once and share it across the stats below
+    trades = load_trade_history()
+    stats = get_stats(trades)
     le_cols = st.columns(5)
     le_cols[0].metric("Total Trades", stats.get("total_trades", 0))
     le_cols[1].metric("Open", stats.get("open_trades", 0))
@@ -106,8 +109,9 @@ try:
     le_cols[3].metric("Wins", stats.get("wins", 0))
     le_cols[4].metric("Losses", stats.get("losses", 0))
 
+    outcomes = None
     if stats.get("closed_trades", 0) > 0:
-        outcomes = analyze_outcomes()
+        outcomes = analyze_outcomes(trades)
         st.metric("Overall Win Rate", f"{outcomes.get('overall_win_rate', 0):.1f}%")
         st.metric("Avg Return", f"{outcomes.get('overall_avg_return', 0):+.1f}%")
 
@@ -129,7 +133,7 @@ try:
 
     # Threshold suggestions
     if stats.get("has_enough_data"):
-        adjustments = suggest_adjustments()
+        adjustments = suggest_adjustments(trades, outcomes)
         if adjustments.get("suggestions"):
             st.subheader("Suggested Adjustments")
             for sug in adjustments["suggestions"]:
@@ -10,7 +10,7 @@ import pandas as pd
 from config.settings import APP_TITLE, last_market_day, SCANNER_API_DELAY
 from config.portfolios import PREDEFINED_PORTFOLIOS
 from config.etf_holdings import get_etf_exposure, ETF_HOLDINGS
-from config.watchlists import SECTOR_ETF_MAP, SECTOR_NAMES
+from config.watchlists import SECTOR_NAMES, etf_for
 from data.persistence import (
     load_portfolios, save_portfolios, add_stock_to_portfolio,
     remove_stock_from_portfolio, create_custom_portfolio,
@@ -258,7 +258,7 @@ if analyze or st.session_state.get("portfolio_data"):
             # Sector breakdown
             sector_counts = {}
             for r in valid:
-                sector_etf = SECTOR_ETF_MAP.get(r["ticker"], "Unknown")
+                sector_etf = etf_for(r["ticker"], "Unknown")
                 sector = SECTOR_NAMES.get(sector_etf, "Other")
                 sector_counts[sector] = sector_counts.get(sector, 0) + 1
 
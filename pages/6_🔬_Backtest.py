@@ -44,6 +44,16 @@ with st.sidebar:
         "Min Overall Score", 0, 50,
         value=BACKTEST_CONFIG["min_overall_score"], step=5,
     )
+    min_price = st.number_input(
+        "Min Price ($)", min_value=0.0,
+        value=float(BACKTEST_CONFIG["min_price"]), step=1.0,
+        help="Skip tickers whose last close is below this (0 = off)",
+    )
+    min_volume = st.number_input(
+        "Min Volume", min_value=0,
+        value=int(BACKTEST_CONFIG["min_volume"]), step=100_000,
+        help="Skip tickers whose last session volume is below this (0 = off)",
+    )
 
     st.divider()
     st.caption(
@@ -60,6 +70,8 @@ if run_btn:
         "target_percent": target_pct,
         "stop_percent": stop_pct,
         "min_overall_score": min_score,
+        "min_price": min_price,
+        "min_volume": min_volume,
     }
 
     progress_bar = st.progress(0)
@@ -255,31 +267,31 @@ with tab_trades:
     with filter_col2:
         action_filter = st.multiselect(
             "Filter by Action",
-            list(set(t.get("action", "") for t in trades)),
-            default=list(set(t.get("action", "") for t in trades)),
+            list(set(t.action for t in trades)),
+            default=list(set(t.action for t in trades)),
         )
 
     filtered = [
         t for t in trades
-        if t.get("outcome") in outcome_filter and t.get("action") in action_filter
+        if t.outcome in outcome_filter and t.action in action_filter
     ]
 
     if filtered:
         display_trades = []
         for t in filtered:
             display_trades.append({
-                "Ticker": t.get("ticker", ""),
-                "Date": t.get("entry_date", ""),
-                "Entry": f"${t.get('entry_price', 0):,.2f}",
-                "Exit": f"${t.get('exit_price', 0):,.2f}",
-                "Return": f"{t.get('return_pct', 0):+.1f}%",
-                "Outcome": t.get("outcome", ""),
-                "Days": t.get("days_held", 0),
-                "Action": t.get("action", ""),
-                "Score": t.get("overall_score", 0),
-                "EMA": t.get("ema_score", 0),
-                "Max Fav": f"{t.get('max_favorable', 0):+.1f}%",
-                "Max Adv": f"-{t.get('max_adverse', 0):.1f}%",
+                "Ticker": t.ticker,
+                "Date": t.entry_date,
+                "Entry": f"${t.entry_price:,.2f}",
+                "Exit": f"${t.exit_price:,.2f}",
+                "Return": f"{t.return_pct:+.1f}%",
+                "Outcome": t.outcome,
+                "Days": t.days_held,
+                "Action": t.action,
+                "Score": t.overall_score,
+                "EMA": t.ema_score,
+                "Max Fav": f"{t.max_favorable:+.1f}%",
+                "Max Adv": f"-{t.max_adverse:.1f}%",
             })
 
         st.dataframe(
@@ -323,5 +335,7 @@ with tab_export:
         "target_percent": target_pct,
         "stop_percent": stop_pct,
         "min_overall_score": min_score,
-        "universe_size": 110,
+        "min_price": min_price,
+        "min_volume": min_volume,
+        "universe_size": results.get("universe_size", 110),
     })
@@ -0,0 +1,36 @@
+"""Shared fixtures for the test suite."""
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def make_bars():
+    """Build a random daily OHLCV frame: make_bars(n, seed, drift=, volatility=, nan_rate=).
+
+    Closes are rounded to cents with some flat days, and volumes are whole
+    shares so sums are exact. nan_rate blanks that share of highs, lows and
+    volumes.
+    """
+    def build(n: int, seed: int, drift: float = 0.0, volatility: float = 0.02,
+              nan_rate: float = 0.0) -> pd.DataFrame:
+        rng = np.random.default_rng(seed)
+        close = np.round(np.cumprod(1 + rng.normal(drift, volatility, n)) * 50, 2)
+        for i in np.flatnonzero(rng.random(n) < 0.1):  # flat days
+            close[i] = close[i - 1]
+        high = close * (1 + rng.uniform(0, 0.03, n))
+        low = close * (1 - rng.uniform(0, 0.03, n))
+        volume = rng.integers(100_000, 5_000_000, n).astype(float)
+        if nan_rate:
+            for values in (high, low, volume):
+                values[rng.random(n) < nan_rate] = np.nan
+        return pd.DataFrame({
+            "date": pd.date_range("2023-01-02", periods=n, freq="B"),
+            "open": close,
+            "high": high,
+            "low": low,
+            "close": close,
+            "volume": volume,
+        })
+
+    return build
@@ -0,0 +1,15 @@
+"""Signal walk of the backtesting engine."""
+from config.signals import BACKTEST_CONFIG
+from core import backtesting
+
+
+def test_batch_scoring_failure_falls_back_to_per_bar_scores(make_bars, monkeypatch):
+    walks = [(f"T{seed}", make_bars(400, seed, drift=0.002, volatility=0.03)) for seed in range(8)]
+    expected = [backtesting._walk_signals(t, df, BACKTEST_CONFIG) for t, df in walks]
+    assert any(expected)
+
+    def failing_batch(inputs):
+        raise ValueError("bad row")
+
+    monkeypatch.setattr(backtesting, "overall_scores_batch", failing_batch)
+    assert [backtesting._walk_signals(t, df, BACKTEST_CONFIG) for t, df in walks] == expected
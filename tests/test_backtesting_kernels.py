@@ -0,0 +1,56 @@
+"""Agreement of the loop and NumPy forward-scan kernels."""
+import numpy as np
+import pytest
+
+from core.backtesting_kernels import (
+    OUTCOME_LOSS,
+    OUTCOME_TIMEOUT,
+    OUTCOME_WIN,
+    _forward_scan_loop,
+    _forward_scan_numpy,
+)
+
+NAN = np.nan
+
+
+@pytest.mark.parametrize("highs, lows, outcome, exit_price, max_favorable, max_adverse", [
+    # NaN before the exit bar doesn't hide the excursion on other bars
+    ([100, NAN, 106, 111], [100, 97, NAN, 99], OUTCOME_WIN, 110.0, 11.0, 3.0),
+    # Bars with NaN never hit the stop or target
+    ([100, NAN, 104], [100, NAN, 98], OUTCOME_TIMEOUT, 100.0, 4.0, 2.0),
+    # Nothing but NaN after the signal leaves the excursion at 0
+    ([100, NAN, NAN], [100, NAN, NAN], OUTCOME_TIMEOUT, 100.0, 0.0, 0.0),
+    ([100, NAN, NAN], [100, 96, NAN], OUTCOME_TIMEOUT, 100.0, 0.0, 4.0),
+    ([100, 103, NAN], [100, NAN, 94], OUTCOME_LOSS, 95.0, 3.0, 6.0),
+])
+def test_nan_bars_are_skipped(highs, lows, outcome, exit_price, max_favorable, max_adverse):
+    highs = np.array(highs, dtype=float)
+    lows = np.array(lows, dtype=float)
+    closes = np.full(len(highs), 100.0)
+    args = (highs, lows, closes, 0, 100.0, 10.0, 5.0, 10)
+    expected = (outcome, pytest.approx(exit_price), len(highs) - 1,
+                pytest.approx(max_favorable), pytest.approx(max_adverse))
+    assert _forward_scan_loop(*args) == expected
+    assert _forward_scan_numpy(*args) == expected
+
+
+@pytest.mark.parametrize("nan_rate", [0.0, 0.1])
+@pytest.mark.parametrize("seed", range(5))
+def test_loop_and_numpy_kernels_agree(make_bars, nan_rate, seed):
+    bars = make_bars(150, seed, volatility=0.03, nan_rate=nan_rate)
+    highs, lows, closes = (bars[c].to_numpy() for c in ("high", "low", "close"))
+    for signal_idx in range(0, 150, 7):
+        for target_pct, stop_pct, max_days in [(5.0, 3.0, 10), (15.0, 8.0, 30), (1.0, 1.0, 5)]:
+            args = (highs, lows, closes, signal_idx, float(closes[signal_idx]),
+                    target_pct, stop_pct, max_days)
+            assert _forward_scan_numpy(*args) == _forward_scan_loop(*args)
+
+
+def test_stop_and_target_on_the_same_bar_is_a_loss():
+    highs = np.array([100.0, 102.0, 112.0, 120.0])
+    lows = np.array([100.0, 99.0, 94.0, 90.0])
+    closes = np.array([100.0, 101.0, 105.0, 110.0])
+    args = (highs, lows, closes, 0, 100.0, 10.0, 5.0, 10)
+    expected = (OUTCOME_LOSS, 95.0, 2, pytest.approx(12.0), pytest.approx(6.0))
+    assert _forward_scan_loop(*args) == expected
+    assert _forward_scan_numpy(*args) == expected
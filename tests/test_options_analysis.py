@@ -0,0 +1,68 @@
+"""Parity of calculate_options_rating_batch() with calculate_options_rating()."""
+import numpy as np
+import pandas as pd
+
+from core.options_analysis import calculate_options_rating, calculate_options_rating_batch
+
+FIELDS = ("price", "volume", "avg_daily_move", "atr", "momentum_5d",
+          "momentum_20d", "institutional_score", "breakout_score")
+
+
+def _random_stocks(n: int, seed: int, missing=(np.nan,)) -> list[dict]:
+    """Stocks with values on and around every threshold, some missing."""
+    rng = np.random.default_rng(seed)
+    edges = {
+        "price": [0, 5, 10, 20, 200, 500, 1000, 1500],
+        "volume": [0, 500_000, 1_000_000, 2_000_000, 5_000_000],
+        "avg_daily_move": [0, 0.5, 2.5],
+        "atr": [0, 1.0],
+        "momentum_5d": [0, -3, 4],
+        "momentum_20d": [0, -8, 12],
+        "institutional_score": [30, 40, 50, 65],
+        "breakout_score": [0, 20, 50],
+    }
+    stocks = []
+    for _ in range(n):
+        stock = {}
+        for field in FIELDS:
+            roll = rng.random()
+            if roll < 0.1:
+                continue
+            if roll < 0.25:
+                stock[field] = missing[rng.integers(len(missing))]
+            elif roll < 0.5:
+                stock[field] = float(rng.choice(edges[field]))
+            else:
+                stock[field] = float(rng.uniform(-20, 1.2 * max(edges[field])))
+        stocks.append(stock)
+    return stocks
+
+
+def _assert_matches_scalar(stocks: list[dict], frame: pd.DataFrame):
+    batch = calculate_options_rating_batch(frame)
+    expected = [calculate_options_rating(stock) for stock in stocks]
+    assert batch["options_score"].tolist() == [e["options_score"] for e in expected]
+    assert batch["options_rating"].tolist() == [e["options_rating"] for e in expected]
+
+
+def test_batch_matches_scalar_with_nan():
+    # A float frame holds NaN for every gap, which the scalar path keeps as NaN
+    frame = pd.DataFrame(_random_stocks(5000, seed=0), columns=list(FIELDS))
+    _assert_matches_scalar(frame.to_dict("records"), frame)
+
+
+def test_batch_matches_scalar_with_none_in_object_columns():
+    stocks = _random_stocks(5000, seed=1, missing=(np.nan, None))
+    full = [{field: stock.get(field) for field in FIELDS} for stock in stocks]
+    # Absent keys and None both take the scalar defaults
+    _assert_matches_scalar(full, pd.DataFrame(full, columns=list(FIELDS), dtype=object))
+
+
+def test_missing_columns_take_defaults():
+    frame = pd.DataFrame({"price": [50.0, 0.0], "volume": [3_000_000, np.nan]})
+    _assert_matches_scalar(frame.to_dict("records"), frame)
+
+
+def test_keeps_index():
+    frame = pd.DataFrame({"price": [25.0, 8.0]}, index=["AAA", "BBB"])
+    assert calculate_options_rating_batch(frame).index.tolist() == ["AAA", "BBB"]
@@ -0,0 +1,49 @@
+"""Parity of the batch action classifier with generate_recommendation()."""
+import numpy as np
+import pandas as pd
+
+from core.recommendation_kernels import ACTION_LEVELS, _classify_loop, _classify_numpy
+from core.recommendations import classify_actions_batch, generate_recommendation
+
+
+def _random_scan(n: int, seed: int) -> pd.DataFrame:
+    """Scan rows with values on and around every rule threshold, some NaN."""
+    rng = np.random.default_rng(seed)
+    edges = {
+        "score": [0, 25, 40, 55, 70, 75, 100],
+        "ema_score": [0, 30, 40, 60, 70, 100],
+        "institutional_score": [0, 40, 45, 60, 65, 100],
+        "rsi": [0, 25, 30, 35, 40, 55, 65, 70, 100],
+        "momentum_20d": [-40, -30, -15, 0, 20],
+    }
+    columns = {}
+    for name, values in edges.items():
+        column = np.where(
+            rng.random(n) < 0.5,
+            rng.choice(values, n).astype(float),
+            rng.uniform(min(values) - 5, max(values) + 5, n),
+        )
+        column[rng.random(n) < 0.05] = np.nan
+        columns[name] = column
+    return pd.DataFrame(columns)
+
+
+def test_batch_matches_generate_recommendation():
+    scan = _random_scan(20000, seed=0)
+    expected = [generate_recommendation(row)["action"] for row in scan.to_dict("records")]
+    assert classify_actions_batch(scan).astype(str).tolist() == expected
+
+
+def test_missing_columns_take_defaults():
+    scan = pd.DataFrame({"score": [80.0, 20.0, 60.0], "rsi": [50.0, 0.0, 45.0]})
+    expected = [generate_recommendation(row)["action"] for row in scan.to_dict("records")]
+    assert classify_actions_batch(scan).astype(str).tolist() == expected
+
+
+def test_loop_and_numpy_kernels_agree():
+    scan = _random_scan(5000, seed=1)
+    arrays = [scan[c].to_numpy() for c in
+              ("score", "ema_score", "institutional_score", "rsi", "momentum_20d")]
+    codes = _classify_numpy(*arrays)
+    np.testing.assert_array_equal(_classify_loop(*arrays), codes)
+    assert set(codes.tolist()) <= set(range(len(ACTION_LEVELS)))
@@ -0,0 +1,30 @@
+"""Input handling of calculate_rs_vs_spy()."""
+import numpy as np
+import pandas as pd
+
+from core.relative_strength import _default_rs, calculate_rs_vs_spy
+
+
+def _closes(n: int, seed: int, scale: float) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return np.cumprod(1 + rng.normal(0, 0.02, n)) * scale
+
+
+def test_object_column_of_numbers_matches_float_column():
+    spy = pd.DataFrame({"close": _closes(200, seed=1, scale=400)})
+    closes = _closes(200, seed=0, scale=50)
+    expected = calculate_rs_vs_spy(pd.DataFrame({"close": closes}), spy)
+    assert expected != _default_rs()
+    as_object = pd.DataFrame({"close": pd.Series(closes, dtype=object)})
+    assert calculate_rs_vs_spy(as_object, spy) == expected
+
+
+def test_non_numeric_closes_give_defaults():
+    spy = pd.DataFrame({"close": _closes(200, seed=1, scale=400)})
+    stock = pd.DataFrame({"close": ["n/a"] * 200})
+    assert calculate_rs_vs_spy(stock, spy) == _default_rs()
+
+
+def test_missing_close_column_gives_defaults():
+    spy = pd.DataFrame({"close": _closes(200, seed=1, scale=400)})
+    assert calculate_rs_vs_spy(pd.DataFrame({"open": [1.0] * 10}), spy) == _default_rs()
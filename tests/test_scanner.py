@@ -0,0 +1,114 @@
+"""Ranking of scan results."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from config import settings
+from core import scanner
+from core.scanner import _rank_by_score
+
+
+def _results(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    # Few distinct scores, so the cutoff is almost always tied
+    return pd.DataFrame({"ticker": [f"T{i}" for i in range(n)], "score": rng.integers(40, 60, n)})
+
+
+@pytest.mark.parametrize("n", [1, 7, 300])
+@pytest.mark.parametrize("top_k", [1, 5, 50, 299, 1000])
+def test_top_k_is_head_of_full_sort(n, top_k):
+    results = _results(n, seed=n)
+    full = _rank_by_score(results, None)
+    pd.testing.assert_frame_equal(_rank_by_score(results, top_k), full.head(top_k))
+
+
+def test_full_sort_keeps_submission_order_for_ties():
+    results = pd.DataFrame({"ticker": ["A", "B", "C", "D"], "score": [50, 70, 50, 70]})
+    assert _rank_by_score(results, None)["ticker"].tolist() == ["B", "D", "A", "C"]
+
+
+def test_zero_top_k_is_empty():
+    assert _rank_by_score(_results(10, seed=0), 0).empty
+
+
+class _FakePolygon:
+    def __init__(self, tickers, grouped_ok=True):
+        self.tickers = tickers
+        self.grouped_ok = grouped_ok
+
+    def get_all_active_tickers(self):
+        return pd.DataFrame({"ticker": self.tickers, "type": "CS"})
+
+    def get_grouped_daily(self, date):
+        if not self.grouped_ok:
+            raise ConnectionError("grouped daily unavailable")
+        return pd.DataFrame({"ticker": self.tickers, "close": 50.0, "volume": 1e7})
+
+    def get_grouped_history(self, tickers, from_date, to_date):
+        return {}
+
+
+@pytest.fixture
+def scan_cache(monkeypatch):
+    saved = {}
+    monkeypatch.setattr(scanner, "get_cached", lambda key, ttl, fmt: saved.get(key))
+    monkeypatch.setattr(scanner, "set_cached", lambda key, value, fmt: saved.__setitem__(key, value))
+    return saved
+
+
+def _run(polygon, analyze, monkeypatch, **kwargs):
+    monkeypatch.setattr(scanner, "_analyze_candidate", analyze)
+    return scanner.run_full_scan(polygon, {"lookback_days": 100}, **kwargs)
+
+
+def _analyze(polygon, ticker, *args):
+    return {"ticker": ticker, "score": int(ticker[1:]), "reasons": []}
+
+
+def test_complete_scan_is_saved_and_reused(scan_cache, monkeypatch):
+    polygon = _FakePolygon([f"T{i}" for i in range(10)])
+    first = _run(polygon, _analyze, monkeypatch)
+    assert len(scan_cache) == 1
+
+    def fail(*args):
+        raise AssertionError("saved scan should be reused")
+
+    pd.testing.assert_frame_equal(_run(polygon, fail, monkeypatch), first)
+
+
+def test_refresh_ignores_saved_scan(scan_cache, monkeypatch):
+    polygon = _FakePolygon([f"T{i}" for i in range(10)])
+    _run(polygon, _analyze, monkeypatch)
+    calls = []
+
+    def counting(polygon, ticker, *args):
+        calls.append(ticker)
+        return _analyze(polygon, ticker)
+
+    _run(polygon, counting, monkeypatch, refresh=True)
+    assert len(calls) == 10
+
+
+def test_fallback_universe_is_not_saved(scan_cache, monkeypatch):
+    result = _run(_FakePolygon([f"T{i}" for i in range(10)], grouped_ok=False), _analyze, monkeypatch)
+    assert len(result) == 10
+    assert not scan_cache
+
+
+def test_scan_with_failed_candidates_is_not_saved(scan_cache, monkeypatch):
+    def flaky(polygon, ticker, *args):
+        if ticker in ("T3", "T7"):
+            raise ConnectionError("fetch failed")
+        return _analyze(polygon, ticker)
+
+    result = _run(_FakePolygon([f"T{i}" for i in range(10)]), flaky, monkeypatch)
+    assert sorted(result["ticker"]) == sorted(f"T{i}" for i in range(10) if i not in (3, 7))
+    assert not scan_cache
+
+
+def test_default_keeps_top_n_results(scan_cache, monkeypatch):
+    polygon = _FakePolygon([f"T{i}" for i in range(settings.TOP_N_RESULTS + 50)])
+    top = _run(polygon, _analyze, monkeypatch)
+    assert len(top) == settings.TOP_N_RESULTS
+    assert top["score"].min() == 50
+    assert len(_run(polygon, _analyze, monkeypatch, top_k=None)) == settings.TOP_N_RESULTS + 50
@@ -0,0 +1,51 @@
+"""Parity of overall_scores_batch() with calculate_overall_score()."""
+import numpy as np
+import pandas as pd
+
+from core.scoring import (
+    OVERALL_SCORE_COLUMNS,
+    calculate_overall_score,
+    overall_score_inputs,
+    overall_scores_batch,
+)
+
+
+def _random_components(n: int, seed: int) -> list[tuple[dict, dict, dict]]:
+    """(technicals, institutional_flow, breakout) with values on every threshold."""
+    rng = np.random.default_rng(seed)
+
+    def pick(*choices):
+        return choices[rng.integers(len(choices))]
+
+    components = []
+    for _ in range(n):
+        technicals = {
+            # Integer EMA scores put score * 0.35 on exact .5 ties
+            "ema_score": int(rng.integers(0, 101)),
+            "price": float(rng.uniform(5, 15)),
+            "emas": {p: float(rng.uniform(5, 15)) for p in range(int(rng.integers(0, 6)))},
+            "momentum_5d": pick(0, 5, 10, -1, np.nan, float(rng.normal(0, 8))),
+            "momentum_20d": pick(10, 15, 0, np.nan, float(rng.normal(0, 12))),
+            "volume_ratio": pick(1.5, 2, np.nan, float(rng.uniform(0, 3))),
+            "rsi": pick(None, np.nan, 30, 50, 70, 80, float(rng.uniform(0, 100))),
+        }
+        if rng.random() < 0.05:
+            del technicals["momentum_5d"]
+        flow = {"score": pick(30, 55, 70, int(rng.integers(0, 101)))} if rng.random() < 0.95 else {}
+        breakout = {"score": pick(20, 35, 50, int(rng.integers(0, 101)))}
+        components.append((technicals, flow, breakout))
+    return components
+
+
+def test_batch_matches_scalar():
+    components = _random_components(20000, seed=0)
+    inputs = pd.DataFrame(
+        [overall_score_inputs(*c) for c in components], columns=OVERALL_SCORE_COLUMNS,
+    )
+    expected = [calculate_overall_score(*c)["score"] for c in components]
+    assert overall_scores_batch(inputs).tolist() == expected
+
+
+def test_empty_batch():
+    inputs = pd.DataFrame([], columns=OVERALL_SCORE_COLUMNS)
+    assert overall_scores_batch(inputs).tolist() == []
@@ -0,0 +1,33 @@
+"""Agreement of the loop and NumPy window-statistics kernels."""
+import numpy as np
+import pytest
+
+from core.scoring_kernels import (
+    _breakout_stats_loop,
+    _breakout_stats_numpy,
+    _flow_stats_loop,
+    _flow_stats_numpy,
+)
+
+
+def _arrays(bars):
+    return tuple(bars[c].to_numpy() for c in ("close", "volume", "high", "low"))
+
+
+@pytest.mark.parametrize("n", [20, 25, 30, 120])
+@pytest.mark.parametrize("seed", range(5))
+def test_flow_stats_agree(make_bars, n, seed):
+    close, volume, high, low = _arrays(make_bars(n, seed))
+    avg_vol_20 = float(volume[-20:].mean())
+    loop = _flow_stats_loop(close, volume, high, low, avg_vol_20)
+    vectorized = _flow_stats_numpy(close, volume, high, low, avg_vol_20)
+    np.testing.assert_allclose(loop, vectorized, rtol=1e-12)
+
+
+@pytest.mark.parametrize("nan_rate", [0.0, 0.2])
+@pytest.mark.parametrize("seed", range(5))
+def test_breakout_stats_agree(make_bars, nan_rate, seed):
+    close, volume, high, low = _arrays(make_bars(60, seed, nan_rate=nan_rate))
+    loop = _breakout_stats_loop(volume, high, low)
+    vectorized = _breakout_stats_numpy(volume, high, low)
+    np.testing.assert_allclose(loop, vectorized, rtol=1e-12, equal_nan=True)
@@ -0,0 +1,46 @@
+"""Parsing of the .env file."""
+import os
+
+import pytest
+
+from config.settings import _env_value, _parse_env_file
+
+
+@pytest.mark.parametrize("raw, value", [
+    ("abc", "abc"),
+    ("  abc  ", "abc"),
+    ("abc # prod", "abc"),
+    ("abc\t# prod", "abc"),
+    ("abc#def", "abc#def"),
+    ('"abc"', "abc"),
+    ("'abc'", "abc"),
+    ('"abc # not a comment"', "abc # not a comment"),
+    ('"abc" # prod', "abc"),
+    ("'it\"s'", 'it"s'),
+    ('"abc', '"abc'),
+    ("abc'", "abc'"),
+    ("\"abc'", "\"abc'"),
+    ("", ""),
+])
+def test_env_value(raw, value):
+    assert _env_value(raw) == value
+
+
+def test_parse_env_file_keeps_existing_variables(tmp_path, monkeypatch):
+    env = tmp_path / ".env"
+    env.write_text(
+        "# comment\n"
+        "export POLYGON_API_KEY=abc # prod\n"
+        "FINNHUB_API_KEY='xyz'\n"
+        "SCANNER_TEST_KEY=new\n",
+        encoding="utf-8",
+    )
+    for key in ("POLYGON_API_KEY", "FINNHUB_API_KEY"):
+        monkeypatch.delenv(key, raising=False)
+    monkeypatch.setenv("SCANNER_TEST_KEY", "old")
+
+    _parse_env_file(env)
+
+    assert os.environ["POLYGON_API_KEY"] == "abc"
+    assert os.environ["FINNHUB_API_KEY"] == "xyz"
+    assert os.environ["SCANNER_TEST_KEY"] == "old"